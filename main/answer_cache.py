@@ -0,0 +1,125 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from context_encoder import encode_section
+from context_retriever import select_sections, ALWAYS_INCLUDE
+
+# ----------------------------------
+# Shared answer cache for hotel-wide questions
+# ----------------------------------
+# "What pools do you have?" gets the same answer in every room, so it only needs one
+# LLM call. A question is cacheable when the only sections it needs are hotel-wide
+# and it doesn't talk about the guest's own room. The key includes a version of exactly
+# those sections (their encoded text), so any change to pools/menu/etc. misses the old
+# entries; the menu section also carries the restaurant and weekday.
+# Answers that mention the asking guest's name or room are never stored.
+
+HOTEL_WIDE_SECTIONS = {"pools", "water_sports", "hotel", "restaurant_menu"}
+MAX_ENTRIES = 512
+
+# Questions about "my room", devices, cleaning etc. are room-specific even if a
+# hotel-wide word also appears
+ROOM_SPECIFIC = re.compile(
+    r"\b(my|mine|our|room|kwarto|ko|akin|namin|tv|aircon|ac|thermostat|fan|wifi|password|clean\w*|linis\w*|housekeeping)\b"
+)
+
+# Filler that doesn't change the question
+FILLER = set(
+    "please pls po tavv hi hello hey can could would you tell me show give know want wanna "
+    "i im i'm a the an is are what whats what's ano anong ba nga naman paki pakisabi"
+    .split()
+)
+
+FILIPINO_MARKERS = set(
+    "ano anong saan kailan paano ba po ang mga ng sa may meron wala gusto ko ako kami "
+    "nga naman pwede puwede magkano ngayon bukas kain gutom langoy".split()
+)
+
+
+def detect_language(text):
+    words = re.findall(r"[a-z']+", text.lower())
+    fil = sum(1 for w in words if w in FILIPINO_MARKERS)
+    return "fil" if fil and fil * 3 >= len(words) else "en"
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    words = re.findall(r"[a-z0-9']+", text)
+    kept = [w.strip("'") for w in words if w not in FILLER]
+    return " ".join(w for w in kept if w)
+
+
+class AnswerCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, message, context):
+        """Cache key for a hotel-wide question, or None if the answer depends on the room."""
+        if ROOM_SPECIFIC.search(message.lower()):
+            return None
+        sections = select_sections(message, context)
+        if not sections:
+            return None
+        topical = set(sections) - set(ALWAYS_INCLUDE)
+        if not topical or not topical <= HOTEL_WIDE_SECTIONS:
+            return None
+        normalized = normalize(message)
+        if not normalized:
+            return None
+        # Data version: the encoded text of the sections the answer depends on
+        version = hash(tuple(encode_section(name, context[name])[0] for name in sorted(topical)))
+        if "restaurant_menu" in topical:
+            building = context.get("building") or {}
+            version = hash((version, building.get("restaurant_name")))
+        return (normalized, detect_language(message), tuple(sorted(topical)), version)
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, key, answer, context=None):
+        if key is None or not answer:
+            return False
+        if context is not None and mentions_guest(answer, context):
+            return False
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+def mentions_guest(answer, context):
+    """True if the answer names the guest or their room, so it must not be shared."""
+    lowered = answer.lower()
+    resident = context.get("resident") or {}
+    name = resident.get("resident_name") or ""
+    for part in name.lower().split():
+        if len(part) > 2 and re.search(r"\b" + re.escape(part) + r"\b", lowered):
+            return True
+    room = (context.get("room") or {}).get("room_number")
+    return bool(room) and re.search(r"\b" + re.escape(str(room)) + r"\b", lowered) is not None
@@ -0,0 +1,390 @@
+import os
+import json
+import asyncio
+import time
+import httpx
+import tracing
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
+from hotel_db import DatabaseLoader
+from context_encoder import encode_context, count_tokens, CONTEXT_FORMAT_NOTE
+from context_retriever import select_sections, ALWAYS_INCLUDE
+from answer_cache import AnswerCache
+from fast_path import fast_answer
+from conversation_memory import ConversationMemory
+from session_store import SessionStore
+from iot import DEVICE_TOOLS, DeviceDispatcher, wants_devices, parse_tool_calls, describe_actions
+from llm_scheduler import LLMScheduler, INTERACTIVE
+
+# Shared chat pipeline for the GUI (t.py) and the CLI (data/tavvchat.py)
+
+MODEL = "openai/gpt-oss-20b"
+SELECT_SECTIONS = True  # send only the context sections the question needs (context_retriever.py)
+CACHE_ANSWERS = True    # reuse answers to hotel-wide questions across rooms (answer_cache.py)
+FAST_PATH = True        # answer wifi / last cleaned / menu lookups from templates (fast_path.py)
+DEVICE_CONTROL = True   # let the model change in-room devices through tool calls (iot.py)
+NO_ROOM_REPLY = "Sorry, I couldn't find information for that room. Please check your room number."
+
+db = DatabaseLoader()
+api_key = os.getenv("GROQ_API_KEY")
+# Point the clients at another OpenAI-compatible endpoint, e.g. bench/mock_llm.py for load tests
+base_url = os.getenv("GROQ_BASE_URL") or None
+# Keep idle connections open between messages (httpx closes them after 5s by default),
+# so a warmed-up connection (warmup.py) is still there when the guest hits enter
+KEEPALIVE_SECONDS = 120
+limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_SECONDS)
+# No SDK retries: they would run inside one scheduler slot, past its rate limits and backoff;
+# llm_scheduler retries instead
+client = Groq(api_key=api_key, base_url=base_url, max_retries=0, http_client=DefaultHttpxClient(limits=limits))
+async_client = AsyncGroq(api_key=api_key, base_url=base_url, max_retries=0,
+                         http_client=DefaultAsyncHttpxClient(limits=limits))  # used by server.py
+
+# Conversation memory per room (token-bounded, summarized, evicted on checkout),
+# persisted to data/sessions.db so a restart doesn't lose the guest's session
+PERSIST_SESSIONS = True
+conversation_history = ConversationMemory(store=SessionStore() if PERSIST_SESSIONS else None)
+
+# Every completion waits its turn here: RPM/TPM token buckets, priorities, retries (llm_scheduler.py)
+scheduler = LLMScheduler()
+REPLY_TOKENS_ESTIMATE = 400     # reserved for the reply until the real usage is known
+TOOLS_TOKENS = count_tokens(json.dumps(DEVICE_TOOLS))
+
+# Answers to hotel-wide questions, shared by every room
+answer_cache = AnswerCache()
+
+# Runs the model's device commands in the background, batched per room
+devices = DeviceDispatcher()
+
+
+def build_system_prompt(context_data, room_number):
+    current_day = context_data.get('current_day', 'today') # Get day for context
+
+    return {
+        #Prompt for Groq to begin acting like Tavv
+        "role": "system", "content": (
+            #Tavv Personality Injection
+            "You are Tavv, a friendly but efficient hotel assistant. You are a conversational AI focused on engaging in authentic dialogue." "Today is " + current_day + ""
+            #Retrival-Augmented Generation Prompt
+            "Answer questions using the information in the provided database"
+            #Limiting over-information and security breach
+            "Only provide a response regarding to the user's specific prompt. Do not disclose any other information unless asked to. You're not allowed to compromise  the information of other rooms, for safety and privacy of the other residents. However, you can disclose information about the hotel's services like restaurant, accomodities, and amenities"
+            #Room Identification
+            "The guest is staying at room number" + room_number + ". Provide only the information in regards with their corresponding rooms."
+            #Response Limitation
+            "When the user asks, try NOT to add instructions or steps unless the user explicitly requests: explain, how do I, or steps. Try not to overexplain or add unnecessary information."
+            #Language accomodation
+            "Speak in user's language. Switch the language based on user's input language."
+            #IoT Feature
+            "This hotel is equipped with IoT devices. You have full control over said IoT devices. That includes TV, Air-conditioning, and other IoT devices. If the user requests to control any device, only control the devices when user requests only. Make every change by calling the provided device tools; a change you only describe is not made. Do not include any technical details or code. Specify the changes made to the devices in your response clearly."
+            #Miscellanaeous Instructions
+            "When user implicates a sense of boredom, offer hotel activities from the activity center, or pools."
+            "If, and ONLY IF, user asks for price of any accomidty or service offered by the hotel (food, housekeeping,etc.), it is included in the user's stay."
+            "Detect the city the hotel's situated in, and recommend local attractions accordingly."
+        )}
+
+
+class Turn:
+    """One guest message on its way through the pipeline."""
+
+    def __init__(self, user_input, room_number, context=None, request_id=None):
+        self.user_input = user_input
+        self.room_number = room_number
+        self.request_id = request_id    # client's id for the message; a retry of it isn't remembered twice
+        self.context = context      # get_full_context() result, None if the room is unknown
+        self.resident_id = None     # guest the turn belongs to; memory is read and written for them only
+        self.messages = None        # LLM message stack, None when no LLM call is needed
+        self.reply = None           # set up front when answered without the LLM
+        self.cache_key = None       # answer_cache key for hotel-wide questions
+        self.cached = False
+        self.intent = None          # fast_path intent when answered from a template
+        self.tools = None           # device tools, offered only when the message may ask for a change
+        self.actions = []           # DeviceActions the model asked for
+        self.estimate = 0           # tokens reserved with the scheduler for this turn
+        self.trace = tracing.NOOP   # stage timings and token counts (tracing.py)
+
+
+def build_messages(user_input, room_number, context_data, sections=None, history=True):
+    """Message stack for one turn: system prompt, earlier turns (if `history`), then the question with its context."""
+    context_text, _ = encode_context(context_data, sections)
+
+    # Only the bare question is stored in memory, so it is never sent twice
+    messages = [build_system_prompt(context_data, room_number)]
+    if history:
+        resident = context_data.get("resident")
+        messages += conversation_history.messages(room_number, resident["resident_id"] if resident else None)
+    messages.append({"role": "user", "content": f"{CONTEXT_FORMAT_NOTE}\nContext:\n{context_text}\n\nUser question: {user_input}"})
+    return messages
+
+
+def plan_turn(user_input, room_number, trace=tracing.NOOP, request_id=None):
+    """Fetch context and decide how to answer: template, cached answer, or the messages for the LLM."""
+    # 1. Get Context Data from hotel_db.py
+    with trace.span("context"):
+        context_data = db.get_full_context(room_number)
+    turn = Turn(user_input, room_number, request_id=request_id)
+    turn.trace = trace
+
+    if not context_data or "error" in context_data:
+        turn.reply = NO_ROOM_REPLY
+        trace.set(path="no_room")
+        return turn
+    turn.context = context_data
+
+    # Forget the previous guest's conversation once they've checked out or a new guest moved in
+    resident = context_data.get("resident")
+    turn.resident_id = resident["resident_id"] if resident else None
+    conversation_history.bind_resident(room_number, turn.resident_id)
+
+    # 2. Straight lookups (wifi, last cleaning, today's menu) answered from a template
+    if FAST_PATH:
+        fast = fast_answer(user_input, context_data)
+        if fast is not None:
+            turn.intent, turn.reply = fast
+            trace.set(path="fast_path", intent=turn.intent)
+            return turn
+
+    # Device requests go to the model with the tools; they are never shared answers
+    if DEVICE_CONTROL and wants_devices(user_input):
+        turn.tools = DEVICE_TOOLS
+
+    # 3. Hotel-wide questions another room already asked
+    if CACHE_ANSWERS and turn.tools is None:
+        turn.cache_key = answer_cache.key_for(user_input, context_data)
+        cached = answer_cache.get(turn.cache_key)
+        if cached is not None:
+            turn.reply = cached
+            turn.cached = True
+            trace.set(path="answer_cache")
+            return turn
+
+    # 4. Only the sections relevant to the question (None = all), compactly encoded.
+    # Shareable answers are generated without the guest's own details or earlier turns,
+    # so nothing from this room's conversation ends up in another room's reply.
+    with trace.span("prompt"):
+        sections = select_sections(user_input, context_data) if SELECT_SECTIONS else None
+        if turn.cache_key is not None and sections is not None:
+            sections = set(sections) - set(ALWAYS_INCLUDE)
+        turn.messages = build_messages(user_input, room_number, context_data, sections,
+                                       history=turn.cache_key is None)
+        turn.estimate = estimate_tokens(turn)
+    trace.set(path="llm", tools=turn.tools is not None)
+    return turn
+
+
+def estimate_tokens(turn):
+    prompt = sum(count_tokens(message["content"]) for message in turn.messages)
+    if turn.tools:
+        prompt += TOOLS_TOKENS
+    return prompt + REPLY_TOKENS_ESTIMATE
+
+
+def settle_usage(turn, usage=None):
+    """Tell the scheduler what the turn really cost (API usage, else counted locally)."""
+    if usage is not None and getattr(usage, "total_tokens", None):
+        actual = usage.total_tokens
+        prompt, completion = getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    else:
+        prompt, completion = turn.estimate - REPLY_TOKENS_ESTIMATE, count_tokens(turn.reply or "")
+        actual = prompt + completion
+    scheduler.settle(turn.estimate, actual)
+    turn.trace.set(prompt_tokens=prompt, completion_tokens=completion)
+
+
+def completion_args(turn, stream=False):
+    args = {"model": MODEL, "messages": turn.messages}
+    if turn.tools:
+        args["tools"] = turn.tools
+        args["tool_choice"] = "auto"
+    if stream:
+        args["stream"] = True
+    return args
+
+
+def request_completion(turn, stream=False):
+    """Send the turn through the scheduler; time spent queued (and backing off) is traced apart from the request."""
+    waiting = time.perf_counter()
+
+    def send():
+        nonlocal waiting
+        turn.trace.add("llm_queue", time.perf_counter() - waiting)
+        try:
+            with turn.trace.span("llm_request"):
+                return client.chat.completions.create(**completion_args(turn, stream))
+        finally:
+            waiting = time.perf_counter()
+
+    return scheduler.call(send, turn.estimate, INTERACTIVE)
+
+
+async def arequest_completion(turn, stream=False):
+    waiting = time.perf_counter()
+
+    async def send():
+        nonlocal waiting
+        turn.trace.add("llm_queue", time.perf_counter() - waiting)
+        try:
+            with turn.trace.span("llm_request"):
+                return await async_client.chat.completions.create(**completion_args(turn, stream))
+        finally:
+            waiting = time.perf_counter()
+
+    return await scheduler.acall(send, turn.estimate, INTERACTIVE)
+
+
+def begin_trace(room_number):
+    """The caller's active trace (ChatWorker, server.py), else a new one that the chat call finishes itself."""
+    trace = tracing.current()
+    if trace is not None:
+        return trace, False
+    return tracing.start("chat", room=room_number), True
+
+
+def dispatch_actions(turn, tool_calls):
+    """Hand the model's device commands to the dispatcher; returns a confirmation if the model wrote no reply."""
+    turn.actions = parse_tool_calls(tool_calls)
+    if not turn.actions:
+        return None
+    devices.submit(turn.room_number, turn.context.get("room"), turn.actions)
+    return describe_actions(turn.actions)
+
+
+def collect_tool_calls(calls, deltas):
+    """Merge streamed tool-call fragments (keyed by index) into complete calls."""
+    for delta in deltas or []:
+        call = calls.setdefault(delta.index, {"function": {"name": "", "arguments": ""}})
+        if delta.function is not None:
+            call["function"]["name"] += delta.function.name or ""
+            call["function"]["arguments"] += delta.function.arguments or ""
+
+
+def finish_turn(turn):
+    if turn.context is None:
+        return
+    with turn.trace.span("remember"):
+        remember(turn.room_number, turn.resident_id, turn.user_input, turn.reply, turn.request_id)
+        if turn.cache_key is not None and not turn.cached:
+            answer_cache.put(turn.cache_key, turn.reply, turn.context)
+
+
+def remember(room_number, resident_id, user_input, reply, request_id=None):
+    # Save the exchange to memory
+    conversation_history.append(room_number, resident_id, user_input, reply, request_id)
+
+
+def chat(user_input, room_number, request_id=None):
+    trace, owned = begin_trace(room_number)
+    try:
+        turn = plan_turn(user_input, room_number, trace, request_id)
+        if turn.reply is None:
+            response = request_completion(turn)
+            message = response.choices[0].message
+            confirmation = dispatch_actions(turn, message.tool_calls)
+            turn.reply = message.content or confirmation or ""
+            settle_usage(turn, getattr(response, "usage", None))
+
+        finish_turn(turn)
+        return turn.reply
+    except Exception as e:
+        trace.fail(e)
+        raise
+    finally:
+        if owned:
+            trace.finish()
+
+
+def chat_stream(user_input, room_number, request_id=None):
+    """
+    Same as chat(), but yields the reply in pieces as the model produces them.
+    The full reply is saved to conversation_history once the stream ends; closing
+    the generator early closes the HTTP stream and nothing is remembered.
+    """
+    trace, owned = begin_trace(room_number)
+    try:
+        turn = plan_turn(user_input, room_number, trace, request_id)
+        if turn.reply is not None:
+            yield turn.reply
+            finish_turn(turn)
+            return
+
+        stream = request_completion(turn, stream=True)
+
+        parts = []
+        calls = {}
+        try:
+            with trace.span("llm_stream"):
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    collect_tool_calls(calls, delta.tool_calls)
+                    if delta.content:
+                        trace.mark("first_token")
+                        parts.append(delta.content)
+                        yield delta.content
+        finally:
+            # Also runs when the caller closes this generator early (a cancelled request)
+            stream.close()
+
+        confirmation = dispatch_actions(turn, [calls[i] for i in sorted(calls)])
+        if not parts and confirmation:
+            parts.append(confirmation)
+            yield confirmation
+        turn.reply = "".join(parts)
+        settle_usage(turn)
+        finish_turn(turn)
+    except Exception as e:
+        trace.fail(e)
+        raise
+    finally:
+        if owned:
+            trace.finish()
+
+
+# ----------------------------------
+# ASYNC VARIANTS (server.py)
+# ----------------------------------
+async def achat_stream(user_input, room_number, request_id=None):
+    """chat_stream() for the event loop: DB work runs in a thread, the LLM call is awaited."""
+    trace, owned = begin_trace(room_number)
+    try:
+        turn = await asyncio.to_thread(plan_turn, user_input, room_number, trace, request_id)
+        if turn.reply is not None:
+            yield turn.reply
+            finish_turn(turn)
+            return
+
+        stream = await arequest_completion(turn, stream=True)
+
+        parts = []
+        calls = {}
+        try:
+            with trace.span("llm_stream"):
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    collect_tool_calls(calls, delta.tool_calls)
+                    if delta.content:
+                        trace.mark("first_token")
+                        parts.append(delta.content)
+                        yield delta.content
+        finally:
+            # Also runs when the caller closes this generator early (client went away)
+            await stream.close()
+
+        confirmation = dispatch_actions(turn, [calls[i] for i in sorted(calls)])
+        if not parts and confirmation:
+            parts.append(confirmation)
+            yield confirmation
+        turn.reply = "".join(parts)
+        settle_usage(turn)
+        finish_turn(turn)
+    except Exception as e:
+        trace.fail(e)
+        raise
+    finally:
+        if owned:
+            trace.finish()
+
+
+async def achat(user_input, room_number):
+    return "".join([chunk async for chunk in achat_stream(user_input, room_number)])
@@ -0,0 +1,130 @@
+import argparse
+import json
+import statistics
+import time
+from hotel_db import DatabaseLoader
+from context_encoder import encode_context, count_tokens, clear_memo
+from context_retriever import select_sections
+
+# ----------------------------------
+# Prompt size: str(context) vs context_encoder
+# ----------------------------------
+# Run from main/:
+#   python -m bench.context_tokens                      # token/size comparison, offline
+#   python -m bench.context_tokens --live 5             # also time real LLM calls (needs GROQ_API_KEY)
+
+QUESTION = "When was my room last cleaned?"
+
+
+def sample_questions(path="prompts.txt"):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and line.strip() != "You sent"]
+
+
+def room_numbers(db):
+    with db.pool.connection() as conn:
+        return [r[0] for r in conn.execute("SELECT room_number FROM rooms ORDER BY room_number")]
+
+
+def timed(fn, repeat, setup=None):
+    """Median ms of fn(); `setup` runs before each call, outside the timing."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def compare_selection(db, room, questions, repeat):
+    context = db.get_full_context(room)
+    full = encode_context(context)[1]
+    per_question, select_ms = {}, []
+    for q in questions:
+        sections = select_sections(q, context)
+        per_question[q] = {
+            "sections": sorted(sections) if sections else "all",
+            "tokens": encode_context(context, sections)[1],
+        }
+        select_ms.append(timed(lambda: select_sections(q, context), repeat))
+    return {
+        "full_context_tokens": full,
+        "selected_tokens_mean": round(statistics.mean(v["tokens"] for v in per_question.values()), 1),
+        "select_ms_median": round(statistics.median(select_ms), 4),
+        "questions": per_question,
+    }
+
+
+def compare_sizes(db, rooms, repeat):
+    repr_tokens, compact_tokens, repr_chars, compact_chars = [], [], [], []
+    repr_ms, compact_ms, memo_hit_ms = [], [], []
+    for room in rooms:
+        context = db.get_full_context(room)
+        if "error" in context:
+            continue
+        as_repr = str(context)
+        compact, tokens = encode_context(context)
+        repr_tokens.append(count_tokens(as_repr))
+        compact_tokens.append(tokens)
+        repr_chars.append(len(as_repr))
+        compact_chars.append(len(compact))
+        repr_ms.append(timed(lambda: str(context), repeat))
+        # Sections are memoized by identity, so repeating the call on the same dict only
+        # times lookups; the memo is cleared before each cold sample
+        compact_ms.append(timed(lambda: encode_context(context), repeat, setup=clear_memo))
+        memo_hit_ms.append(timed(lambda: encode_context(context), repeat))
+
+    return {
+        "rooms": len(repr_tokens),
+        "repr_tokens_mean": round(statistics.mean(repr_tokens), 1),
+        "compact_tokens_mean": round(statistics.mean(compact_tokens), 1),
+        "token_reduction": round(1 - sum(compact_tokens) / sum(repr_tokens), 3),
+        "repr_chars_mean": round(statistics.mean(repr_chars), 1),
+        "compact_chars_mean": round(statistics.mean(compact_chars), 1),
+        "repr_encode_ms_median": round(statistics.median(repr_ms), 4),
+        "compact_encode_ms_median": round(statistics.median(compact_ms), 4),
+        "compact_memo_hit_ms_median": round(statistics.median(memo_hit_ms), 4),
+    }
+
+
+def compare_live(db, room, calls):
+    from assistant import client, MODEL, build_system_prompt
+
+    context = db.get_full_context(room)
+    variants = {"repr": str(context), "compact": encode_context(context)[0]}
+    results = {}
+    for label, context_text in variants.items():
+        messages = [build_system_prompt(context, room),
+                    {"role": "user", "content": f"Context:\n{context_text}\n\nUser question: {QUESTION}"}]
+        latencies, prompt_tokens = [], []
+        for _ in range(calls):
+            start = time.perf_counter()
+            response = client.chat.completions.create(model=MODEL, messages=messages)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.usage:
+                prompt_tokens.append(response.usage.prompt_tokens)
+        results[label] = {
+            "latency_ms_median": round(statistics.median(latencies), 1),
+            "prompt_tokens": prompt_tokens[0] if prompt_tokens else None,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt context encodings")
+    parser.add_argument("--db", default="data/hotel.db")
+    parser.add_argument("--repeat", type=int, default=200, help="encode timings per room")
+    parser.add_argument("--live", type=int, default=0, metavar="N", help="LLM calls per variant (0 = offline only)")
+    parser.add_argument("--room", default="111", help="room used for section selection and --live")
+    args = parser.parse_args()
+
+    db = DatabaseLoader(args.db)
+    report = {
+        "sizes": compare_sizes(db, room_numbers(db), args.repeat),
+        "selection": compare_selection(db, args.room, sample_questions(), args.repeat),
+    }
+    if args.live:
+        report["live"] = compare_live(db, args.room, args.live)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,210 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sqlite3
+import time
+import tracemalloc
+from datetime import datetime
+from hotel_db import DatabaseLoader
+from data.db_manager import DatabaseManager
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+# ----------------------------------
+# Data-layer benchmark
+# ----------------------------------
+# Latency percentiles and memory for the calls every chat turn and the admin tool make:
+# get_full_context (cold, i.e. no ContextCache, and cached), get_resident_from_token
+# (hit / voided / unknown), get_active_rooms, and DatabaseManager's list and add/delete
+# calls. Meant for a database from bench.synth_hotel; CRUD cases delete what they add,
+# but don't point it at the live hotel.db. Results go to JSON so runs can be compared.
+# Run from main/:
+#   python -m bench.data_layer --db data/synth_hotel.db --out bench-before.json
+#   python -m bench.data_layer --db data/synth_hotel.db --compare bench-before.json
+
+ITERATIONS = 500        # timed calls per case (CRUD cases use a fifth of this)
+MEMORY_CALLS = 20       # calls per case under tracemalloc (kept out of the timed loop)
+
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+    return {
+        "n": len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+    }
+
+
+def rss_mb():
+    """Peak resident set size of this process so far (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if platform.system() == "Darwin" else 2 ** 10), 1)
+
+
+def run_case(fn, args_list, iterations):
+    """Time fn(*args) over args_list (cycled), then measure Python allocations for a few calls."""
+    samples = []
+    for i in range(iterations):
+        args = args_list[i % len(args_list)]
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    result = percentiles(samples)
+
+    tracemalloc.start()
+    try:
+        for i in range(min(MEMORY_CALLS, iterations)):
+            fn(*args_list[i % len(args_list)])
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result["py_peak_kb"] = round(peak / 1024, 1)
+    result["py_retained_kb"] = round(current / 1024, 1)
+    result["rss_peak_mb"] = rss_mb()
+    return result
+
+
+def sample(conn, sql, limit, rng):
+    rows = [r[0] for r in conn.execute(sql)]
+    return rng.sample(rows, min(limit, len(rows)))
+
+
+def table_counts(conn):
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+
+def loader_cases(db_path, iterations, rng):
+    cold = DatabaseLoader(db_path, use_cache=False)
+    cached = DatabaseLoader(db_path)
+    with cold.pool.connection() as conn:
+        rooms = sample(conn, "SELECT room_number FROM rooms", 1000, rng)
+        active = sample(conn, "SELECT device_token FROM residents WHERE token_voided = 0", 1000, rng)
+        voided = sample(conn, "SELECT device_token FROM residents WHERE token_voided = 1", 1000, rng)
+    unknown = [str(rng.getrandbits(128))]
+
+    for room in rooms:   # fill the cache so the cached case measures hits only
+        cached.get_full_context(room)
+
+    cases = {
+        "get_full_context.cold": (cold.get_full_context, [(r,) for r in rooms]),
+        "get_full_context.cached": (cached.get_full_context, [(r,) for r in rooms]),
+        "get_resident_from_token.active": (cold.get_resident_from_token, [(t,) for t in active]),
+        "get_resident_from_token.voided": (cold.get_resident_from_token, [(t,) for t in voided]),
+        "get_resident_from_token.unknown": (cold.get_resident_from_token, [(t,) for t in unknown]),
+        "get_active_rooms": (cold.get_active_rooms, [()]),
+    }
+    return {name: run_case(fn, args, iterations) for name, (fn, args) in cases.items() if args}
+
+
+def manager_cases(db_path, iterations, rng):
+    db = DatabaseManager(db_path)
+    with db.pool.connection() as conn:
+        rooms = sample(conn, "SELECT room_number FROM rooms", 100, rng)
+        building_id = conn.execute("SELECT MIN(building_id) FROM buildings").fetchone()[0]
+    crud_iterations = max(1, iterations // 5)
+    results = {}
+
+    def case(name, fn, args_list, count):
+        try:
+            # The manager prints a line per write; keep it out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = run_case(fn, args_list, count)
+        except sqlite3.Error as e:
+            results[name] = {"error": str(e)}
+
+    def last_id(table, column):
+        with db.pool.connection() as conn:
+            return conn.execute(f"SELECT MAX({column}) FROM {table}").fetchone()[0]
+
+    for name in ("list_residents", "list_buildings", "list_rooms", "list_amenities"):
+        case(f"DatabaseManager.{name}", getattr(db, name), [()], max(1, iterations // 10))
+
+    # Add/delete pairs leave the tables as they were; each timed call is one committed write
+    def add_delete_resident(room):
+        db.add_resident("Bench Guest", room)
+        db.delete_resident(last_id("residents", "resident_id"))
+
+    def add_delete_building(i):
+        db.add_building(f"Bench Building {i}")
+        db.delete_building(last_id("buildings", "building_id"))
+
+    def add_delete_room(i):
+        db.add_room(f"BENCH-{i}", building_id, 1, "Bench Room")
+        db.delete_room(f"BENCH-{i}")
+
+    def add_delete_amenity():
+        db.add_amenity(building_id, "Bench Amenity", "Benchmark row", 1)
+        db.delete_amenity(last_id("amenities", "amenity_id"))
+
+    case("DatabaseManager.add_delete_resident", add_delete_resident, [(r,) for r in rooms], crud_iterations)
+    case("DatabaseManager.add_delete_building", add_delete_building, [(i,) for i in range(crud_iterations)],
+         crud_iterations)
+    case("DatabaseManager.add_delete_room", add_delete_room, [(i,) for i in range(crud_iterations)], crud_iterations)
+    case("DatabaseManager.add_delete_amenity", add_delete_amenity, [()], crud_iterations)
+    return results
+
+
+def compare(report, baseline):
+    """Print p50/p95/p99 change per case against an earlier report."""
+    print(f"{'case':<40} {'p50':>16} {'p95':>16} {'p99':>16}")
+    for name, result in report["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if "error" in result or not before or "error" in before:
+            continue
+        cells = []
+        for q in ("p50", "p95", "p99"):
+            change = (result[q] / before[q] - 1) * 100 if before[q] else 0.0
+            cells.append(f"{result[q]:.3f}ms {change:+5.0f}%")
+        print(f"{name:<40} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseLoader and DatabaseManager calls")
+    parser.add_argument("--db", default="data/synth_hotel.db")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--seed", type=int, default=42, help="picks the sampled rooms and tokens")
+    parser.add_argument("--skip-crud", action="store_true", help="read-only cases only")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", metavar="JSON", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    loader = DatabaseLoader(args.db, use_cache=False)
+    with loader.pool.connection() as conn:
+        counts = table_counts(conn)
+    started = time.perf_counter()
+    cases = loader_cases(args.db, args.iterations, rng)
+    if not args.skip_crud:
+        cases.update(manager_cases(args.db, args.iterations, rng))
+    report = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "db": args.db,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": args.iterations,
+        "rows": counts,
+        "seconds": round(time.perf_counter() - started, 2),
+        "rss_peak_mb": rss_mb(),
+        "cases": cases,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    else:
+        print(json.dumps(report, indent=2))
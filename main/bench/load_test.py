@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+from hotel_db import DatabaseLoader, DB_PATH
+from bench.data_layer import percentiles
+
+# ----------------------------------
+# Multi-device load generator
+# ----------------------------------
+# Simulates many kiosks at once. Each device logs in with its own resident's token (like
+# t.py does), then replays scripted guest conversations with think time between turns,
+# until the test ends. Two targets:
+#   server     POST /chat (streaming) on server.py, the hotel-wide deployment
+#   inprocess  assistant.chat_stream() on one thread per device, the per-kiosk path
+# The report has throughput, time to first chunk and full-reply latency percentiles, how
+# many turns were in flight, errors by kind, and the LLM scheduler's queueing stats
+# (from /health, or the in-process scheduler). Against bench/mock_llm.py it sizes the
+# whole pipeline without Groq. Run from main/, with an LLM budget that matches the
+# provider plan being sized (the database built with --now $(date +%F), or the server's
+# token sweeper voids every synthetic guest):
+#   python -m bench.mock_llm --port 8700 &
+#   TAVV_DB=data/synth_hotel.db GROQ_BASE_URL=http://127.0.0.1:8700 GROQ_API_KEY=mock \
+#       TAVV_LLM_RPM=6000 TAVV_LLM_TPM=3000000 python server.py &
+#   python -m bench.load_test --db data/synth_hotel.db --devices 300 --duration 120 \
+#       --mock-url http://127.0.0.1:8700 --out load-300.json
+# Conversations are remembered per room like real ones (and saved to data/sessions.db).
+
+CONVERSATIONS = [
+    ["Hi! I just checked in", "When was my room last cleaned?", "Thanks. What's the wifi password?"],
+    ["I'm famished", "What's on the menu for lunch today?", "Is there anything vegetarian?"],
+    ["Im feeling chilly in here", "Can you make it a bit warmer?", "Thank you"],
+    ["I wanna go out for a swim", "Which pool is best for kids?", "What water sports can we try?"],
+    ["I wanna watch something", "Put Netflix on the TV", "Turn the fan off too"],
+    ["What restaurants are nearby?", "Any fun places to visit around here?", "How far is Monte Maria?"],
+    ["I need a connection"],
+    ["It's too bright", "Can you turn the TV off?"],
+]
+
+
+def device_tokens(db_path, count, rng):
+    with DatabaseLoader(db_path, use_cache=False).pool.connection() as conn:
+        tokens = [r[0] for r in conn.execute("SELECT device_token FROM residents WHERE token_voided = 0")]
+    if not tokens:
+        raise SystemExit(f"No checked-in residents in {db_path}")
+    if len(tokens) < count:
+        print(f"Only {len(tokens)} checked-in residents; some devices share a token")
+        return [tokens[i % len(tokens)] for i in range(count)]
+    return rng.sample(tokens, count)
+
+
+class ServerTarget:
+    """Chat through server.py over HTTP."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.session = None
+
+    async def start(self):
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                             timeout=aiohttp.ClientTimeout(total=300))
+
+    async def login(self, token):
+        return token
+
+    async def turn(self, device, message):
+        """(seconds to first chunk or None, error kind or None)"""
+        start = time.perf_counter()
+        first = None
+        async with self.session.post(self.url + "/chat", json={"message": message, "stream": True},
+                                     headers={"Authorization": f"Bearer {device}"}) as response:
+            if response.status != 200:
+                await response.read()
+                return None, f"http_{response.status}"
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if "error" in event:
+                    return first, "stream_error"
+                if "chunk" in event and first is None:
+                    first = time.perf_counter() - start
+        return first, None
+
+    async def queue_stats(self):
+        async with self.session.get(self.url + "/health") as response:
+            return await response.json()
+
+    async def close(self):
+        await self.session.close()
+
+
+class InProcessTarget:
+    """Call assistant.chat_stream directly, one thread per device like the kiosk's ChatWorker."""
+
+    def __init__(self, devices, db_path):
+        # assistant opens its database on import; make it the one the tokens came from
+        os.environ["TAVV_DB"] = db_path
+        import assistant
+        from llm_scheduler import Overloaded
+        self.assistant = assistant
+        self.overloaded = Overloaded
+        self.pool = ThreadPoolExecutor(max_workers=devices, thread_name_prefix="device")
+        self.active = 0
+        self.active_lock = threading.Lock()   # updated from every device thread
+
+    async def start(self):
+        pass
+
+    async def login(self, token):
+        resident = await asyncio.get_running_loop().run_in_executor(
+            self.pool, self.assistant.db.get_resident_from_token, token)
+        return resident["room_number"] if resident else None
+
+    def _turn(self, room_number, message):
+        start = time.perf_counter()
+        first = None
+        with self.active_lock:
+            self.active += 1
+        try:
+            for _ in self.assistant.chat_stream(message, room_number):
+                if first is None:
+                    first = time.perf_counter() - start
+        except self.overloaded:
+            return first, "overloaded"
+        except Exception as e:
+            return first, type(e).__name__
+        finally:
+            with self.active_lock:
+                self.active -= 1
+        return first, None
+
+    async def turn(self, device, message):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._turn, device, message)
+
+    async def queue_stats(self):
+        return {"active_chats": self.active, "llm": self.assistant.scheduler.stats()}
+
+    async def close(self):
+        self.pool.shutdown(wait=False)
+
+
+class LoadTest:
+    def __init__(self, target, tokens, duration, ramp, think, seed):
+        self.target = target
+        self.tokens = tokens
+        self.duration = duration
+        self.ramp = ramp
+        self.think = think
+        self.rng = random.Random(seed)
+        self.ttft = []
+        self.latency = []
+        self.errors = collections.Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.max_active_chats = 0
+        self.max_llm_queued = 0
+        self.logins_failed = 0
+
+    async def device(self, token, deadline):
+        await asyncio.sleep(self.rng.uniform(0, self.ramp))
+        device = await self.target.login(token)
+        if device is None:
+            self.logins_failed += 1
+            return
+        while time.monotonic() < deadline:
+            for message in self.rng.choice(CONVERSATIONS):
+                if time.monotonic() >= deadline:
+                    return
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                start = time.perf_counter()
+                try:
+                    first, error = await self.target.turn(device, message)
+                except Exception as e:
+                    first, error = None, type(e).__name__
+                finally:
+                    self.in_flight -= 1
+                if error:
+                    self.errors[error] += 1
+                else:
+                    self.latency.append((time.perf_counter() - start) * 1000)
+                    if first is not None:
+                        self.ttft.append(first * 1000)
+                await asyncio.sleep(self.rng.expovariate(1.0 / self.think) if self.think > 0 else 0)
+
+    async def sample_queues(self):
+        # Peak server-side concurrency and LLM queue depth while the test runs
+        while True:
+            await asyncio.sleep(1)
+            try:
+                stats = await self.target.queue_stats()
+            except Exception:
+                continue
+            self.max_active_chats = max(self.max_active_chats, stats.get("active_chats", 0))
+            queued = stats.get("llm", {}).get("queued", {})
+            self.max_llm_queued = max(self.max_llm_queued, sum(queued.values()))
+
+    async def run(self):
+        await self.target.start()
+        sampler = asyncio.create_task(self.sample_queues())
+        started = time.monotonic()
+        deadline = started + self.duration
+        try:
+            await asyncio.gather(*(self.device(token, deadline) for token in self.tokens))
+            elapsed = time.monotonic() - started
+            final = await self.target.queue_stats()
+        finally:
+            sampler.cancel()
+            await self.target.close()
+
+        completed = len(self.latency)
+        return {
+            "devices": len(self.tokens),
+            "elapsed_s": round(elapsed, 1),
+            "turns_ok": completed,
+            "turns_failed": sum(self.errors.values()),
+            "errors": dict(self.errors),
+            "logins_failed": self.logins_failed,
+            "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "first_chunk_ms": percentiles(self.ttft) if self.ttft else None,
+            "reply_ms": percentiles(self.latency) if self.latency else None,
+            "queueing": {
+                "max_turns_in_flight": self.max_in_flight,
+                "max_active_chats": self.max_active_chats,
+                "max_llm_queued": self.max_llm_queued,
+                "llm_scheduler": final.get("llm"),
+            },
+        }
+
+
+async def fetch_json(url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            return await response.json()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many kiosks chatting at once")
+    parser.add_argument("--target", choices=["server", "inprocess"], default="server")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="server.py address (--target server)")
+    parser.add_argument("--db", default=DB_PATH, help="database the device tokens come from")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp", type=float, default=10, help="devices start spread over this many seconds")
+    parser.add_argument("--think", type=float, default=5, help="mean seconds between a reply and the next message")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mock-url", help="bench.mock_llm address, to include its /stats")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tokens = device_tokens(args.db, args.devices, rng)
+    target = ServerTarget(args.url) if args.target == "server" else InProcessTarget(args.devices, args.db)
+    report = {"target": args.target, "think_s": args.think, "ramp_s": args.ramp}
+    report.update(asyncio.run(LoadTest(target, tokens, args.duration, args.ramp, args.think, args.seed).run()))
+    if args.mock_url:
+        report["mock_llm"] = asyncio.run(fetch_json(args.mock_url.rstrip("/") + "/stats"))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
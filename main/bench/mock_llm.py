@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from aiohttp import web
+
+# ----------------------------------
+# Mock LLM endpoint
+# ----------------------------------
+# A local OpenAI-compatible chat completions server (the subset the Groq SDK uses), so
+# chat() / server.py can be load-tested without the live API or its rate limits:
+#   - time to first token and time per output token drawn from configurable distributions
+#   - SSE streaming like the real API, or a single JSON body
+#   - injected failures: 500s, 429s with Retry-After, and streams that break midway
+#   - a concurrency cap that makes extra requests queue, like a saturated provider
+# Run from main/ and point the assistant at it:
+#   python -m bench.mock_llm --port 8700 --ttft lognormal:350,0.5 --tpot 12 --error-rate 0.01
+#   GROQ_BASE_URL=http://127.0.0.1:8700 GROQ_API_KEY=mock python server.py
+# GET /stats reports what the mock served and injected.
+
+REPLIES = [
+    "Your room was last cleaned this morning by our housekeeping team.",
+    "The Wi-Fi network for your building is listed on the card by the door, and I can read it out for you.",
+    "Island Cafe is serving a breakfast buffet today, followed by grilled chicken salad and a vegetable stir fry for lunch.",
+    "The Main Pool is open until 9 PM, and the Kids Pool has shallow water and small slides.",
+    "I've set the thermostat a little warmer for you. Let me know if you'd like it adjusted again.",
+    "Kayaking and snorkeling are available along the cove; the front desk can book a slot for you.",
+]
+
+
+def parse_distribution(spec):
+    """
+    Milliseconds sampler from "fixed:MS", "uniform:LO,HI", "exp:MEAN" or
+    "lognormal:MEDIAN,SIGMA" (a plain number means fixed).
+    """
+    kind, _, params = spec.partition(":")
+    if not params:
+        kind, params = "fixed", kind
+    values = [float(v) for v in params.split(",")]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+        return lambda rng: rng.lognormvariate(0, sigma) * median
+    raise ValueError(f"Unknown distribution '{spec}'")
+
+
+def approx_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class MockLLM:
+    def __init__(self, ttft="lognormal:300,0.5", tpot="fixed:10", reply_tokens=60, error_rate=0.0,
+                 rate_limit_rate=0.0, drop_rate=0.0, retry_after=1.0, max_concurrent=0, seed=None):
+        self.rng = random.Random(seed)
+        self.ttft = parse_distribution(ttft)
+        self.tpot = parse_distribution(tpot)
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.drop_rate = drop_rate
+        self.retry_after = retry_after
+        self.slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self.started = time.monotonic()
+        self.stats = {
+            "requests": 0, "streamed": 0, "in_flight": 0, "max_in_flight": 0, "queued": 0, "max_queued": 0,
+            "errors_500": 0, "errors_429": 0, "dropped_streams": 0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    def reply_words(self, max_tokens):
+        # Roughly one streamed chunk per output token (a word plus its space)
+        words = []
+        while len(words) < self.reply_tokens:
+            words.extend(self.rng.choice(REPLIES).split())
+        words = words[:self.reply_tokens]
+        if max_tokens:
+            words = words[:max_tokens]
+        return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    async def handle_models(self, request):
+        return web.json_response({"object": "list", "data": [
+            {"id": "openai/gpt-oss-20b", "object": "model", "created": 0, "owned_by": "mock"},
+        ]})
+
+    async def handle_stats(self, request):
+        return web.json_response(dict(self.stats, uptime_s=round(time.monotonic() - self.started, 1)))
+
+    async def handle_completions(self, request):
+        body = await request.json()
+        self.stats["requests"] += 1
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.stats["errors_429"] += 1
+            return web.json_response({"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                                     status=429, headers={"retry-after": str(self.retry_after)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats["errors_500"] += 1
+            return web.json_response({"error": {"message": "Internal error (mock)", "type": "server_error"}},
+                                     status=500)
+
+        if self.slots is None:
+            return await self.complete(request, body)
+        self.stats["queued"] += 1
+        self.stats["max_queued"] = max(self.stats["max_queued"], self.stats["queued"])
+        try:
+            await self.slots.acquire()
+        finally:
+            self.stats["queued"] -= 1
+        try:
+            return await self.complete(request, body)
+        finally:
+            self.slots.release()
+
+    async def complete(self, request, body):
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        try:
+            prompt_tokens = sum(approx_tokens(str(m.get("content") or "")) for m in body.get("messages", []))
+            words = self.reply_words(body.get("max_completion_tokens") or body.get("max_tokens"))
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                     "total_tokens": prompt_tokens + len(words)}
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += len(words)
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            model = body.get("model", "mock")
+            await asyncio.sleep(self.ttft(self.rng) / 1000)
+
+            if not body.get("stream"):
+                await asyncio.sleep(sum(self.tpot(self.rng) for _ in words) / 1000)
+                return web.json_response({
+                    "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(words)}}],
+                    "usage": usage,
+                })
+            self.stats["streamed"] += 1
+            return await self.stream(request, completion_id, model, words, usage)
+        finally:
+            self.stats["in_flight"] -= 1
+
+    async def stream(self, request, completion_id, model, words, usage):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        def event(delta, finish_reason=None, **extra):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            chunk.update(extra)
+            return b"data: " + json.dumps(chunk).encode() + b"\n\n"
+
+        drop_at = len(words) // 2 if self.rng.random() < self.drop_rate else None
+        await response.write(event({"role": "assistant", "content": ""}))
+        for i, word in enumerate(words):
+            if i == drop_at:
+                # Connection lost mid-reply: no finish_reason, no [DONE]
+                self.stats["dropped_streams"] += 1
+                request.transport.close()
+                return response
+            await response.write(event({"content": word}))
+            await asyncio.sleep(self.tpot(self.rng) / 1000)
+        # Groq reports usage on the last chunk under x_groq
+        await response.write(event({}, "stop", x_groq={"id": completion_id, "usage": usage}))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def create_app(mock):
+    app = web.Application()
+    # Groq's SDK calls /openai/v1/...; plain OpenAI clients call /v1/...
+    for prefix in ("/openai/v1", "/v1"):
+        app.router.add_post(prefix + "/chat/completions", mock.handle_completions)
+        app.router.add_get(prefix + "/models", mock.handle_models)
+    app.router.add_get("/stats", mock.handle_stats)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--ttft", default="lognormal:300,0.5", help="time to first token (ms distribution)")
+    parser.add_argument("--tpot", default="fixed:10", help="time per output token (ms distribution)")
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds, sent with 429s")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of streams cut off halfway")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="requests served at once (0 = no cap)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    async def make_app():
+        # The semaphore must be created on the server's event loop
+        return create_app(MockLLM(args.ttft, args.tpot, args.reply_tokens, args.error_rate, args.rate_limit_rate,
+                                  args.drop_rate, args.retry_after, args.max_concurrent, args.seed))
+
+    web.run_app(make_app(), host=args.host, port=args.port)
@@ -0,0 +1,202 @@
+import argparse
+import datetime
+import os
+import random
+import time
+import uuid
+from db_pool import get_pool, executemany_chunked
+from migrations import migrate
+
+# ----------------------------------
+# Synthetic large hotel
+# ----------------------------------
+# data/seed_db.py seeds 30 rooms, which says nothing about how the data layer behaves in
+# a real resort. This builds a separate database of any size with the same schema
+# (migrations.py): N buildings of floors x rooms, a year of guest stays per room (past
+# stays checked out and voided, ~occupancy of rooms with a guest in now), housekeeping
+# history, and a full weekly menu per restaurant. Every timestamp is counted back from
+# --now (a fixed date by default, not the clock), so the same --seed and --now give the
+# same database.
+# Run from main/:
+#   python -m bench.synth_hotel                               # defaults below, ~1M housekeeping rows
+#   python -m bench.synth_hotel --buildings 2 --housekeeping 10000 --residents 2000
+#   python -m bench.synth_hotel --now $(date +%F)             # for server.py, whose sweeper
+#                                                             # voids tokens past checkout
+# then point bench.data_layer at it (--db data/synth_hotel.db).
+
+DB_PATH = "data/synth_hotel.db"
+EPOCH = datetime.datetime(2026, 1, 1, 12, 0, 0)   # default --now: the end of the generated history
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MEALS = ["Breakfast", "Lunch", "Dinner"]
+DISHES = ["Adobo", "Sinigang", "Kare-Kare", "Lechon Kawali", "Pancit Canton", "Garlic Rice",
+          "Tapsilog", "Longsilog", "Grilled Tilapia", "Beef Burger", "Quinoa Bowl", "Caesar Salad",
+          "Vegetable Stir Fry", "Grilled Chicken Salad", "Halo-Halo", "Mango Float", "Pork BBQ",
+          "Seafood Paella", "Bulalo", "Chicken Inasal", "Laing", "Ensaladang Talong"]
+ROOM_TYPES = ["Superior King", "Superior Twin", "Bedroom Deluxe", "Bedroom Family", "Bedroom Executive"]
+EQUIPMENT = [("Samsung", "Ceiling Fan", "Nest V3"), ("LG", "Tower Fan", "Honeywell T6")]
+FIRST_NAMES = ["Joyce", "Chelsy", "Jelaine", "Angelo", "Franco", "Maria", "Chris", "Paolo", "Bea",
+               "Miguel", "Andrea", "Carlo", "Nicole", "Rafael", "Kristine", "Jose", "Patricia"]
+LAST_NAMES = ["Acob", "Agtay", "Soto", "Antenor", "Patrick", "Reyes", "Santos", "Cruz", "Garcia",
+              "Mendoza", "Bautista", "Villanueva", "Ramos", "Aquino", "Castillo", "Dela Cruz"]
+
+
+def room_number(building, floor, index):
+    return f"{building}{floor:02d}{index:02d}"
+
+
+def stays(rng, rooms, residents, days, occupancy, now):
+    """
+    Guest stays spread over the last `days` days. Each room's period is cut into one slot
+    per stay; the guest arrives early in the slot and leaves before the next one. The last
+    stay is still in the room (token live, checkout ahead) for ~`occupancy` of rooms.
+    """
+    start = now - datetime.timedelta(days=days)
+    per_room, extra = divmod(residents, len(rooms))
+    for i, room in enumerate(rooms):
+        count = per_room + (1 if i < extra else 0)
+        if count == 0:
+            continue
+        slot = datetime.timedelta(days=days) / count
+        occupied = rng.random() < occupancy
+        for n in range(count):
+            checkin = start + slot * n + slot * rng.uniform(0, 0.2)
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            token = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            if n == count - 1 and occupied:
+                checkout = now + datetime.timedelta(days=rng.randint(1, 7))
+                yield (name, room, token, checkin.isoformat(), checkout.isoformat(), 0)
+            else:
+                checkout = min(checkin + slot * rng.uniform(0.5, 0.8), now)
+                yield (name, room, token, checkin.isoformat(), checkout.isoformat(), 1)
+
+
+def cleanings(rng, rooms, total, days, now, cleaners):
+    """Housekeeping rows, room by room in time order (appends stay local in the room/time index)."""
+    per_room, extra = divmod(total, len(rooms))
+    span = days * 86400
+    start = now - datetime.timedelta(days=days)
+    for i, room in enumerate(rooms):
+        count = per_room + (1 if i < extra else 0)
+        for offset in sorted(rng.randrange(span) for _ in range(count)):
+            cleaned = start + datetime.timedelta(seconds=offset)
+            yield (room, cleaned.strftime("%Y-%m-%d %H:%M:%S"), rng.choice(cleaners))
+
+
+def generate(db_path=DB_PATH, buildings=4, floors=10, rooms_per_floor=25, residents=20000,
+             housekeeping=1000000, days=365, occupancy=0.7, menu_items=6, seed=42, now=EPOCH):
+    """Create a synthetic hotel database at db_path (which must not exist). Returns row counts and timings."""
+    if floors > 99 or rooms_per_floor > 99:
+        raise ValueError("floors and rooms per floor must be below 100 (room numbers are BFFRR)")
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists; pass --force to replace it")
+    rng = random.Random(seed)
+    now = now.replace(microsecond=0)
+    timings = {}
+
+    def step(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[name] = round(time.perf_counter() - started, 2)
+        return result
+
+    step("schema", lambda: migrate(db_path))
+    pool = get_pool(db_path)
+    counts = {}
+
+    with pool.transaction() as conn:
+        conn.execute("""
+            INSERT INTO hotel (name, location, nearby_restaurants, fun_destinations)
+            VALUES ('Canyon Cove', 'Nasugbu, Batangas', 'Mcdonald''s', 'Monte Maria')
+        """)
+        conn.executemany("INSERT INTO pools (name, features) VALUES (?, ?)", [
+            ("Main Pool", "Slides, Rides"), ("Wave Pool", "Wave feature"),
+            ("Kids Pool", "Shallow, small slides"), ("Relax Pool", "Jacuzzi, loungers"),
+        ])
+        conn.executemany("INSERT INTO water_sports (name, description) VALUES (?, ?)", [
+            ("Jet Skiing", "High-speed rides along the cove"), ("Kayaking", "Explore the shoreline"),
+            ("Snorkeling", "Discover marine life"), ("Parasailing", "Fly over the ocean"),
+        ])
+        building_ids = []
+        for b in range(1, buildings + 1):
+            cursor = conn.execute("""
+                INSERT INTO buildings (name, wifi_ssid, wifi_password, restaurant_name)
+                VALUES (?, ?, ?, ?)
+            """, (f"Building {b}", f"CoveWifi-{b}", f"pass{rng.randrange(10000):04d}", f"Restaurant {b}"))
+            building_ids.append((b, cursor.lastrowid))
+
+    rooms = []
+    room_rows = []
+    amenity_rows = []
+    menu_rows = []
+    for b, building_id in building_ids:
+        tv, fan, thermostat = EQUIPMENT[b % len(EQUIPMENT)]
+        for floor in range(1, floors + 1):
+            amenity_rows.append((building_id, "Housekeeping", "Daily room cleaning service", floor))
+            amenity_rows.append((building_id, "Communal Restroom", "Restrooms for guests on each floor", floor))
+            for index in range(1, rooms_per_floor + 1):
+                number = room_number(b, floor, index)
+                rooms.append(number)
+                room_rows.append((number, building_id, floor, ROOM_TYPES[(floor - 1) * len(ROOM_TYPES) // floors],
+                                  tv, fan, thermostat))
+        for day in DAYS:
+            for meal in MEALS:
+                for item in rng.sample(DISHES, min(menu_items, len(DISHES))):
+                    menu_rows.append((day, meal, item, f"Restaurant {b}"))
+
+    counts["rooms"] = step("rooms", lambda: executemany_chunked(pool, """
+        INSERT INTO rooms (room_number, building_id, floor, room_type, tv_brand, fan_type, thermostat_model)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, room_rows))
+    counts["amenities"] = step("amenities", lambda: executemany_chunked(pool, """
+        INSERT INTO amenities (building_id, name, description, floor) VALUES (?, ?, ?, ?)
+    """, amenity_rows))
+    counts["restaurant_menu"] = step("menu", lambda: executemany_chunked(pool, """
+        INSERT INTO restaurant_menu (day, meal, item_name, restaurant_name) VALUES (?, ?, ?, ?)
+    """, menu_rows))
+    counts["residents"] = step("residents", lambda: executemany_chunked(pool, """
+        INSERT INTO residents (name, room_number, device_token, checkin_time, checkout_time, token_voided)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, stays(rng, rooms, residents, days, occupancy, now)))
+    cleaners = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)[0]}." for _ in range(max(4, len(rooms) // 40))]
+    counts["housekeeping_log"] = step("housekeeping", lambda: executemany_chunked(pool, """
+        INSERT INTO housekeeping_log (room_number, cleaned_time, cleaner_name) VALUES (?, ?, ?)
+    """, cleanings(rng, rooms, housekeeping, days, now, cleaners)))
+
+    with pool.connection() as conn:
+        step("analyze", lambda: conn.execute("ANALYZE"))
+        counts["active_residents"] = conn.execute(
+            "SELECT COUNT(*) FROM residents WHERE token_voided = 0").fetchone()[0]
+        # Until checkpointed, most of what was written is still in the -wal file
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return {"counts": counts, "seconds": timings, "size_mb": round(os.path.getsize(db_path) / 2 ** 20, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic large-hotel database")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--buildings", type=int, default=4)
+    parser.add_argument("--floors", type=int, default=10)
+    parser.add_argument("--rooms-per-floor", type=int, default=25)
+    parser.add_argument("--residents", type=int, default=20000, help="guest stays in total, past and current")
+    parser.add_argument("--housekeeping", type=int, default=1000000, help="housekeeping log rows")
+    parser.add_argument("--days", type=int, default=365, help="history covered by stays and cleanings")
+    parser.add_argument("--occupancy", type=float, default=0.7, help="share of rooms with a current guest")
+    parser.add_argument("--menu-items", type=int, default=6, help="dishes per restaurant, day and meal")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--now", type=datetime.datetime.fromisoformat, default=EPOCH,
+                        help=f"end of the history, YYYY-MM-DD[THH:MM] (default {EPOCH:%Y-%m-%d})")
+    parser.add_argument("--force", action="store_true", help="replace an existing database")
+    args = parser.parse_args()
+
+    if args.force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    started = time.perf_counter()
+    summary = generate(args.db, args.buildings, args.floors, args.rooms_per_floor, args.residents,
+                       args.housekeeping, args.days, args.occupancy, args.menu_items, args.seed, args.now)
+    summary["total_seconds"] = round(time.perf_counter() - started, 2)
+    for table, count in summary["counts"].items():
+        print(f"{table:>18}: {count}")
+    print(f"Built {args.db} ({summary['size_mb']} MB) in {summary['total_seconds']}s")
@@ -0,0 +1,275 @@
+import itertools
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QPointF, QTimer
+from PyQt5.QtGui import QFont, QColor, QPainter, QTextLayout, QTextOption, QPainterPath
+from gui_assets import draw_shadow, shadowed_pixmap, SHADOW_PAD
+
+# ----------------------------------
+# Chat transcript (model/view)
+# ----------------------------------
+# The transcript used to be one QWidget + layout + QLabel + blur effect per bubble, kept
+# in chat_layout forever, so every message made layout and repaint a bit slower.
+# Now messages are plain rows in TranscriptModel and BubbleDelegate paints them: the
+# view only asks for the rows on screen, and each row's wrapped text (QTextLayout) is
+# built once and reused until its text or the width changes. Streaming replies grow a
+# row in place, and the list is only relaid out when the row wraps onto another line;
+# the typing indicator is just another row. Shadows and the bot icon come
+# pre-rendered from gui_assets.py.
+
+USER, BOT, TYPING = "user", "bot", "typing"
+
+MAX_BUBBLE_WIDTH = 400
+PADDING_X, PADDING_Y = 15, 10
+TYPING_PADDING_Y = 8
+BUBBLE_RADIUS = 10
+ICON_SIZE = 42
+ICON_SPACING = 8
+ROW_SPACING = 10
+VIEW_MARGIN = 10
+BOT_ICON = "icon.png"
+
+STYLES = {
+    USER: {"background": QColor(255, 255, 255, 180), "color": QColor("#1a1a1a"), "font": ("Inter", 11)},
+    BOT: {"background": QColor(26, 43, 71, 180), "color": QColor("white"), "font": ("Inter", 11)},
+    TYPING: {"background": QColor(26, 43, 71, 150), "color": QColor("#888888"), "font": ("Inter", 10)},
+}
+
+_ids = itertools.count(1)
+
+
+class Message:
+    __slots__ = ("uid", "role", "text", "version")
+
+    def __init__(self, role, text):
+        self.uid = next(_ids)
+        self.role = role
+        self.text = text
+        self.version = 0
+
+
+class TranscriptModel(QAbstractListModel):
+    """Chat rows. Rows are addressed by uid so they stay valid while others come and go."""
+
+    RoleRole = Qt.UserRole + 1
+    MessageRole = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.messages = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message.text
+        if role == self.RoleRole:
+            return message.role
+        if role == self.MessageRole:
+            return message
+        return None
+
+    def append(self, role, text):
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        message = Message(role, text)
+        self.messages.append(message)
+        self.endInsertRows()
+        return message.uid
+
+    def _row(self, uid):
+        # Updates almost always target the newest rows
+        for row in range(len(self.messages) - 1, -1, -1):
+            if self.messages[row].uid == uid:
+                return row
+        return None
+
+    def set_text(self, uid, text):
+        row = self._row(uid)
+        if row is None:
+            return
+        message = self.messages[row]
+        message.text = text
+        message.version += 1
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def append_text(self, uid, text):
+        row = self._row(uid)
+        if row is not None:
+            self.set_text(uid, self.messages[row].text + text)
+
+    def remove(self, uid):
+        row = self._row(uid)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.messages[row]
+        self.endRemoveRows()
+
+
+class BubbleDelegate(QStyledItemDelegate):
+    """Paints chat bubbles; each message's wrapped text layout is cached for the current width."""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.bot_icon = shadowed_pixmap(BOT_ICON, ICON_SIZE, ICON_SIZE)
+        self.fonts = {role: QFont(*style["font"]) for role, style in STYLES.items()}
+        self._layouts = {}      # uid -> (text version, width, layout); one per row, dropped with the row
+
+    def _text_width(self, role):
+        available = self.view.viewport().width()
+        if role == BOT:
+            available -= ICON_SIZE + ICON_SPACING
+        return max(40, min(MAX_BUBBLE_WIDTH, available) - 2 * PADDING_X)
+
+    def _layout(self, message):
+        """(QTextLayout, text width, text height) for a message, built once per text version and width."""
+        width = self._text_width(message.role)
+        cached = self._layouts.get(message.uid)
+        if cached is not None and cached[:2] == (message.version, width):
+            return cached[2]
+
+        layout = QTextLayout(message.text, self.fonts[message.role])
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(option)
+        layout.setCacheEnabled(True)
+        height = 0.0
+        natural = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+            natural = max(natural, line.naturalTextWidth())
+        layout.endLayout()
+
+        cached = (layout, natural, height)
+        # A streamed row replaces its own entry as it grows
+        self._layouts[message.uid] = (message.version, width, cached)
+        return cached
+
+    def remeasure(self, message):
+        """Rebuild a changed message's layout; True if its height changed, so the list needs a relayout."""
+        old = self._layouts.get(message.uid)
+        _, _, height = self._layout(message)
+        return old is None or old[2][2] != height
+
+    def forget(self, uid):
+        self._layouts.pop(uid, None)
+
+    def _padding_y(self, role):
+        return TYPING_PADDING_Y if role == TYPING else PADDING_Y
+
+    def sizeHint(self, option, index):
+        message = index.data(TranscriptModel.MessageRole)
+        _, _, text_height = self._layout(message)
+        height = text_height + 2 * self._padding_y(message.role)
+        if message.role == BOT:
+            height = max(height, ICON_SIZE)
+        return QSize(self.view.viewport().width(), int(height + 0.999) + ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        message = index.data(TranscriptModel.MessageRole)
+        style = STYLES[message.role]
+        layout, text_width, text_height = self._layout(message)
+        padding_y = self._padding_y(message.role)
+        rect = option.rect
+        bubble_w = text_width + 2 * PADDING_X
+        bubble_h = text_height + 2 * padding_y
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        left = rect.left()
+        if message.role == USER:
+            left = rect.left() + rect.width() - bubble_w
+        elif message.role == BOT:
+            self.paint_icon(painter, rect.left(), rect.top())
+            left = rect.left() + ICON_SIZE + ICON_SPACING
+        bubble = QRectF(left, rect.top(), bubble_w, bubble_h)
+
+        self.paint_shadow(painter, bubble)
+        path = QPainterPath()
+        path.addRoundedRect(bubble, BUBBLE_RADIUS, BUBBLE_RADIUS)
+        painter.fillPath(path, style["background"])
+        painter.setPen(style["color"])
+        layout.draw(painter, QPointF(bubble.left() + PADDING_X, bubble.top() + padding_y))
+        painter.restore()
+
+    def paint_shadow(self, painter, bubble):
+        # Pre-rendered nine-patch in place of a per-widget QGraphicsDropShadowEffect
+        draw_shadow(painter, bubble, BUBBLE_RADIUS)
+
+    def paint_icon(self, painter, x, y):
+        if self.bot_icon is not None:
+            painter.drawPixmap(x - SHADOW_PAD, y - SHADOW_PAD, self.bot_icon)
+            return
+        # Fallback - "T" badge if the icon is missing
+        badge = QRectF(x, y, ICON_SIZE, ICON_SIZE)
+        draw_shadow(painter, badge, 16)
+        path = QPainterPath()
+        path.addRoundedRect(badge, 16, 16)
+        painter.fillPath(path, QColor("#4a9eff"))
+        painter.setPen(QColor("white"))
+        painter.setFont(QFont("Inter", 14, QFont.Bold))
+        painter.drawText(QRectF(x, y, ICON_SIZE, ICON_SIZE), Qt.AlignCenter, "T")
+
+
+class TranscriptView(QListView):
+    """Scrolling transcript that only lays out and paints the rows on screen."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.delegate = BubbleDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QListView.Batched)
+        self.setViewportMargins(VIEW_MARGIN, VIEW_MARGIN, VIEW_MARGIN, VIEW_MARGIN)
+        self.viewport().setAutoFillBackground(False)
+        self.setStyleSheet("""
+            QListView {
+                background: transparent;
+                border: none;
+            }
+            QScrollBar:vertical {
+                background: rgba(26, 43, 71, 100);
+                width: 10px;
+                border-radius: 5px;
+            }
+            QScrollBar::handle:vertical {
+                background: rgba(74, 158, 255, 150);
+                border-radius: 5px;
+            }
+        """)
+        model.dataChanged.connect(self.rows_changed)
+        model.rowsAboutToBeRemoved.connect(self.rows_removed)
+
+    def rows_changed(self, top_left, bottom_right, *_):
+        # QListView repaints a changed row itself but only re-measures rows on a full
+        # relayout; a streamed reply needs one only when it wraps onto a new line
+        model = self.model()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            if self.delegate.remeasure(model.messages[row]):
+                self.scheduleDelayedItemsLayout()
+                return
+
+    def rows_removed(self, parent, first, last):
+        for message in self.model().messages[first:last + 1]:
+            self.delegate.forget(message.uid)
+
+    def scroll_to_bottom(self):
+        QTimer.singleShot(0, self.scrollToBottom)
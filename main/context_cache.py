@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import weakref
+from datetime import date
+
+# Every live cache, so DatabaseManager writes in this process can reach them
+_caches = weakref.WeakSet()
+
+
+class ContextCache:
+    """
+    In-memory cache for DatabaseLoader.get_full_context.
+
+    Two tiers:
+      - hotel-wide sections (pools, water sports, hotel, the day's menu per restaurant),
+        loaded once and shared by every room
+      - room-scoped sections (resident, room, building, amenities, housekeeping),
+        cached per room number
+
+    Entries are dropped when DatabaseManager writes (see invalidate()), when SQLite's
+    `PRAGMA data_version` shows another connection or process committed, and when the
+    date rolls over (menus are per weekday). Cached sections are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self._lock = threading.Lock()
+        self._shared = {}
+        self._menus = {}
+        self._rooms = {}
+        self._day = date.today()
+        self._watch = None
+        self._data_version = None
+        self.version = 0
+        self.counters = {
+            "hotel_hits": 0, "hotel_misses": 0,
+            "room_hits": 0, "room_misses": 0,
+            "invalidations": 0,
+        }
+        _caches.add(self)
+
+    # -----------------------
+    # FRESHNESS CHECKS
+    # -----------------------
+    def refresh(self):
+        """Drop stale entries. Cheap enough to call on every chat turn."""
+        today = date.today()
+        with self._lock:
+            if self._watch is None:
+                # Private connection: data_version only moves for commits made elsewhere
+                self._watch = sqlite3.connect(self.db_path, check_same_thread=False)
+            data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if self._data_version is not None and data_version != self._data_version:
+                self._clear()
+            elif today != self._day:
+                self._menus.clear()
+                self.version += 1
+            self._data_version = data_version
+            self._day = today
+
+    def _clear(self):
+        self._shared.clear()
+        self._menus.clear()
+        self._rooms.clear()
+        self.version += 1
+        self.counters["invalidations"] += 1
+
+    def invalidate(self, room_number=None):
+        """Forget one room's sections, or everything when no room is given."""
+        with self._lock:
+            if room_number is None:
+                self._clear()
+            elif self._rooms.pop(str(room_number), None) is not None:
+                self.counters["invalidations"] += 1
+
+    # -----------------------
+    # LOOKUPS
+    # -----------------------
+    def _get(self, store, key, tier, load):
+        with self._lock:
+            entry = store.get(key)
+            if entry is not None:
+                self.counters[tier + "_hits"] += 1
+                return entry
+            self.counters[tier + "_misses"] += 1
+            version = self.version
+        entry = load()
+        with self._lock:
+            # Don't store a result that was loaded across an invalidation
+            if version == self.version:
+                store[key] = entry
+        return entry
+
+    def hotel_sections(self, load):
+        return self._get(self._shared, "hotel", "hotel", load)
+
+    def menu(self, restaurant_name, day, load):
+        return self._get(self._menus, (restaurant_name, day), "hotel", load)
+
+    def room_sections(self, room_number, load):
+        return self._get(self._rooms, str(room_number), "room", load)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["cached_rooms"] = len(self._rooms)
+            stats["version"] = self.version
+        lookups = sum(stats[k] for k in ("hotel_hits", "hotel_misses", "room_hits", "room_misses"))
+        hits = stats["hotel_hits"] + stats["room_hits"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+
+def invalidate(db_path, room_number=None):
+    """Called after writes so caches in this process don't wait for data_version."""
+    db_path = os.path.abspath(db_path)
+    for cache in list(_caches):
+        if cache.db_path == db_path:
+            cache.invalidate(room_number)
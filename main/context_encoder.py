@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # optional: fall back to an estimate when tiktoken isn't installed
+    _encoding = None
+
+# ----------------------------------
+# Compact context encoding
+# ----------------------------------
+# Replaces str(get_full_context(...)) in the prompt. Each section becomes a header
+# line naming its fields once, followed by one `|`-separated line per row:
+#
+#   # pools (name|features)
+#   Main Pool|Slides, Rides
+#
+# Only the fields listed here are sent; ids and the device token never reach the LLM.
+
+SECTION_FIELDS = {
+    "resident": ["resident_name", "resident_checkin_time"],
+    "room": ["room_number", "room_type", "floor", "tv_brand", "fan_type", "thermostat_model"],
+    "building": ["name", "wifi_ssid", "wifi_password", "restaurant_name"],
+    "amenities": ["name", "description", "floor"],
+    "water_sports": ["name", "description"],
+    "pools": ["name", "features"],
+    "housekeeping": ["cleaned_time", "cleaner_name"],
+    "hotel": ["name", "location", "nearby_restaurants", "fundestinations"],
+    "restaurant_menu": ["meal", "item_name"],
+}
+
+SECTION_ORDER = list(SECTION_FIELDS)
+
+CONTEXT_FORMAT_NOTE = (
+    "The hotel database is given as sections: a '# section (field|field)' header, "
+    "then one line per record with values in the same order."
+)
+
+MEMO_SIZE = 1024
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    # ~4 characters per token for English BPE vocabularies
+    return max(1, (len(text) + 3) // 4)
+
+
+def _value(v):
+    return "" if v is None else str(v).replace("\n", " ").replace("|", "/")
+
+
+def _encode_section(name, value):
+    fields = SECTION_FIELDS[name]
+    if value is None:
+        return f"# {name}\nnone"
+    if isinstance(value, dict):
+        return f"# {name} ({'|'.join(fields)})\n" + "|".join(_value(value.get(f)) for f in fields)
+    if name == "restaurant_menu":
+        # One line per meal instead of one per dish
+        meals = OrderedDict()
+        for row in value:
+            meals.setdefault(row.get("meal"), []).append(_value(row.get("item_name")))
+        lines = [f"{_value(meal)}|{', '.join(items)}" for meal, items in meals.items()]
+        return f"# {name} (meal|items)\n" + ("\n".join(lines) if lines else "none")
+    rows = ["|".join(_value(row.get(f)) for f in fields) for row in value]
+    return f"# {name} ({'|'.join(fields)})\n" + ("\n".join(rows) if rows else "none")
+
+
+# Cached sections from ContextCache are shared objects, so encodings and token counts
+# are memoized by identity. The memo keeps a reference so ids can't be reused.
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def encode_section(name, value):
+    """(text, token_count) for one section, precomputed the first time it's seen."""
+    key = (name, id(value))
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is value:
+            _memo.move_to_end(key)
+            return entry[1], entry[2]
+
+    text = _encode_section(name, value)
+    tokens = count_tokens(text)
+    if value is not None:
+        with _memo_lock:
+            _memo[key] = (value, text, tokens)
+            if len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+    return text, tokens
+
+
+def clear_memo():
+    """Forget every memoized section (for benchmarks timing a cold encode)."""
+    with _memo_lock:
+        _memo.clear()
+
+
+def encode_context(context, sections=None):
+    """
+    Compact text for a get_full_context() dict.
+    `sections` limits which sections are included (default: all). Returns (text, token_count).
+    """
+    today = datetime.now().strftime("%A")
+    parts = [f"today: {today}"]
+    tokens = count_tokens(parts[0])
+    for name in SECTION_ORDER:
+        if name not in context or (sections is not None and name not in sections):
+            continue
+        text, n = encode_section(name, context[name])
+        parts.append(text)
+        tokens += n + 1
+    return "\n".join(parts), tokens
@@ -0,0 +1,141 @@
+import math
+import re
+import threading
+from collections import Counter
+from context_encoder import SECTION_ORDER, encode_section
+
+# ----------------------------------
+# Intent-aware section selection
+# ----------------------------------
+# A tiny BM25 index with one "document" per get_full_context section: its synonym list
+# (English and Filipino) plus the words in the section itself (pool names, menu items...).
+# The guest's message is scored against it and only the matching sections are sent.
+# If nothing matches well enough, the whole context is sent, as before.
+# Everything is local; a lookup is a few dozen dict operations.
+
+SECTION_SYNONYMS = {
+    "resident": "name guest checkin check-in stay pangalan",
+    "room": (
+        "room kwarto tv television telebisyon watch manood palabas channel netflix movie show "
+        "aircon air conditioning ac thermostat temperature cold chilly freezing hot warm humid "
+        "lamig malamig ginaw init mainit fan bentilador electric bright light lights dark dim "
+        "ilaw liwanag madilim maliwanag volume loud noise"
+    ),
+    "building": (
+        "wifi wi-fi internet connection connect password network signal online data "
+        "koneksyon building gusali"
+    ),
+    "amenities": (
+        "amenity amenities facility facilities restroom toilet bathroom cr comfort banyo "
+        "palikuran towel service floor"
+    ),
+    "water_sports": (
+        "water sport sports activity activities beach sea ocean boat ski jet kayak snorkel "
+        "parasail banana dagat dalampasigan bored boring fun nababagot laro adventure"
+    ),
+    "pools": (
+        "pool pools swim swimming slide slides wave jacuzzi kids lane langoy lumangoy "
+        "maligo paligo bored boring fun nababagot"
+    ),
+    "housekeeping": (
+        "clean cleaned cleaning housekeeping maid tidy dirty messy linen sheets "
+        "linis nilinis malinis marumi kalat last"
+    ),
+    "hotel": (
+        "hotel location where nearby near restaurant restaurants outside attraction attractions "
+        "destination tour visit explore city town place places pasyal gala malapit lugar saan"
+    ),
+    "restaurant_menu": (
+        "menu food eat eating hungry famished starving breakfast brunch lunch dinner buffet "
+        "meal cafe kain kumain gutom nagugutom almusal tanghalian hapunan pagkain ulam today"
+    ),
+}
+
+# Always sent: small, and the model needs them to know who/where the guest is
+ALWAYS_INCLUDE = ("resident", "room")
+
+K1 = 1.2
+B = 0.75
+MIN_SCORE = 1.0        # below this for every section -> send the full context
+RELATIVE_CUTOFF = 0.4  # keep sections scoring at least this fraction of the best one
+
+_word = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = set(
+    "a an the is are am be was were it its this that for of to in on at by and or with from "
+    "my me i you your we our do does can could would will what when how there here some something "
+    "ang ng sa na ako ko mo ka ba po mga ay si ni ito yan iyan dito"
+    .split()
+)
+
+
+def _stem(word):
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [_stem(w) for w in _word.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+_synonym_terms = {name: Counter(tokenize(words)) for name, words in SECTION_SYNONYMS.items()}
+
+# Section content terms, memoized by identity like context_encoder (cached sections are shared)
+_terms_memo = {}
+_terms_lock = threading.Lock()
+
+
+def _section_terms(name, value):
+    key = (name, id(value))
+    with _terms_lock:
+        entry = _terms_memo.get(key)
+        if entry is not None and entry[0] is value:
+            return entry[1]
+    text, _ = encode_section(name, value)
+    # Drop the header line: field names would match every query about anything
+    body = text.split("\n", 1)[1] if "\n" in text else ""
+    terms = _synonym_terms[name] + Counter(tokenize(body))
+    with _terms_lock:
+        if len(_terms_memo) > 2048:
+            _terms_memo.clear()
+        _terms_memo[key] = (value, terms)
+    return terms
+
+
+def score_sections(message, context):
+    """BM25 score of the message against every section present in the context."""
+    docs = {name: _section_terms(name, context[name]) for name in SECTION_ORDER if name in context}
+    if not docs:
+        return {}
+    avg_len = sum(sum(t.values()) for t in docs.values()) / len(docs)
+    query = set(tokenize(message))
+
+    scores = {}
+    for name, terms in docs.items():
+        doc_len = sum(terms.values())
+        score = 0.0
+        for term in query:
+            tf = terms.get(term)
+            if not tf:
+                continue
+            df = sum(1 for t in docs.values() if term in t)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len / avg_len))
+        scores[name] = score
+    return scores
+
+
+def select_sections(message, context):
+    """
+    Names of the sections worth sending for this message, or None for "send everything"
+    when no section is a confident match.
+    """
+    scores = score_sections(message, context)
+    best = max(scores.values(), default=0.0)
+    if best < MIN_SCORE:
+        return None
+    chosen = {name for name, score in scores.items() if score >= best * RELATIVE_CUTOFF}
+    chosen.update(ALWAYS_INCLUDE)
+    return chosen
@@ -0,0 +1,174 @@
+import threading
+from context_encoder import count_tokens
+
+# ----------------------------------
+# Per-room conversation memory
+# ----------------------------------
+# Replaces the unbounded conversation_history dict. Each room keeps its recent turns
+# verbatim within a token budget; older turns are folded into a short running summary
+# so long stays don't make every request bigger than the last. A room's memory is
+# dropped when its guest checks out, their token is voided, or a new guest moves in.
+# With a SessionStore attached, turns are also persisted, and the current resident's
+# recent turns are loaded back when their room is first bound after a restart.
+
+TOKEN_BUDGET = 1200     # recent turns kept verbatim, per room
+SUMMARY_BUDGET = 300    # running summary of older turns, per room
+MIN_RECENT_TURNS = 2    # never summarize away the last exchanges
+
+
+def extractive_summary(summary, turns):
+    """
+    Default summarizer: one short line per folded exchange, no LLM call.
+    `turns` is a list of (user_input, reply) pairs, oldest first.
+    """
+    lines = [summary] if summary else []
+    for user_input, reply in turns:
+        answer = reply.split("\n", 1)[0]
+        for stop in (". ", "! ", "? "):
+            if stop in answer:
+                answer = answer.split(stop, 1)[0] + stop.strip()
+                break
+        lines.append(f"- Guest: {user_input[:100]} / Tavv: {answer[:140]}")
+    return "\n".join(lines)
+
+
+class RoomMemory:
+    def __init__(self, resident_id):
+        self.resident_id = resident_id
+        self.summary = ""
+        self.turns = []     # (user_input, reply, tokens)
+        self.tokens = 0
+        self.last_request_id = None     # of the newest turn, to drop a retry of it
+
+
+class ConversationMemory:
+    def __init__(self, token_budget=TOKEN_BUDGET, summary_budget=SUMMARY_BUDGET, summarizer=extractive_summary,
+                 store=None):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+        self.store = store
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, room_number):
+        return room_number in self._rooms
+
+    def rooms(self):
+        with self._lock:
+            return list(self._rooms)
+
+    def _rehydrate(self, room_number, resident_id):
+        """This resident's stored turns, read without holding the lock (the read can be slow)."""
+        if self.store is None or resident_id is None:
+            return []
+        return self.store.load_recent(room_number, resident_id)
+
+    def bind_resident(self, room_number, resident_id):
+        """
+        Make resident_id the room's guest (None: nobody is checked in). A different guest's
+        memory is dropped in the same locked step, so no turn can see it afterwards.
+        """
+        with self._lock:
+            memory = self._rooms.get(room_number)
+            if memory is not None and memory.resident_id == resident_id:
+                return
+        turns = self._rehydrate(room_number, resident_id)
+        with self._lock:
+            memory = self._rooms.get(room_number)
+            if memory is not None and memory.resident_id == resident_id:
+                return      # another thread bound the same resident meanwhile
+            if memory is not None:
+                del self._rooms[room_number]
+                if self.store is not None:
+                    self.store.reset(room_number)
+            if resident_id is not None:
+                memory = self._rooms[room_number] = RoomMemory(resident_id)
+                for user_input, reply in turns:
+                    self._add(memory, user_input, reply)
+
+    def messages(self, room_number, resident_id):
+        """
+        Chat messages to send before the new question: summary (if any) then recent turns.
+        Empty unless the room is bound to this resident.
+        """
+        with self._lock:
+            memory = self._rooms.get(room_number)
+            if memory is None or memory.resident_id != resident_id:
+                return []
+            messages = []
+            if memory.summary:
+                messages.append({"role": "system", "content": "Earlier in this conversation:\n" + memory.summary})
+            for user_input, reply, _ in memory.turns:
+                messages.append({"role": "user", "content": user_input})
+                messages.append({"role": "assistant", "content": reply})
+            return messages
+
+    def append(self, room_number, resident_id, user_input, reply, request_id=None):
+        """
+        Record an exchange; dropped if the room has been rebound since the turn started, or
+        if it is a retry of the newest turn (same request_id). A guest asking the same thing
+        twice is two turns.
+        """
+        with self._lock:
+            memory = self._rooms.get(room_number)
+            if memory is None or memory.resident_id != resident_id:
+                return
+            if request_id is not None and request_id == memory.last_request_id:
+                return
+            memory.last_request_id = request_id
+            self._add(memory, user_input, reply)
+            if self.store is not None:
+                self.store.append_turn(room_number, resident_id, user_input, reply)
+
+    def _add(self, memory, user_input, reply):
+        tokens = count_tokens(user_input) + count_tokens(reply)
+        memory.turns.append((user_input, reply, tokens))
+        memory.tokens += tokens
+        self._compact(memory)
+
+    def _compact(self, memory):
+        if memory.tokens <= self.token_budget or len(memory.turns) <= MIN_RECENT_TURNS:
+            return
+        folded = []
+        while memory.tokens > self.token_budget and len(memory.turns) > MIN_RECENT_TURNS:
+            user_input, reply, tokens = memory.turns.pop(0)
+            memory.tokens -= tokens
+            folded.append((user_input, reply))
+        summary = self.summarizer(memory.summary, folded)
+        # Keep the newest summary lines when it outgrows its own budget
+        lines = summary.split("\n")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        memory.summary = "\n".join(lines)
+
+    def evict(self, room_number):
+        with self._lock:
+            if self._rooms.pop(room_number, None) is None:
+                return False
+        if self.store is not None:
+            self.store.reset(room_number)
+        return True
+
+    def evict_inactive(self, active_rooms):
+        """Drop memory for every room without an active (checked-in, non-voided) resident."""
+        active_rooms = set(active_rooms)
+        with self._lock:
+            stale = [room for room in self._rooms if room not in active_rooms]
+            for room in stale:
+                del self._rooms[room]
+        if self.store is not None:
+            for room in stale:
+                self.store.reset(room)
+        return stale
+
+    def stats(self, room_number):
+        with self._lock:
+            memory = self._rooms.get(room_number)
+            if memory is None:
+                return None
+            return {
+                "turns": len(memory.turns),
+                "tokens": memory.tokens,
+                "summary_tokens": count_tokens(memory.summary) if memory.summary else 0,
+            }
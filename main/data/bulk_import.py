@@ -0,0 +1,268 @@
+import argparse
+import csv
+import json
+import os
+import time
+from db_pool import get_pool, executemany_chunked, BULK_CHUNK
+from migrations import migrate
+from context_cache import invalidate
+
+DB_PATH = os.path.join("data", "hotel.db")
+
+# ----------------------------------
+# Bulk inventory import
+# ----------------------------------
+# Loads buildings, rooms, amenities, pools, water sports and weekly menus from CSV,
+# JSON Lines (.jsonl/.ndjson) or JSON array files, instead of editing seed_db.py or
+# typing rooms into db_manager.py one by one.
+#   1. Validate: every file is streamed once and checked (required columns, numbers,
+#      weekdays, and that each room/amenity names a building that exists in the database
+#      or in the buildings file). Any problem aborts before anything is written.
+#   2. Write: rows are streamed again into chunked executemany transactions, with the
+#      secondary indexes of the tables being loaded dropped and rebuilt once at the end.
+# Writes are upserts on each table's natural key (migration 3), so importing the same
+# files again updates rows in place instead of duplicating them; that also makes a rerun
+# the fix for an import interrupted halfway (chunks already committed stay).
+# Run from main/:
+#   python -m data.bulk_import --buildings buildings.csv --rooms rooms.csv --menus menu.jsonl
+#   python -m data.bulk_import --rooms rooms.csv --dry-run          # validate only
+# Columns (CSV header or JSON keys); buildings and amenities are referenced by building name:
+#   buildings:    name, wifi_ssid, wifi_password, restaurant_name
+#   rooms:        room_number, building, floor, room_type, tv_brand, fan_type, thermostat_model
+#   amenities:    building, name, description, floor
+#   pools:        name, features
+#   water_sports: name, description
+#   menus:        restaurant_name, day, meal, item_name
+
+DAYS = {"Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"}
+MAX_ERRORS = 50                 # stop listing problems after this many
+DEFER_INDEXES_ABOVE = 5000      # rows; smaller imports keep their indexes (rebuilding costs a full scan)
+
+# kind -> (table, columns, required columns, integer columns)
+KINDS = {
+    "buildings": ("buildings", ["name", "wifi_ssid", "wifi_password", "restaurant_name"], ["name"], []),
+    "pools": ("pools", ["name", "features"], ["name"], []),
+    "water_sports": ("water_sports", ["name", "description"], ["name"], []),
+    "rooms": ("rooms", ["room_number", "building", "floor", "room_type", "tv_brand", "fan_type", "thermostat_model"],
+              ["room_number", "building"], ["floor"]),
+    "amenities": ("amenities", ["building", "name", "description", "floor"], ["building", "name"], ["floor"]),
+    "menus": ("restaurant_menu", ["restaurant_name", "day", "meal", "item_name"],
+              ["restaurant_name", "day", "meal", "item_name"], []),
+}
+# Buildings first so rooms and amenities can resolve them
+ORDER = ["buildings", "pools", "water_sports", "rooms", "amenities", "menus"]
+
+UPSERTS = {
+    "buildings": """
+        INSERT INTO buildings (name, wifi_ssid, wifi_password, restaurant_name) VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET wifi_ssid = excluded.wifi_ssid, wifi_password = excluded.wifi_password,
+                                        restaurant_name = excluded.restaurant_name
+    """,
+    "pools": """
+        INSERT INTO pools (name, features) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET features = excluded.features
+    """,
+    "water_sports": """
+        INSERT INTO water_sports (name, description) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET description = excluded.description
+    """,
+    "rooms": """
+        INSERT INTO rooms (room_number, building_id, floor, room_type, tv_brand, fan_type, thermostat_model)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(room_number) DO UPDATE SET building_id = excluded.building_id, floor = excluded.floor,
+            room_type = excluded.room_type, tv_brand = excluded.tv_brand, fan_type = excluded.fan_type,
+            thermostat_model = excluded.thermostat_model
+    """,
+    "amenities": """
+        INSERT INTO amenities (building_id, name, description, floor) VALUES (?, ?, ?, ?)
+        ON CONFLICT(building_id, name, COALESCE(floor, -1)) DO UPDATE SET description = excluded.description
+    """,
+    "menus": """
+        INSERT INTO restaurant_menu (restaurant_name, day, meal, item_name) VALUES (?, ?, ?, ?)
+        ON CONFLICT(restaurant_name, day, meal, item_name) DO NOTHING
+    """,
+}
+
+
+class ValidationFailed(Exception):
+    """Validation failed; nothing was written."""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} problem(s) found, nothing imported")
+        self.problems = problems
+
+
+# -----------------------
+# READING
+# -----------------------
+def read_rows(path):
+    """Yield (line number, dict) from a CSV, JSON Lines or JSON array file."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if ext == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif ext in (".jsonl", ".ndjson"):
+            for line_num, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_num, json.loads(line)
+        elif ext == ".json":
+            # A plain array has to be parsed whole; use JSON Lines for very large files
+            for index, row in enumerate(json.load(f), 1):
+                yield index, row
+        else:
+            raise ValueError(f"{path}: expected a .csv, .jsonl, .ndjson or .json file")
+
+
+def clean(kind, row):
+    """Row values in column order with blanks as None and integer columns converted (may raise ValueError)."""
+    _, columns, _, integers = KINDS[kind]
+    values = []
+    for column in columns:
+        value = row.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is not None and column in integers:
+            value = int(value)
+        values.append(value)
+    return values
+
+
+# -----------------------
+# VALIDATION
+# -----------------------
+def validate(files, known_buildings):
+    """Stream every file once; returns per-kind row counts or raises ValidationFailed with every problem found."""
+    problems = []
+    counts = {}
+
+    def problem(text):
+        if len(problems) < MAX_ERRORS:
+            problems.append(text)
+
+    buildings = set(known_buildings)
+    # Building names first, so rooms and amenities may refer to buildings from the same import
+    if "buildings" in files:
+        for line, row in read_rows(files["buildings"]):
+            name = str(row.get("name") or "").strip() if isinstance(row, dict) else ""
+            if name:
+                buildings.add(name)
+
+    for kind in ORDER:
+        if kind not in files:
+            continue
+        path = files[kind]
+        _, columns, required, _ = KINDS[kind]
+        count = 0
+        for line, row in read_rows(path):
+            count += 1
+            where = f"{path}:{line}"
+            if not isinstance(row, dict):
+                problem(f"{where}: expected an object with {', '.join(columns)}")
+                continue
+            try:
+                values = dict(zip(columns, clean(kind, row)))
+            except ValueError:
+                problem(f"{where}: floor must be a whole number")
+                continue
+            missing = [c for c in required if values[c] is None]
+            if missing:
+                problem(f"{where}: missing {', '.join(missing)}")
+            if "building" in values and values["building"] is not None and values["building"] not in buildings:
+                problem(f"{where}: unknown building '{values['building']}'")
+            if kind == "menus" and values["day"] is not None and values["day"] not in DAYS:
+                problem(f"{where}: day must be a weekday name like Monday, got '{values['day']}'")
+        counts[kind] = count
+
+    if problems:
+        raise ValidationFailed(problems)
+    return counts
+
+
+# -----------------------
+# WRITING
+# -----------------------
+def secondary_indexes(conn, tables):
+    """(name, CREATE statement) of the non-unique indexes on these tables."""
+    rows = conn.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({','.join('?' * len(tables))})
+    """, tables).fetchall()
+    return [(name, sql) for name, sql in rows if not sql.lstrip().upper().startswith("CREATE UNIQUE")]
+
+
+def building_ids(pool):
+    with pool.connection() as conn:
+        return dict(conn.execute("SELECT name, building_id FROM buildings"))
+
+
+def resolve_buildings(rows, ids, position):
+    """Swap the building name at `position` for its id (buildings are written first)."""
+    for values in rows:
+        values[position] = ids[values[position]]
+        yield values
+
+
+def import_files(files, db_path=DB_PATH, chunk=BULK_CHUNK, dry_run=False):
+    """Validate, then upsert every file. Returns {kind: rows} and timings."""
+    migrate(db_path)
+    pool = get_pool(db_path)
+    started = time.perf_counter()
+    counts = validate(files, building_ids(pool))
+    timings = {"validate": round(time.perf_counter() - started, 2)}
+    if dry_run:
+        return counts, timings
+
+    deferred = []
+    if sum(counts.values()) >= DEFER_INDEXES_ABOVE:
+        with pool.transaction() as conn:
+            deferred = secondary_indexes(conn, sorted({KINDS[kind][0] for kind in files}))
+            for name, _ in deferred:
+                conn.execute(f"DROP INDEX {name}")
+    try:
+        for kind in ORDER:
+            if kind not in files:
+                continue
+            started = time.perf_counter()
+            rows = (clean(kind, row) for _, row in read_rows(files[kind]))
+            if kind in ("rooms", "amenities"):
+                rows = resolve_buildings(rows, building_ids(pool), 1 if kind == "rooms" else 0)
+            executemany_chunked(pool, UPSERTS[kind], rows, chunk)
+            timings[kind] = round(time.perf_counter() - started, 2)
+    finally:
+        # Rebuilt even if a write failed, so lookups never stay unindexed
+        started = time.perf_counter()
+        with pool.transaction() as conn:
+            for _, sql in deferred:
+                conn.execute(sql)
+        timings["indexes"] = round(time.perf_counter() - started, 2)
+        invalidate(db_path)
+    return counts, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import hotel inventory from CSV / JSON files")
+    for kind in ORDER:
+        parser.add_argument(f"--{kind.replace('_', '-')}", dest=kind, metavar="FILE")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk", type=int, default=BULK_CHUNK, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args()
+
+    files = {kind: getattr(args, kind) for kind in ORDER if getattr(args, kind)}
+    if not files:
+        parser.error("nothing to import; pass at least one of " + ", ".join(f"--{k.replace('_', '-')}" for k in ORDER))
+    try:
+        counts, timings = import_files(files, args.db, args.chunk, args.dry_run)
+    except ValidationFailed as e:
+        for text in e.problems:
+            print(text)
+        raise SystemExit(str(e))
+    except (OSError, ValueError) as e:
+        # Unreadable file, unknown extension or malformed JSON
+        raise SystemExit(f"Import failed: {e}")
+    for kind, count in counts.items():
+        print(f"{kind:>13}: {count} rows" + ("" if args.dry_run else f" in {timings[kind]}s"))
+    print("Validated only, nothing written." if args.dry_run else
+          f"Import finished (indexes rebuilt in {timings['indexes']}s).")
@@ -1,18 +1,88 @@
-import sqlite3
 import os
+import sys
 import datetime
 import uuid
 
+# `python data/db_manager.py` puts data/ on sys.path, not main/ where the shared modules
+# live; `python -m data.db_manager` and imports from main/ already have it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_pool import get_pool
+from migrations import migrate
+from context_cache import invalidate
+
 DB_PATH = os.path.join("data", "hotel.db")
 os.makedirs("data", exist_ok=True)
+# Where check-in writes each room's device token file (the kiosk's --token-file)
+TOKENS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tokens")
+CHECKOUT_HOUR = 12  # default checkout: noon on the day after check-in
+
+
+def next_checkout(now):
+    checkout = now.replace(hour=CHECKOUT_HOUR, minute=0, second=0, microsecond=0)
+    return checkout + datetime.timedelta(days=1)
+
+
+def parse_checkout(value):
+    """
+    A checkout time as the isoformat() string the sweeper compares against (datetime or
+    ISO text like "2026-10-19 12:00" / "2026-10-19T12:00:00"). Raises ValueError otherwise.
+    Stored times have to share one format: they are compared as strings, and a space
+    sorts before "T", so "2026-10-19 12:00:00" would expire at midnight.
+    """
+    if isinstance(value, datetime.datetime):
+        checkout = value
+    else:
+        try:
+            checkout = datetime.datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValueError(f"Invalid checkout time {value!r}; expected e.g. 2026-10-19 12:00") from None
+    if checkout.tzinfo is not None:
+        checkout = checkout.astimezone().replace(tzinfo=None)  # stored times are local
+    return checkout.isoformat()
+
+
+def token_file(room_number, tokens_dir=TOKENS_DIR):
+    return os.path.join(tokens_dir, f"room_{room_number}_token.txt")
+
+
+def write_token_file(path, token):
+    # Write then rename, so a kiosk never reads a half-written token
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        f.write(token)
+    os.replace(temp, path)
+
+
+def remove_token_files(tokens, tokens_dir=TOKENS_DIR):
+    """Delete the device token files holding any of these (now voided) tokens. Returns the paths removed."""
+    tokens = set(tokens)
+    removed = []
+    if not tokens or not os.path.isdir(tokens_dir):
+        return removed
+    for entry in os.scandir(tokens_dir):
+        if not entry.is_file() or not entry.name.endswith(".txt"):
+            continue
+        try:
+            with open(entry.path) as f:
+                if f.read().strip() not in tokens:
+                    continue
+            os.remove(entry.path)
+            removed.append(entry.path)
+        except OSError as e:
+            print(f"Could not remove token file {entry.path}: {e}")
+    return removed
 
 
 class DatabaseManager:
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
+        migrate(db_path)
+        self.pool = get_pool(db_path)
 
-    def connect(self):
-        return sqlite3.connect(self.db_path)
+    def _changed(self, room_number=None):
+        # Drop cached get_full_context sections in this process right away;
+        # other processes pick the write up through PRAGMA data_version
+        invalidate(self.db_path, room_number)
 
     # ---------------------------
     # 0. Residents CRUD
@@ -20,151 +90,182 @@ class DatabaseManager:
     def add_resident(self, name, room_number):
         token = str(uuid.uuid4())
         checkin_time = datetime.datetime.now().isoformat()
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO residents (name, room_number, device_token, checkin_time)
-            VALUES (?, ?, ?, ?)
-        """, (name, room_number, token, checkin_time))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("""
+                INSERT INTO residents (name, room_number, device_token, checkin_time)
+                VALUES (?, ?, ?, ?)
+            """, (name, room_number, token, checkin_time))
+        self._changed(room_number)
         print(f"Resident added: {name} | Room {room_number} | Token: {token}")
 
     def delete_resident(self, resident_id):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM residents WHERE resident_id=?", (resident_id,))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM residents WHERE resident_id=?", (resident_id,))
+        self._changed()
         print(f"Resident {resident_id} deleted.")
 
     def list_residents(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT resident_id, name, room_number, device_token FROM residents")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT resident_id, name, room_number, device_token FROM residents").fetchall()
+
+    # ---------------------------
+    # 0b. Batch check-in / check-out
+    # ---------------------------
+    # One transaction per batch, so the noon wave of hundreds of guests is a single commit
+    # (and a single cache invalidation) instead of one per guest.
+    def check_in_residents(self, guests, tokens_dir=TOKENS_DIR):
+        """
+        Check in [(name, room_number[, checkout_time]), ...] and write each room's token file.
+        A guest still holding a token for one of the rooms is checked out in the same
+        transaction. Unknown rooms or unreadable checkout times raise ValueError before
+        anything is written.
+        Returns {room_number: token}.
+        """
+        now = datetime.datetime.now()
+        checkin_time = now.isoformat()
+        default_checkout = next_checkout(now).isoformat()
+        rows = []
+        for name, room_number, *checkout in guests:
+            checkout_time = parse_checkout(checkout[0]) if checkout and checkout[0] else default_checkout
+            rows.append((name, str(room_number), str(uuid.uuid4()), checkin_time, checkout_time))
+        rooms = [row[1] for row in rows]
+        if len(set(rooms)) != len(rooms):
+            raise ValueError("Each room can only be checked in once per batch")
+
+        with self.pool.transaction() as conn:
+            known = {r[0] for r in conn.execute("SELECT room_number FROM rooms")}
+            unknown = sorted(set(rooms) - known)
+            if unknown:
+                raise ValueError(f"Unknown rooms: {', '.join(unknown)}")
+            replaced = self._active_tokens(conn, rooms)
+            conn.executemany("""
+                UPDATE residents SET token_voided = 1, checkout_time = ?
+                WHERE room_number = ? AND token_voided = 0
+            """, [(checkin_time, room) for room in rooms])
+            conn.executemany("""
+                INSERT INTO residents (name, room_number, device_token, checkin_time, checkout_time)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+
+        remove_token_files(replaced, tokens_dir)
+        os.makedirs(tokens_dir, exist_ok=True)
+        tokens = {}
+        for _, room_number, token, _, _ in rows:
+            write_token_file(token_file(room_number, tokens_dir), token)
+            tokens[room_number] = token
+        self._changed()
+        print(f"Checked in {len(rows)} guest(s); {len(replaced)} previous token(s) voided.")
+        return tokens
+
+    def check_out_residents(self, room_numbers, tokens_dir=TOKENS_DIR):
+        """Check out the current guests of these rooms, void their tokens and delete the token files."""
+        rooms = [str(r) for r in room_numbers]
+        checkout_time = datetime.datetime.now().isoformat()
+        with self.pool.transaction() as conn:
+            voided = self._active_tokens(conn, rooms)
+            conn.executemany("""
+                UPDATE residents SET token_voided = 1, checkout_time = ?
+                WHERE room_number = ? AND token_voided = 0
+            """, [(checkout_time, room) for room in rooms])
+        remove_token_files(voided, tokens_dir)
+        self._changed()
+        print(f"Checked out {len(voided)} guest(s).")
+        return voided
+
+    def void_expired_tokens(self, now=None, tokens_dir=TOKENS_DIR):
+        """Void every token whose checkout_time has passed and delete its file. Returns the tokens voided."""
+        cutoff = (now or datetime.datetime.now()).isoformat()
+        with self.pool.transaction() as conn:
+            # idx_residents_voided_checkout: range scan over the still-active rows only
+            voided = [r[0] for r in conn.execute("""
+                SELECT device_token FROM residents
+                WHERE token_voided = 0 AND checkout_time <= ?
+            """, (cutoff,))]
+            if voided:
+                conn.execute("""
+                    UPDATE residents SET token_voided = 1
+                    WHERE token_voided = 0 AND checkout_time <= ?
+                """, (cutoff,))
+        if voided:
+            remove_token_files(voided, tokens_dir)
+            self._changed()
+        return voided
+
+    def _active_tokens(self, conn, room_numbers):
+        tokens = []
+        for room in room_numbers:
+            tokens += [r[0] for r in conn.execute(
+                "SELECT device_token FROM residents WHERE room_number = ? AND token_voided = 0", (room,))]
+        return tokens
 
     # ---------------------------
     # 1. Buildings CRUD
     # ---------------------------
-    def add_building(self, name):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("INSERT OR IGNORE INTO buildings (name) VALUES (?)", (name,))
-        conn.commit()
-        conn.close()
+    def add_building(self, name, wifi_ssid="", wifi_password="", restaurant_name=""):
+        with self.pool.transaction() as conn:
+            conn.execute("""
+                INSERT OR IGNORE INTO buildings (name, wifi_ssid, wifi_password, restaurant_name)
+                VALUES (?, ?, ?, ?)
+            """, (name, wifi_ssid, wifi_password, restaurant_name))
+        self._changed()
         print(f"Building added: {name}")
 
     def list_buildings(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT building_id, name FROM buildings")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT building_id, name, wifi_ssid, restaurant_name FROM buildings").fetchall()
 
     def delete_building(self, building_id):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM buildings WHERE building_id=?", (building_id,))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM buildings WHERE building_id=?", (building_id,))
+        self._changed()
         print(f"Building {building_id} deleted.")
 
     # ---------------------------
-    # 2. Wings CRUD
-    # ---------------------------
-    def add_wing(self, building_id, name, wifi_ssid, wifi_password):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO wings (building_id, name, wifi_ssid, wifi_password)
-            VALUES (?, ?, ?, ?)
-        """, (building_id, name, wifi_ssid, wifi_password))
-        conn.commit()
-        conn.close()
-        print(f"Wing added: {name} in building {building_id}")
-
-    def list_wings(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT wing_id, building_id, name, wifi_ssid FROM wings")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-
-    def delete_wing(self, wing_id):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM wings WHERE wing_id=?", (wing_id,))
-        conn.commit()
-        conn.close()
-        print(f"Wing {wing_id} deleted.")
-
-    # ---------------------------
-    # 3. Rooms CRUD
+    # 2. Rooms CRUD
     # ---------------------------
-    def add_room(self, room_number, building_id, wing_id, tv_brand="", fan_type="", thermostat_model=""):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO rooms (room_number, building_id, wing_id, tv_brand, fan_type, thermostat_model)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (room_number, building_id, wing_id, tv_brand, fan_type, thermostat_model))
-        conn.commit()
-        conn.close()
+    def add_room(self, room_number, building_id, floor=None, room_type="", tv_brand="", fan_type="", thermostat_model=""):
+        with self.pool.transaction() as conn:
+            conn.execute("""
+                INSERT INTO rooms (room_number, building_id, floor, room_type, tv_brand, fan_type, thermostat_model)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (room_number, building_id, floor, room_type, tv_brand, fan_type, thermostat_model))
+        self._changed(room_number)
         print(f"Room added: {room_number}")
 
     def list_rooms(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT room_number, building_id, wing_id FROM rooms")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT room_number, building_id, floor, room_type FROM rooms").fetchall()
 
     def delete_room(self, room_number):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM rooms WHERE room_number=?", (room_number,))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM rooms WHERE room_number=?", (room_number,))
+        self._changed()
         print(f"Room {room_number} deleted.")
 
     # ---------------------------
-    # 4. Amenities CRUD
+    # 3. Amenities CRUD
     # ---------------------------
     def add_amenity(self, building_id, name, description, floor):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO amenities (building_id, name, description, floor)
-            VALUES (?, ?, ?, ?)
-        """, (building_id, name, description, floor))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("""
+                INSERT INTO amenities (building_id, name, description, floor)
+                VALUES (?, ?, ?, ?)
+            """, (building_id, name, description, floor))
+        self._changed()
         print(f"Amenity added: {name} (Floor {floor})")
 
     def list_amenities(self):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT amenity_id, building_id, name, floor FROM amenities")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT amenity_id, building_id, name, floor FROM amenities").fetchall()
 
     def delete_amenity(self, amenity_id):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM amenities WHERE amenity_id=?", (amenity_id,))
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM amenities WHERE amenity_id=?", (amenity_id,))
+        self._changed()
         print(f"Amenity {amenity_id} deleted.")
 
     # ---------------------------
-    # Add more CRUD methods for Pools, Activity Center, Restaurant Menu similarly
+    # Pools, water sports and menus (and whole properties) are loaded with data/bulk_import.py
     # ---------------------------
 
 # ---------------------------
@@ -181,15 +282,16 @@ def main_menu():
         print("4. Add Building")
         print("5. List Buildings")
         print("6. Delete Building")
-        print("7. Add Wing")
-        print("8. List Wings")
-        print("9. Delete Wing")
-        print("10. Add Room")
-        print("11. List Rooms")
-        print("12. Delete Room")
-        print("13. Add Amenity")
-        print("14. List Amenities")
-        print("15. Delete Amenity")
+        print("7. Add Room")
+        print("8. List Rooms")
+        print("9. Delete Room")
+        print("10. Add Amenity")
+        print("11. List Amenities")
+        print("12. Delete Amenity")
+        print("13. Bulk Import from Files")
+        print("14. Batch Check-in from File")
+        print("15. Batch Check-out")
+        print("16. Void Expired Tokens")
         print("0. Exit")
 
         choice = input("Enter choice: ")
@@ -206,7 +308,10 @@ def main_menu():
             db.delete_resident(rid)
         elif choice == "4":
             name = input("Building name: ")
-            db.add_building(name)
+            ssid = input("WiFi SSID: ")
+            pwd = input("WiFi Password: ")
+            restaurant = input("Restaurant name: ")
+            db.add_building(name, ssid, pwd, restaurant)
         elif choice == "5":
             for b in db.list_buildings():
                 print(b)
@@ -214,43 +319,60 @@ def main_menu():
             bid = int(input("Building ID to delete: "))
             db.delete_building(bid)
         elif choice == "7":
-            bid = int(input("Building ID: "))
-            name = input("Wing name: ")
-            ssid = input("WiFi SSID: ")
-            pwd = input("WiFi Password: ")
-            db.add_wing(bid, name, ssid, pwd)
-        elif choice == "8":
-            for w in db.list_wings():
-                print(w)
-        elif choice == "9":
-            wid = int(input("Wing ID to delete: "))
-            db.delete_wing(wid)
-        elif choice == "10":
             rn = input("Room number: ")
             bid = int(input("Building ID: "))
-            wid = int(input("Wing ID: "))
+            floor = int(input("Floor: "))
+            room_type = input("Room type: ")
             tv = input("TV Brand: ")
             fan = input("Fan Type: ")
             thermo = input("Thermostat Model: ")
-            db.add_room(rn, bid, wid, tv, fan, thermo)
-        elif choice == "11":
+            db.add_room(rn, bid, floor, room_type, tv, fan, thermo)
+        elif choice == "8":
             for r in db.list_rooms():
                 print(r)
-        elif choice == "12":
+        elif choice == "9":
             rn = input("Room number to delete: ")
             db.delete_room(rn)
-        elif choice == "13":
+        elif choice == "10":
             bid = int(input("Building ID: "))
             name = input("Amenity name: ")
             desc = input("Description: ")
             floor = int(input("Floor: "))
             db.add_amenity(bid, name, desc, floor)
-        elif choice == "14":
+        elif choice == "11":
             for a in db.list_amenities():
                 print(a)
-        elif choice == "15":
+        elif choice == "12":
             aid = int(input("Amenity ID to delete: "))
             db.delete_amenity(aid)
+        elif choice == "13":
+            from data.bulk_import import import_files, ValidationFailed, ORDER
+            files = {}
+            for kind in ORDER:
+                path = input(f"{kind.replace('_', ' ').capitalize()} file (blank to skip): ").strip()
+                if path:
+                    files[kind] = path
+            try:
+                counts, _ = import_files(files, db.db_path)
+                print(f"Imported: {counts}")
+            except ValidationFailed as e:
+                print("\n".join(e.problems))
+                print(e)
+        elif choice == "14":
+            # CSV / JSON rows with name, room_number and optionally checkout_time
+            from data.bulk_import import read_rows
+            path = input("Guests file: ").strip()
+            guests = [(row["name"], row["room_number"], row.get("checkout_time")) for _, row in read_rows(path)]
+            try:
+                for room, token in db.check_in_residents(guests).items():
+                    print(f"Room {room}: {token}")
+            except ValueError as e:
+                print(e)
+        elif choice == "15":
+            rooms = input("Room numbers (comma separated): ").split(",")
+            db.check_out_residents([r.strip() for r in rooms if r.strip()])
+        elif choice == "16":
+            print(f"Voided {len(db.void_expired_tokens())} expired token(s).")
         elif choice == "0":
             print("Exiting...")
             break
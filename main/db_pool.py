@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# -----------------------
+# POOL SETTINGS
+# -----------------------
+BUSY_TIMEOUT_MS = 5000      # how long a writer waits on a locked db before SQLITE_BUSY
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+MAX_IDLE = 8                # idle connections kept around for reuse
+
+
+class ConnectionPool:
+    """
+    Shared SQLite connections for one database file.
+
+    A thread borrows a connection for the duration of a `with` block and gives it
+    back afterwards, so short-lived QThreads (ChatWorker) reuse warm connections
+    and their prepared statements instead of reconnecting on every call. Nested
+    blocks on the same thread get the same connection.
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,            # autocommit; writes use explicit BEGIN
+            check_same_thread=False,         # connections move between threads via the pool
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def _checkin(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow this thread's connection (read queries, autocommit)."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._checkin(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Borrow a connection inside a write transaction.
+        BEGIN IMMEDIATE takes the writer lock up front, so concurrent writers wait
+        on busy_timeout instead of failing halfway through a read-then-write.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                # Already inside an outer transaction on this thread
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+# -----------------------
+# ONE POOL PER DB FILE
+# -----------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+# -----------------------
+# BULK WRITES
+# -----------------------
+BULK_CHUNK = 20000  # rows per executemany; one transaction per chunk
+
+
+def executemany_chunked(pool, sql, rows, chunk=BULK_CHUNK):
+    """
+    executemany over any iterable in fixed-size chunks, one transaction each, so millions
+    of rows never sit in memory and readers are never locked out for the whole load.
+    Returns the number of rows written.
+    """
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk:
+            with pool.transaction() as conn:
+                conn.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        with pool.transaction() as conn:
+            conn.executemany(sql, batch)
+        total += len(batch)
+    return total
@@ -0,0 +1,181 @@
+import re
+from datetime import datetime
+from answer_cache import detect_language
+
+# ----------------------------------
+# Fast-path answers
+# ----------------------------------
+# Questions that map straight onto a column get_full_context already fetched (wifi,
+# last cleaning, today's menu) are answered from a template without calling the LLM.
+# Only short questions in one of the forms below are taken, matched from the start of a
+# clause ("Thanks. What's the wifi password?" works); a keyword mentioned in passing
+# ("the wifi isn't working, can you send someone") is not enough, and anything with a
+# problem report or a request for staff goes to the LLM as before. English and Filipino
+# (Tagalog) are supported.
+
+MAX_WORDS = 12
+
+# "wifi is not working" is a support request, not a lookup
+TROUBLE = re.compile(
+    r"\b(not|isn't|isnt|doesn't|doesnt|can't|cant|cannot|won't|wont|slow|broken|problem|issue|help|"
+    r"down|disconnect\w*|drop\w*|weak|signal|work|works|working|still|again|wrong|error|dirty|smell\w*|"
+    r"hindi|ayaw|sira|mabagal|wala)\b"
+)
+# Asking for something to be done rather than for information
+REQUEST = re.compile(
+    r"\b(send|bring|fix|repair|reset|restart|reboot|change|someone|somebody|anyone|call|order|book|reserve|"
+    r"cancel|deliver|refund|complain\w*|paki\w*|ipaayos|ipalinis|ipadala|ayusin|padala|dalhan|tawagan)\b"
+)
+
+# Clause openers that carry no meaning ("ok so what's ...", "hi po, ano ...")
+FILLER = r"(?:(?:and|so|also|oh|um|ok|okay|hi|hello|hey|thanks|thank you|salamat|po|uhm)\s+)*"
+ASK = (r"(?:what(?:'s| is| are)?|whats|which|tell me|give me|show me|can i (?:have|get|see|know)|"
+       r"could i (?:have|get|see)|may i (?:have|get|see|know)|i need|"
+       r"ano(?:ng| ang| ba ang| yung)?|pahingi(?: ng)?|pwede(?: po)?(?: bang?)? (?:makuha|malaman|makita))\b")
+
+WIFI = re.compile(FILLER + r"(?:"
+                  + ASK + r".*\b(?:wi-?fi|internet|ssid)\b"
+                  r"|how (?:do|can) i (?:connect|get on|log ?in)\b.*\b(?:wi-?fi|internet)\b"
+                  r"|paano (?:mag-?connect|kumonekta)\b.*\b(?:wi-?fi|internet)\b"
+                  r"|(?:the )?(?:wi-?fi|internet)(?: password| pass| network| name| ssid| details)?(?: please| pls| po)?$"
+                  r")")
+
+CLEANED = re.compile(FILLER + r"(?:"
+                     r"(?:when|what time)\b.*\b(?:was|were|did|has)\b.*\bclean(?:ed)?\b"
+                     r"|(?:was|has|have)\b.*\bcleaned\b"
+                     r"|(?:last|latest) (?:clean(?:ed|ing)|housekeeping)\b"
+                     r"|kailan\b.*\b(?:nilinis|naglinis|huling linis)\b"
+                     r"|(?:huling|huli) (?:linis|paglilinis)\b"
+                     r"|(?:nalinis|nilinis)(?: na)? ba\b"
+                     r")")
+# The cleaning log is the guest's room's; "when was the pool cleaned" isn't about it
+OWN_ROOM = re.compile(r"\b(?:room|kwarto|silid)\b")
+
+MEALS = {
+    "breakfast": "Breakfast", "almusal": "Breakfast",
+    "brunch": "Brunch",
+    "lunch": "Lunch", "tanghalian": "Lunch",
+    "dinner": "Dinner", "hapunan": "Dinner",
+}
+MENU_WORDS = r"(?:menu|breakfast|brunch|lunch|dinner|almusal|tanghalian|hapunan|ulam)"
+MENU = re.compile(FILLER + r"(?:"
+                  + ASK + r".*\b" + MENU_WORDS + r"\b"
+                  r"|(?:today'?s |the )?" + MENU_WORDS + r"(?: menu)?(?: today| for today| ngayon)?(?: please| pls| po)?$"
+                  r")")
+# Menu questions the item list doesn't answer: opening hours, place, price, diets, dress
+# code, and anything about restaurants outside the hotel
+MENU_OTHER = re.compile(
+    r"\b(time|oras|open|opens|close|closes|closed|hours?|until|where|saan|nasaan|price|cost|how much|magkano|"
+    r"included|free|allerg\w*|vegan|vegetarian|gluten|halal|dress|code|attire|reservations?|"
+    r"nearby|near|around|outside|city|town|local|restaurants|recommend\w*|suggest\w*|malapit|labas)\b"
+)
+
+TEMPLATES = {
+    "wifi": {
+        "en": "The Wi-Fi network in {building} is {ssid}, and the password is {password}.",
+        "fil": "Ang Wi-Fi network sa {building} ay {ssid}, at ang password ay {password}.",
+    },
+    "cleaned": {
+        "en": "Your room was last cleaned on {time} by {cleaner}.",
+        "fil": "Huling nilinis ang kwarto mo noong {time} ni {cleaner}.",
+    },
+    "not_cleaned": {
+        "en": "I don't have a cleaning record for your room yet.",
+        "fil": "Wala pa akong record ng paglilinis sa kwarto mo.",
+    },
+    "menu": {
+        "en": "Today ({day}) at {restaurant}: {items}.",
+        "fil": "Ngayong {day} sa {restaurant}: {items}.",
+    },
+    "no_meal": {
+        "en": "{restaurant} has no {meal} listed today ({day}). Today's menu: {items}.",
+        "fil": "Walang {meal} na nakalista sa {restaurant} ngayong {day}. Ang menu ngayon: {items}.",
+    },
+    "no_menu": {
+        "en": "There's no menu listed for {restaurant} today ({day}).",
+        "fil": "Walang nakalistang menu sa {restaurant} ngayong {day}.",
+    },
+}
+
+
+def _format_time(value):
+    try:
+        return datetime.fromisoformat(value).strftime("%B %d, %Y at %I:%M %p").replace(" 0", " ")
+    except (TypeError, ValueError):
+        return value
+
+
+def _asked(pattern, text, subject=None):
+    """True if some clause of the message starts with one of the pattern's question forms (and names `subject`)."""
+    for clause in re.split(r"[.!?,;]+", text):
+        clause = clause.strip()
+        if pattern.match(clause) and (subject is None or subject.search(clause)):
+            return True
+    return False
+
+
+def _wifi(context, text, lang):
+    if not _asked(WIFI, text):
+        return None
+    building = context.get("building") or {}
+    if not building.get("wifi_ssid"):
+        return None
+    return TEMPLATES["wifi"][lang].format(
+        building=building.get("name"), ssid=building["wifi_ssid"], password=building.get("wifi_password"))
+
+
+def _cleaned(context, text, lang):
+    if not _asked(CLEANED, text, OWN_ROOM):
+        return None
+    log = context.get("housekeeping") or []
+    if not log:
+        return TEMPLATES["not_cleaned"][lang]
+    latest = max(log, key=lambda row: row.get("cleaned_time") or "")
+    # "Maria S." would end the sentence with ".."
+    cleaner = (latest["cleaner_name"] or "").rstrip(".")
+    return TEMPLATES["cleaned"][lang].format(time=_format_time(latest["cleaned_time"]), cleaner=cleaner)
+
+
+def _menu(context, text, lang):
+    if not _asked(MENU, text) or MENU_OTHER.search(text):
+        return None
+    restaurant = (context.get("building") or {}).get("restaurant_name") or "the restaurant"
+    day = datetime.now().strftime("%A")
+    rows = context.get("restaurant_menu") or []
+    if not rows:
+        return TEMPLATES["no_menu"][lang].format(restaurant=restaurant, day=day)
+
+    by_meal = {}
+    for row in rows:
+        by_meal.setdefault(row["meal"], []).append(row["item_name"])
+    items = "; ".join(f"{meal}: {', '.join(names)}" for meal, names in by_meal.items())
+
+    asked = {MEALS[w] for w in re.findall(r"[a-z]+", text) if w in MEALS}
+    if asked:
+        served = [m for m in by_meal if m in asked]
+        if not served:
+            return TEMPLATES["no_meal"][lang].format(restaurant=restaurant, meal=" / ".join(sorted(asked)).lower(),
+                                                     day=day, items=items)
+        items = "; ".join(f"{meal}: {', '.join(by_meal[meal])}" for meal in served)
+    return TEMPLATES["menu"][lang].format(day=day, restaurant=restaurant, items=items)
+
+
+# Checked in order; the first matcher that returns a reply wins
+MATCHERS = [
+    ("wifi", _wifi),
+    ("cleaned", _cleaned),
+    ("menu", _menu),
+]
+
+
+def fast_answer(user_input, context):
+    """(intent, reply) for a question answerable straight from the context, else None."""
+    text = user_input.lower()
+    if len(text.split()) > MAX_WORDS or TROUBLE.search(text) or REQUEST.search(text):
+        return None
+    lang = detect_language(user_input)
+    for intent, matcher in MATCHERS:
+        reply = matcher(context, text, lang)
+        if reply:
+            return intent, reply
+    return None
@@ -0,0 +1,155 @@
+import math
+import os
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QPixmap, QImage, QColor, QPainter
+
+# ----------------------------------
+# GUI assets
+# ----------------------------------
+# Images are loaded from main/media (next to this file, not a hard-coded C:\ path) and
+# scaled once per requested size. Drop shadows are pre-rendered nine-patch images painted
+# around a rect, replacing a live QGraphicsDropShadowEffect blur per widget.
+
+MEDIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "media")
+
+SHADOW_COLOR = QColor(0, 0, 0, 160)   # same look as the old create_shadow()
+SHADOW_BLUR = 8
+SHADOW_OFFSET = (2, 2)
+SHADOW_PAD = SHADOW_BLUR + max(SHADOW_OFFSET)   # room a baked-in shadow needs around an image
+
+_pixmaps = {}
+_shadows = {}
+
+
+def media_path(name):
+    return name if os.path.isabs(name) else os.path.join(MEDIA_DIR, name)
+
+
+def pixmap(name, width=None, height=None):
+    """
+    A media image scaled smoothly to fit width x height (keeping aspect ratio), or to
+    width alone; None if the file is missing. Each size is loaded and scaled only once.
+    """
+    key = (name, width, height)
+    if key in _pixmaps:
+        return _pixmaps[key]
+    path = media_path(name)
+    result = None
+    if os.path.exists(path):
+        result = QPixmap(path)
+        if result.isNull():
+            result = None
+        elif width and height:
+            result = result.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        elif width:
+            result = result.scaledToWidth(width, Qt.SmoothTransformation)
+    _pixmaps[key] = result
+    return result
+
+
+# ----------------------------------
+# Nine-patch shadows
+# ----------------------------------
+class NinePatch:
+    """A shadow image split into fixed corners and stretchable edges/centre."""
+
+    def __init__(self, image, margin):
+        self.pixmap = QPixmap.fromImage(image)
+        self.margin = margin
+
+    def draw(self, painter, target):
+        """Paint around `target` (QRect/QRectF): corners as-is, edges and centre stretched."""
+        m = self.margin
+        size = self.pixmap.width()
+        inner = size - 2 * m
+        x0, y0 = int(target.left()), int(target.top())
+        w, h = int(math.ceil(target.width())), int(math.ceil(target.height()))
+        # Target columns/rows: margin, stretched middle, margin
+        xs = [(x0, m, 0), (x0 + m, w - 2 * m, m), (x0 + w - m, m, size - m)]
+        ys = [(y0, m, 0), (y0 + m, h - 2 * m, m), (y0 + h - m, m, size - m)]
+        for ty, th, sy in ys:
+            if th <= 0:
+                continue
+            for tx, tw, sx in xs:
+                if tw <= 0:
+                    continue
+                sw = m if sx != m else inner
+                sh = m if sy != m else inner
+                painter.drawPixmap(QRect(tx, ty, tw, th), self.pixmap, QRect(sx, sy, sw, sh))
+
+
+def _render_shadow(radius, blur, color):
+    """Soft rounded-rect shadow image; alpha falls off over `blur` px outside the shape."""
+    margin = radius + blur
+    size = 2 * margin + 1
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    half = size / 2.0
+    inner = half - blur   # half-size of the shape itself
+    for y in range(size):
+        for x in range(size):
+            # Signed distance from the pixel centre to a rounded square of half-size `inner`
+            dx = max(abs(x + 0.5 - half) - (inner - radius), 0.0)
+            dy = max(abs(y + 0.5 - half) - (inner - radius), 0.0)
+            distance = math.hypot(dx, dy) - radius
+            if distance <= -blur:
+                coverage = 1.0
+            elif distance >= blur:
+                continue
+            else:
+                t = (distance + blur) / (2.0 * blur)
+                coverage = 1.0 - t * t * (3 - 2 * t)   # smoothstep
+            alpha = int(color.alpha() * coverage)
+            image.setPixelColor(x, y, QColor(color.red(), color.green(), color.blue(), alpha))
+    return NinePatch(image, margin)
+
+
+def shadow(radius, blur=SHADOW_BLUR, color=SHADOW_COLOR):
+    key = (radius, blur, color.rgba())
+    patch = _shadows.get(key)
+    if patch is None:
+        patch = _shadows[key] = _render_shadow(radius, blur, color)
+    return patch
+
+
+def draw_shadow(painter, rect, radius, blur=SHADOW_BLUR, color=SHADOW_COLOR, offset=SHADOW_OFFSET):
+    """Paint a drop shadow for a rounded rect (call before painting the rect itself)."""
+    target = QRectF(rect).translated(*offset).adjusted(-blur, -blur, blur, blur)
+    shadow(radius, blur, color).draw(painter, target)
+
+
+def shadowed_pixmap(name, width=None, height=None):
+    """
+    A cached copy of a media image with its drop shadow baked in, following the image's
+    own alpha (for static images like the logo and the bot icon). The result is larger
+    than the image by SHADOW_PAD on every side.
+    """
+    key = ("shadowed", name, width, height)
+    if key in _pixmaps:
+        return _pixmaps[key]
+    source = pixmap(name, width, height)
+    result = None
+    if source is not None:
+        w, h = source.width() + 2 * SHADOW_PAD, source.height() + 2 * SHADOW_PAD
+
+        # Silhouette of the image in the shadow colour, blurred by a smooth down/up scale
+        silhouette = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+        silhouette.fill(Qt.transparent)
+        painter = QPainter(silhouette)
+        painter.drawPixmap(SHADOW_PAD, SHADOW_PAD, source)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+        painter.fillRect(silhouette.rect(), SHADOW_COLOR)
+        painter.end()
+        step = max(1, SHADOW_BLUR // 2)
+        blurred = silhouette.scaled(max(1, w // step), max(1, h // step), Qt.IgnoreAspectRatio,
+                                    Qt.SmoothTransformation).scaled(w, h, Qt.IgnoreAspectRatio,
+                                                                    Qt.SmoothTransformation)
+
+        result = QPixmap(w, h)
+        result.fill(Qt.transparent)
+        painter = QPainter(result)
+        painter.drawImage(SHADOW_OFFSET[0], SHADOW_OFFSET[1], blurred)
+        painter.drawPixmap(SHADOW_PAD, SHADOW_PAD, source)
+        painter.end()
+    _pixmaps[key] = result
+    return result
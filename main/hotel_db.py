@@ -1,30 +1,31 @@
-import sqlite3
+import os
 from datetime import datetime
+from db_pool import get_pool
+from migrations import migrate
+from context_cache import ContextCache
 
-DB_PATH = "data/hotel.db"
+DB_PATH = os.getenv("TAVV_DB", "data/hotel.db")   # e.g. a bench/synth_hotel.py database for load tests
+HOUSEKEEPING_HISTORY = 5  # most recent cleanings shown per room
 
 class DatabaseLoader:
 
-    def __init__(self, db_path=DB_PATH):
-        self.db_path = db_path
-
-    def connect(self):
-        return sqlite3.connect(self.db_path)
+    def __init__(self, db_path=None, use_cache=True):
+        # TAVV_DB is read when the loader is made, so a script can set it after importing this module
+        self.db_path = db_path = db_path or os.getenv("TAVV_DB", DB_PATH)
+        migrate(db_path)
+        self.pool = get_pool(db_path)
+        self.cache = ContextCache(db_path) if use_cache else None
 
     # -----------------------
     # TOKEN → RESIDENT LOOKUP
     # -----------------------
     def get_resident_from_token(self, token):
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT resident_id, name, room_number, device_token, checkin_time, checkout_time, token_voided
-            FROM residents
-            WHERE device_token = ? AND token_voided = 0
-        """, (token,))
-    
-        row = cursor.fetchone()
-        conn.close()
+        with self.pool.connection() as conn:
+            row = conn.execute("""
+                SELECT resident_id, name, room_number, device_token, checkin_time, checkout_time, token_voided
+                FROM residents
+                WHERE device_token = ? AND token_voided = 0
+            """, (token,)).fetchone()
 
         if not row:
             return None
@@ -39,106 +40,125 @@ class DatabaseLoader:
             "token_voided": bool(row[6])
         }
 
+    # -----------------------
+    # ACTIVE ROOMS
+    # -----------------------
+    def get_active_rooms(self):
+        """Rooms with a checked-in resident whose token is still valid."""
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT DISTINCT room_number FROM residents WHERE token_voided = 0").fetchall()
+        return {r[0] for r in rows}
+
     # -----------------------
     # FULL CONTEXT (ROOM)
     # -----------------------
     def get_full_context(self, room_number: str):
-
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        # 0. Resident info (active only)
-        cursor.execute("""
-            SELECT resident_id, name, room_number, device_token, checkin_time
-            FROM residents
-            WHERE room_number = ? AND token_voided = 0
-        """, (room_number,))
-        resident = cursor.fetchone()
-
-        if resident:
-            resident_info = {
-                "resident_id": resident[0],
-                "resident_name": resident[1],
-                "resident_room": resident[2],
-                "resident_device_token": resident[3],
-                "resident_checkin_time": resident[4]
-            }
+        if self.cache is None:
+            room = self._load_room_sections(room_number)
+            if "error" in room:
+                return room
+            hotel = self._load_hotel_sections()
+            menu = self._load_menu(room["building"]["restaurant_name"], datetime.now().strftime("%A"))
         else:
-            resident_info = None
-
-        # 1. Room + building
-        cursor.execute("""
-            SELECT 
-                r.room_number,
-                r.tv_brand,
-                r.fan_type,
-                r.thermostat_model,
-                r.floor,
-                r.room_type,
-                b.building_id,
-                b.name AS building_name,
-                b.wifi_ssid,
-                b.wifi_password,
-                b.restaurant_name
-            FROM rooms r
-            JOIN buildings b ON r.building_id = b.building_id
-            WHERE r.room_number = ?
-        """, (room_number,))
-        room = cursor.fetchone()
-
-        if not room:
-            conn.close()
-            return {"error": f"Room {room_number} not found."}
-
-        (
-            room_number,
-            tv_brand,
-            fan_type,
-            thermostat_model,
-            floor,
-            room_type,
-            building_id,
-            building_name,
-            wifi_ssid,
-            wifi_password,
-            restaurant_name
-        ) = room
-
-        # 2. Amenities
-        cursor.execute("""
-            SELECT name, description, floor
-            FROM amenities
-            WHERE building_id = ?
-        """, (building_id,))
-        amenities = cursor.fetchall()
-
-        # 3. Water sports activities
-        cursor.execute("SELECT name, description FROM water_sports")
-        water_sports = cursor.fetchall()
-
-        # 4. Pools
-        cursor.execute("SELECT name, features FROM pools")
-        pools = cursor.fetchall()
-
-        # 5. Restaurant menu (Island Cafe only)
-        today_day = datetime.now().strftime("%A")
-        cursor.execute("""
-            SELECT day, meal, item_name
-            FROM restaurant_menu
-            WHERE restaurant_name = ? AND day = ?
-            ORDER BY meal, item_name
-        """, (restaurant_name, today_day))
-        menu = cursor.fetchall()
-
-        # 6. hotel
-        cursor.execute("SELECT name, location, nearby_restaurants, fun_destinations FROM hotel")
-        hotel = cursor.fetchall()
-
-        # 7. housekeeping
-        cursor.execute("SELECT log_id, room_number, cleaned_time, cleaner_name FROM housekeeping_log")
-        housekeep = cursor.fetchall()
-
-        conn.close()
+            self.cache.refresh()
+            room = self.cache.room_sections(room_number, lambda: self._load_room_sections(room_number))
+            if "error" in room:
+                return room
+            hotel = self.cache.hotel_sections(self._load_hotel_sections)
+            restaurant_name = room["building"]["restaurant_name"]
+            today_day = datetime.now().strftime("%A")
+            menu = self.cache.menu(restaurant_name, today_day, lambda: self._load_menu(restaurant_name, today_day))
+
+        return {
+            "resident": room["resident"],
+            "room": room["room"],
+            "building": room["building"],
+            "amenities": room["amenities"],
+            "water_sports": hotel["water_sports"],
+            "pools": hotel["pools"],
+            "housekeeping": room["housekeeping"],
+            "hotel": hotel["hotel"],
+            "restaurant_menu": menu
+        }
+
+    # Room-scoped sections: resident, room, building, amenities, housekeeping
+    def _load_room_sections(self, room_number):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            # 0. Resident info (active only)
+            cursor.execute("""
+                SELECT resident_id, name, room_number, device_token, checkin_time
+                FROM residents
+                WHERE room_number = ? AND token_voided = 0
+            """, (room_number,))
+            resident = cursor.fetchone()
+
+            if resident:
+                resident_info = {
+                    "resident_id": resident[0],
+                    "resident_name": resident[1],
+                    "resident_room": resident[2],
+                    "resident_device_token": resident[3],
+                    "resident_checkin_time": resident[4]
+                }
+            else:
+                resident_info = None
+
+            # 1. Room + building
+            cursor.execute("""
+                SELECT 
+                    r.room_number,
+                    r.tv_brand,
+                    r.fan_type,
+                    r.thermostat_model,
+                    r.floor,
+                    r.room_type,
+                    b.building_id,
+                    b.name AS building_name,
+                    b.wifi_ssid,
+                    b.wifi_password,
+                    b.restaurant_name
+                FROM rooms r
+                JOIN buildings b ON r.building_id = b.building_id
+                WHERE r.room_number = ?
+            """, (room_number,))
+            room = cursor.fetchone()
+
+            if not room:
+                return {"error": f"Room {room_number} not found."}
+
+            (
+                room_number,
+                tv_brand,
+                fan_type,
+                thermostat_model,
+                floor,
+                room_type,
+                building_id,
+                building_name,
+                wifi_ssid,
+                wifi_password,
+                restaurant_name
+            ) = room
+
+            # 2. Amenities
+            cursor.execute("""
+                SELECT name, description, floor
+                FROM amenities
+                WHERE building_id = ?
+            """, (building_id,))
+            amenities = cursor.fetchall()
+
+            # 3. housekeeping (this room only, newest first; idx_housekeeping_room_time)
+            cursor.execute("""
+                SELECT log_id, room_number, cleaned_time, cleaner_name
+                FROM housekeeping_log
+                WHERE room_number = ?
+                ORDER BY cleaned_time DESC
+                LIMIT ?
+            """, (room_number, HOUSEKEEPING_HISTORY))
+            housekeep = cursor.fetchall()
 
         return {
             "resident": resident_info,
@@ -160,19 +180,45 @@ class DatabaseLoader:
             "amenities": [
                 {"name": a[0], "description": a[1], "floor": a[2]} for a in amenities
             ],
+            "housekeeping": [
+                {"log_id": hk[0], "room_number": hk[1], "cleaned_time": hk[2], "cleaner_name": hk[3],} for hk in housekeep
+            ]
+        }
+
+    # Hotel-wide sections: shared by every room
+    def _load_hotel_sections(self):
+        with self.pool.connection() as conn:
+            # Water sports activities
+            water_sports = conn.execute("SELECT name, description FROM water_sports").fetchall()
+
+            # Pools
+            pools = conn.execute("SELECT name, features FROM pools").fetchall()
+
+            # hotel
+            hotel = conn.execute("SELECT name, location, nearby_restaurants, fun_destinations FROM hotel").fetchall()
+
+        return {
             "water_sports": [
                 {"name": ws[0], "description": ws[1]} for ws in water_sports
             ],
             "pools": [
                 {"name": p[0], "features": p[1]} for p in pools
             ],
-                        "housekeeping": [
-                {"log_id": hk[0], "room_number": hk[1], "cleaned_time": hk[2], "cleaner_name": hk[3],} for hk in housekeep
-            ],
-                        "hotel": [
+            "hotel": [
                 {"name": h[0], "location": h[1], "nearby_restaurants": h[2], "fundestinations": h[3]} for h in hotel
-            ],
-            "restaurant_menu": [
-                {"day": m[0], "meal": m[1], "item_name": m[2]} for m in menu
             ]
         }
+
+    # Restaurant menu for one restaurant and weekday
+    def _load_menu(self, restaurant_name, day):
+        with self.pool.connection() as conn:
+            menu = conn.execute("""
+                SELECT day, meal, item_name
+                FROM restaurant_menu
+                WHERE restaurant_name = ? AND day = ?
+                ORDER BY meal, item_name
+            """, (restaurant_name, day)).fetchall()
+
+        return [
+            {"day": m[0], "meal": m[1], "item_name": m[2]} for m in menu
+        ]
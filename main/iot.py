@@ -0,0 +1,392 @@
+import asyncio
+import atexit
+import json
+import math
+import re
+import threading
+import time
+
+# ----------------------------------
+# In-room device control
+# ----------------------------------
+# The model asks for device changes through tool calls (DEVICE_TOOLS). The calls are
+# parsed into DeviceActions and handed to a DeviceDispatcher, which runs them on a
+# background event loop so the chat reply never waits on hardware. Each room has its own
+# queue: commands that arrive close together are batched, repeated settings collapse to
+# the last one and thermostat nudges add up, and a room's controller is never sent more
+# than one batch per MIN_BATCH_INTERVAL. DeviceSimulator stands in for the controllers
+# (keyed by the rooms.tv_brand / fan_type / thermostat_model values) until real ones exist.
+
+BATCH_WINDOW = 0.3          # seconds to wait for more commands before sending a batch
+MIN_BATCH_INTERVAL = 1.0    # seconds between batches to one room's controller
+MAX_PENDING = 32            # queued actions per room; older ones are dropped past this
+
+DEVICE_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "set_thermostat",
+            "description": "Set the room's air-conditioning thermostat.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "temperature": {"type": "number", "description": "Target temperature in Celsius"},
+                    "mode": {"type": "string", "enum": ["cool", "heat", "auto", "fan", "off"]},
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "adjust_thermostat",
+            "description": "Nudge the thermostat up or down relative to its current setting.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "delta": {"type": "number", "description": "Degrees Celsius, negative for cooler"},
+                },
+                "required": ["delta"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "set_tv",
+            "description": "Control the room's TV.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "power": {"type": "string", "enum": ["on", "off"]},
+                    "volume": {"type": "integer", "description": "0-100"},
+                    "channel": {"type": "string"},
+                    "app": {"type": "string", "description": "Streaming app to open, e.g. Netflix or YouTube"},
+                    "brightness": {"type": "integer", "description": "0-100"},
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "set_fan",
+            "description": "Control the room's fan.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "power": {"type": "string", "enum": ["on", "off"]},
+                    "speed": {"type": "string", "enum": ["low", "medium", "high"]},
+                },
+            },
+        },
+    },
+]
+
+TOOL_DEVICES = {
+    "set_thermostat": "thermostat",
+    "adjust_thermostat": "thermostat",
+    "set_tv": "tv",
+    "set_fan": "fan",
+}
+
+# Messages that might be asking for a device change; only these get the tools attached
+DEVICE_WORDS = re.compile(
+    r"\b(tv|television|telebisyon|watch|manood|channel|netflix|youtube|volume|"
+    r"aircon|air ?con\w*|ac|thermostat|temperature|cold|chilly|freezing|hot|warm|"
+    r"lamig|malamig|ginaw|init|mainit|fan|bentilador|bright|dim|dark|turn|switch|"
+    r"buksan|patayin|hinaan|lakasan)\b"
+)
+
+
+def wants_devices(message):
+    return DEVICE_WORDS.search(message.lower()) is not None
+
+
+class DeviceAction:
+    def __init__(self, device, command, args):
+        self.device = device
+        self.command = command
+        self.args = args
+
+    def __repr__(self):
+        return f"DeviceAction({self.device}, {self.command}, {self.args})"
+
+
+# Argument checks per tool: name -> (kind, allowed values or (min, max)). The model's
+# arguments are JSON it wrote itself, so "22", "a bit" or 500 all turn up; every value is
+# converted and range-checked here, and a call with any bad argument is dropped whole.
+TOOL_ARGS = {
+    "set_thermostat": {"temperature": ("number", (10, 35)), "mode": ("choice", ("cool", "heat", "auto", "fan", "off"))},
+    "adjust_thermostat": {"delta": ("number", (-10, 10))},
+    "set_tv": {
+        "power": ("choice", ("on", "off")),
+        "volume": ("integer", (0, 100)),
+        "channel": ("text", None),
+        "app": ("text", None),
+        "brightness": ("integer", (0, 100)),
+    },
+    "set_fan": {"power": ("choice", ("on", "off")), "speed": ("choice", ("low", "medium", "high"))},
+}
+REQUIRED_ARGS = {"adjust_thermostat": ("delta",)}
+
+
+def check_arg(kind, rule, value):
+    """The converted value, or raise ValueError."""
+    if kind in ("number", "integer"):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"expected a number, got {value!r}")
+        number = float(value)
+        if not math.isfinite(number) or not rule[0] <= number <= rule[1]:
+            raise ValueError(f"{number:g} is outside {rule[0]}-{rule[1]}")
+        return round(number) if kind == "integer" else number
+    if kind == "choice":
+        choice = str(value).strip().lower()
+        if choice not in rule:
+            raise ValueError(f"expected one of {', '.join(rule)}, got {value!r}")
+        return choice
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool) or not str(value).strip():
+        raise ValueError(f"expected text, got {value!r}")
+    return str(value).strip()
+
+
+def clean_args(name, args):
+    """Known arguments converted to their types; raises ValueError if any is invalid or missing."""
+    cleaned = {}
+    for key, (kind, rule) in TOOL_ARGS[name].items():
+        if args.get(key) is not None:
+            cleaned[key] = check_arg(kind, rule, args[key])
+    missing = [key for key in REQUIRED_ARGS.get(name, ()) if key not in cleaned]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return cleaned
+
+
+def parse_tool_calls(tool_calls):
+    """
+    DeviceActions from the model's tool calls. Accepts SDK objects or the
+    {"function": {"name", "arguments"}} dicts built while streaming. Calls with
+    malformed or out-of-range arguments are skipped.
+    """
+    actions = []
+    for call in tool_calls or []:
+        function = call["function"] if isinstance(call, dict) else call.function
+        name = function["name"] if isinstance(function, dict) else function.name
+        raw = function["arguments"] if isinstance(function, dict) else function.arguments
+        if name not in TOOL_DEVICES:
+            continue
+        try:
+            args = json.loads(raw or "{}")
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(args, dict):
+            continue
+        try:
+            actions.append(DeviceAction(TOOL_DEVICES[name], name, clean_args(name, args)))
+        except ValueError as e:
+            print(f"Ignoring {name} call with bad arguments {raw!r}: {e}")
+    return actions
+
+
+def coalesce(actions):
+    """
+    Collapse a batch into at most one command per device: later settings win,
+    thermostat nudges are summed (and applied on top of any absolute setting).
+    """
+    merged = {}
+    for action in actions:
+        current = merged.setdefault(action.device, {})
+        if action.command == "adjust_thermostat":
+            current["delta"] = current.get("delta", 0) + action.args.get("delta", 0)
+        else:
+            if "temperature" in action.args:
+                current.pop("delta", None)
+            current.update(action.args)
+    return merged
+
+
+# ----------------------------------
+# Simulated controllers
+# ----------------------------------
+DEVICE_PROFILES = {
+    # thermostats: (min °C, max °C, step)
+    "Nest V3": {"kind": "thermostat", "range": (10, 32), "step": 0.5, "default": 24},
+    "Honeywell T6": {"kind": "thermostat", "range": (7, 32), "step": 0.5, "default": 24},
+    # TVs
+    "Samsung": {"kind": "tv", "volume": (0, 100), "apps": {"netflix", "youtube", "prime video", "disney+"}},
+    "LG": {"kind": "tv", "volume": (0, 100), "apps": {"netflix", "youtube", "prime video"}},
+    # fans
+    "Ceiling Fan": {"kind": "fan", "speeds": ["low", "medium", "high"]},
+    "Tower Fan": {"kind": "fan", "speeds": ["low", "medium", "high"]},
+}
+GENERIC_PROFILES = {
+    "thermostat": {"kind": "thermostat", "range": (16, 30), "step": 1, "default": 24},
+    "tv": {"kind": "tv", "volume": (0, 100), "apps": set()},
+    "fan": {"kind": "fan", "speeds": ["low", "medium", "high"]},
+}
+
+
+class DeviceSimulator:
+    """Stand-in for one room's controllers, keyed by the models stored in the rooms table."""
+
+    def __init__(self, room_number, tv_brand=None, fan_type=None, thermostat_model=None, latency=0.05):
+        self.room_number = room_number
+        self.latency = latency
+        self.profiles = {
+            "thermostat": DEVICE_PROFILES.get(thermostat_model, GENERIC_PROFILES["thermostat"]),
+            "tv": DEVICE_PROFILES.get(tv_brand, GENERIC_PROFILES["tv"]),
+            "fan": DEVICE_PROFILES.get(fan_type, GENERIC_PROFILES["fan"]),
+        }
+        self.state = {
+            "thermostat": {"temperature": self.profiles["thermostat"]["default"], "mode": "cool"},
+            "tv": {"power": "off", "volume": 20, "channel": None, "app": None, "brightness": 70},
+            "fan": {"power": "off", "speed": "low"},
+        }
+        self.log = []
+
+    async def apply(self, device, settings):
+        await asyncio.sleep(self.latency)  # controller round trip
+        state = self.state[device]
+        profile = self.profiles[device]
+        if device == "thermostat":
+            low, high = profile["range"]
+            temperature = float(settings.get("temperature", state["temperature"])) + settings.get("delta", 0)
+            step = profile["step"]
+            state["temperature"] = min(high, max(low, round(temperature / step) * step))
+            if settings.get("mode"):
+                state["mode"] = settings["mode"]
+        elif device == "tv":
+            for key in ("power", "channel"):
+                if settings.get(key) is not None:
+                    state[key] = settings[key]
+            for key in ("volume", "brightness"):
+                if settings.get(key) is not None:
+                    state[key] = min(100, max(0, int(settings[key])))
+            if settings.get("app"):
+                app = str(settings["app"]).lower()
+                if not profile["apps"] or app in profile["apps"]:
+                    state["app"] = app
+                    state["power"] = "on"
+        elif device == "fan":
+            if settings.get("power"):
+                state["power"] = settings["power"]
+            if settings.get("speed") in profile["speeds"]:
+                state["speed"] = settings["speed"]
+                state["power"] = "on"
+        self.log.append((time.time(), device, dict(settings), dict(state)))
+        return dict(state)
+
+
+# ----------------------------------
+# Dispatch
+# ----------------------------------
+class DeviceDispatcher:
+    """Per-room command queues, drained on a background event loop thread."""
+
+    def __init__(self, controller_factory=DeviceSimulator):
+        self.controller_factory = controller_factory
+        self.controllers = {}
+        self._queues = {}
+        self._tasks = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="device-dispatch", daemon=True)
+        self._thread.start()
+        self.sent_batches = 0
+        self.dropped = 0
+        atexit.register(self.close)
+
+    def submit(self, room_number, room_info, actions):
+        """Queue actions for a room and return immediately (safe from any thread)."""
+        if actions:
+            self._loop.call_soon_threadsafe(self._enqueue, room_number, room_info or {}, list(actions))
+
+    def _enqueue(self, room_number, room_info, actions):
+        if room_number not in self.controllers:
+            self.controllers[room_number] = self.controller_factory(
+                room_number,
+                tv_brand=room_info.get("tv_brand"),
+                fan_type=room_info.get("fan_type"),
+                thermostat_model=room_info.get("thermostat_model"),
+            )
+        queue = self._queues.get(room_number)
+        if queue is None:
+            queue = self._queues[room_number] = asyncio.Queue()
+            self._tasks.append(self._loop.create_task(self._drain(room_number, queue)))
+        for action in actions:
+            if queue.qsize() >= MAX_PENDING:
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(action)
+
+    async def _drain(self, room_number, queue):
+        controller = self.controllers[room_number]
+        last_sent = 0.0
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(BATCH_WINDOW)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            wait = MIN_BATCH_INTERVAL - (time.monotonic() - last_sent)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+
+            # A bad batch is logged and dropped; the loop has to live on for the room's next commands
+            try:
+                merged = coalesce(batch)
+            except Exception as e:
+                print(f"Dropped a device batch for room {room_number}: {e}")
+                merged = {}
+            for device, settings in merged.items():
+                try:
+                    await controller.apply(device, settings)
+                except Exception as e:
+                    print(f"Device command failed in room {room_number} ({device}): {e}")
+            last_sent = time.monotonic()
+            self.sent_batches += 1
+
+    def close(self):
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join(timeout=5)
+
+    async def _shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def state(self, room_number):
+        controller = self.controllers.get(room_number)
+        return None if controller is None else controller.state
+
+
+# ----------------------------------
+# Confirmation text
+# ----------------------------------
+def describe_actions(actions):
+    """Short confirmation for when the model called tools without writing a reply."""
+    parts = []
+    for device, settings in coalesce(actions).items():
+        if device == "thermostat":
+            if "temperature" in settings:
+                parts.append(f"set the air-conditioning to {settings['temperature']:g}°C")
+            elif settings.get("delta"):
+                direction = "warmer" if settings["delta"] > 0 else "cooler"
+                parts.append(f"made the air-conditioning {abs(settings['delta']):g}°C {direction}")
+            if settings.get("mode"):
+                parts.append(f"switched the air-conditioning to {settings['mode']} mode")
+        else:
+            name = "TV" if device == "tv" else "fan"
+            changes = [f"{k} {v}" for k, v in settings.items() if k != "power" and v is not None]
+            if settings.get("power") == "off":
+                parts.append(f"turned the {name} off")
+            elif changes:
+                parts.append(f"set the {name} {', '.join(changes)}")
+            else:
+                parts.append(f"turned the {name} on")
+    if not parts:
+        return "Done."
+    return "Done! I " + ", ".join(parts) + "."
@@ -0,0 +1,305 @@
+import asyncio
+import collections
+import os
+import random
+import threading
+import time
+
+# ----------------------------------
+# LLM request scheduler
+# ----------------------------------
+# Every completion goes through one scheduler per process (assistant.scheduler), so the
+# GUI, the CLI and server.py share the same budget. In server mode that budget covers
+# every kiosk in the hotel.
+# - Token buckets for requests/minute and tokens/minute keep us under the provider's limits
+#   instead of finding them with 429s.
+# - Waiting requests are served by priority (guest chat before background work like
+#   warm-up priming), then in arrival order.
+# - Queues are bounded: when full, background requests are shed first, then new requests
+#   are refused (Overloaded) rather than piling up behind a rate limit.
+# - 429 / 5xx / connection errors are retried with jittered exponential backoff; a 429
+#   also pauses the whole scheduler for the provider's Retry-After.
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+REQUESTS_PER_MINUTE = int(os.getenv("TAVV_LLM_RPM", "30"))
+TOKENS_PER_MINUTE = int(os.getenv("TAVV_LLM_TPM", "8000"))
+MAX_QUEUED = {INTERACTIVE: 64, BACKGROUND: 16}
+MAX_WAIT = {INTERACTIVE: 30.0, BACKGROUND: 120.0}     # seconds before a queued request gives up
+MAX_RETRIES = 3
+RETRY_BASE = 0.5        # seconds, doubled per attempt, then jittered x0.5-1.5
+RETRY_CAP = 8.0
+WAIT_SAMPLES = 1000     # recent queue waits kept for percentiles
+
+
+class Overloaded(Exception):
+    """The request was shed or timed out in the queue instead of being sent."""
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` (capped at capacity) is available."""
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+class Waiter:
+    __slots__ = ("priority", "tokens", "enqueued", "event", "loop", "future", "error")
+
+    def __init__(self, priority, tokens, loop=None):
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.error = None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMScheduler:
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_queued=None, max_wait=None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_queued = {**MAX_QUEUED, **(max_queued or {})}
+        self.max_wait = {**MAX_WAIT, **(max_wait or {})}
+        self.queues = {priority: collections.deque() for priority in PRIORITY_NAMES}
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        # metrics
+        self.granted = collections.Counter()
+        self.shed = collections.Counter()
+        self.timed_out = collections.Counter()
+        self.max_depth = collections.Counter()
+        self.retries = 0
+        self.rate_limited = 0
+        self.waits = collections.deque(maxlen=WAIT_SAMPLES)
+
+    # -----------------------
+    # QUEUEING
+    # -----------------------
+    def _enqueue(self, waiter):
+        with self._cond:
+            queue = self.queues[waiter.priority]
+            if len(queue) >= self.max_queued[waiter.priority]:
+                # Make room for guest chat by dropping the newest background request
+                background = self.queues[BACKGROUND]
+                if waiter.priority == INTERACTIVE and background:
+                    victim = background.pop()
+                    victim.error = Overloaded("Shed to make room for guest requests")
+                    self.shed[BACKGROUND] += 1
+                    victim.wake()
+                else:
+                    self.shed[waiter.priority] += 1
+                    raise Overloaded(f"Too many queued {PRIORITY_NAMES[waiter.priority]} LLM requests")
+            queue.append(waiter)
+            self.max_depth[waiter.priority] = max(self.max_depth[waiter.priority], len(queue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _abandon(self, waiter):
+        """Remove a waiter that gave up; False if it was granted (or shed) in the meantime."""
+        with self._cond:
+            try:
+                self.queues[waiter.priority].remove(waiter)
+            except ValueError:
+                return False
+            self.timed_out[waiter.priority] += 1
+            return True
+
+    def _head(self):
+        for priority in sorted(self.queues):
+            if self.queues[priority]:
+                return self.queues[priority][0]
+        return None
+
+    def _run(self):
+        with self._cond:
+            while True:
+                waiter = self._head()
+                if waiter is None:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                delay = max(self.paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(waiter.tokens, now))
+                if delay > 0:
+                    # Woken early by a new (maybe higher-priority) request or a settle()
+                    self._cond.wait(delay)
+                    continue
+                self.queues[waiter.priority].popleft()
+                self.requests.tokens -= 1
+                self.tokens.tokens -= waiter.tokens
+                self.granted[waiter.priority] += 1
+                self.waits.append(now - waiter.enqueued)
+                waiter.wake()
+
+    def acquire(self, tokens=1, priority=INTERACTIVE):
+        """Block until the request may be sent; raises Overloaded if shed or if it waits too long."""
+        waiter = Waiter(priority, tokens)
+        self._enqueue(waiter)
+        if not waiter.event.wait(self.max_wait[priority]) and self._abandon(waiter):
+            raise Overloaded("Timed out waiting for LLM capacity")
+        if waiter.error is not None:
+            raise waiter.error
+
+    async def acquire_async(self, tokens=1, priority=INTERACTIVE):
+        waiter = Waiter(priority, tokens, loop=asyncio.get_running_loop())
+        self._enqueue(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait[priority])
+        except asyncio.TimeoutError:
+            if self._abandon(waiter):
+                raise Overloaded("Timed out waiting for LLM capacity")
+            await waiter.future
+        except asyncio.CancelledError:
+            # Granted just before the cancel landed: hand the reservation back
+            if not self._abandon(waiter) and waiter.error is None:
+                self.refund(tokens)
+            raise
+        if waiter.error is not None:
+            raise waiter.error
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once a request's real usage is known."""
+        if actual is None:
+            return
+        with self._cond:
+            self.tokens.tokens -= actual - estimated
+            self._cond.notify()
+
+    def refund(self, tokens):
+        """Give back the token reservation of an attempt that failed before using it."""
+        with self._cond:
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + tokens)
+            self._cond.notify()
+
+    # -----------------------
+    # CALLS WITH RETRY
+    # -----------------------
+    # Each attempt queues and reserves its tokens again. Any attempt that doesn't return
+    # (retried, given up on, or cancelled) has its reservation refunded, so a burst of 429s
+    # doesn't drain the bucket once per retry; a successful one is settle()d by the caller.
+    def call(self, fn, tokens=1, priority=INTERACTIVE):
+        """Run fn() (e.g. a completions.create call) when the budget allows, retrying transient errors."""
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire(tokens, priority)
+            done = False
+            try:
+                result = fn()
+                done = True
+                return result
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                if not done:
+                    self.refund(tokens)
+            time.sleep(delay)
+
+    async def acall(self, fn, tokens=1, priority=INTERACTIVE):
+        """call() for coroutines: `fn` returns an awaitable."""
+        for attempt in range(MAX_RETRIES + 1):
+            await self.acquire_async(tokens, priority)
+            done = False
+            try:
+                result = await fn()
+                done = True
+                return result
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                if not done:
+                    self.refund(tokens)
+            await asyncio.sleep(delay)
+
+    def retry_delay(self, error, attempt):
+        """Seconds to wait before retrying `error`, or None if it shouldn't be retried."""
+        status = getattr(error, "status_code", None)
+        transient = type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+        if attempt >= MAX_RETRIES or not (transient or status == 429 or (status is not None and status >= 500)):
+            return None
+        delay = min(RETRY_CAP, RETRY_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+        if status == 429:
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, RETRY_BASE)
+            with self._cond:
+                # Everyone backs off, not just this request
+                self.rate_limited += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                self._cond.notify()
+        with self._cond:
+            self.retries += 1
+        return delay
+
+    # -----------------------
+    # METRICS
+    # -----------------------
+    def stats(self):
+        with self._cond:
+            waits = sorted(self.waits)
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "queued": {PRIORITY_NAMES[p]: len(q) for p, q in self.queues.items()},
+                "max_queued_seen": {PRIORITY_NAMES[p]: self.max_depth[p] for p in self.queues},
+                "granted": {PRIORITY_NAMES[p]: self.granted[p] for p in self.queues},
+                "shed": {PRIORITY_NAMES[p]: self.shed[p] for p in self.queues},
+                "timed_out": {PRIORITY_NAMES[p]: self.timed_out[p] for p in self.queues},
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "wait_ms": {
+                    "p50": _percentile(waits, 0.50),
+                    "p95": _percentile(waits, 0.95),
+                    "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+                },
+                "requests_available": round(self.requests.tokens, 1),
+                "tokens_available": round(self.tokens.tokens),
+            }
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,204 @@
+from db_pool import get_pool
+
+# ---------------------------
+# Schema migrations
+# ---------------------------
+# Each entry is (version, description, statements). The applied version is kept
+# in PRAGMA user_version, so running migrate() again only applies what's new.
+# DatabaseLoader and DatabaseManager migrate hotel.db when they open it, so the
+# assistant, GUI and server never run against an older schema.
+# Never edit a migration that has shipped; add a new one instead.
+
+HOTEL_MIGRATIONS = [
+    (1, "base schema", [
+        """
+        CREATE TABLE IF NOT EXISTS housekeeping_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_number TEXT NOT NULL,
+            cleaned_time TEXT NOT NULL,
+            cleaner_name TEXT NOT NULL,
+            FOREIGN KEY(room_number) REFERENCES rooms(room_number)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS hotel (
+            hotel_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            location TEXT ,
+            nearby_restaurants TEXT ,
+            fun_destinations TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS residents (
+            resident_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            room_number TEXT NOT NULL,
+            device_token TEXT UNIQUE NOT NULL,
+            checkin_time TEXT,
+            checkout_time TEXT,
+            token_voided INTEGER DEFAULT 0,
+            FOREIGN KEY(room_number) REFERENCES rooms(room_number)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS buildings (
+            building_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            wifi_ssid TEXT,
+            wifi_password TEXT,
+            restaurant_name TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS rooms (
+            room_number TEXT PRIMARY KEY,
+            building_id INTEGER,
+            floor INTEGER,
+            room_type TEXT,
+            tv_brand TEXT,
+            fan_type TEXT,
+            thermostat_model TEXT,
+            FOREIGN KEY(building_id) REFERENCES buildings(building_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS amenities (
+            amenity_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            building_id INTEGER,
+            name TEXT,
+            description TEXT,
+            floor INTEGER,
+            FOREIGN KEY(building_id) REFERENCES buildings(building_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pools (
+            pool_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            features TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS water_sports (
+            activity_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            description TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS restaurant_menu (
+            menu_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            day TEXT,
+            meal TEXT,
+            item_name TEXT,
+            restaurant_name TEXT
+        )
+        """,
+    ]),
+    (2, "indexes for token, room, menu and housekeeping lookups", [
+        # get_resident_from_token: WHERE device_token = ? AND token_voided = 0
+        "CREATE INDEX IF NOT EXISTS idx_residents_token_voided ON residents(device_token, token_voided)",
+        # get_full_context resident: WHERE room_number = ? AND token_voided = 0
+        "CREATE INDEX IF NOT EXISTS idx_residents_room_voided ON residents(room_number, token_voided)",
+        # menu: WHERE restaurant_name = ? AND day = ? ORDER BY meal, item_name (covering, no sort step)
+        "CREATE INDEX IF NOT EXISTS idx_menu_restaurant_day ON restaurant_menu(restaurant_name, day, meal, item_name)",
+        # housekeeping: WHERE room_number = ? ORDER BY cleaned_time DESC LIMIT n
+        "CREATE INDEX IF NOT EXISTS idx_housekeeping_room_time ON housekeeping_log(room_number, cleaned_time)",
+        "CREATE INDEX IF NOT EXISTS idx_amenities_building ON amenities(building_id)",
+        "CREATE INDEX IF NOT EXISTS idx_rooms_building ON rooms(building_id)",
+    ]),
+    (3, "natural keys for idempotent bulk imports", [
+        # DESTRUCTIVE: deletes duplicate rows an earlier re-seed may have left, keeping the
+        # lowest id of each group (migrate() prints how many). Back up hotel.db first if
+        # duplicates there were intentional. Amenities are grouped on COALESCE(floor, -1);
+        # an earlier draft of this step grouped on the bare floor and so kept duplicates
+        # without a floor (NULLs never group together), which now also get deleted.
+        """
+        DELETE FROM amenities WHERE amenity_id NOT IN
+            (SELECT MIN(amenity_id) FROM amenities GROUP BY building_id, name, COALESCE(floor, -1))
+        """,
+        "DELETE FROM pools WHERE pool_id NOT IN (SELECT MIN(pool_id) FROM pools GROUP BY name)",
+        "DELETE FROM water_sports WHERE activity_id NOT IN (SELECT MIN(activity_id) FROM water_sports GROUP BY name)",
+        """
+        DELETE FROM restaurant_menu WHERE menu_id NOT IN
+            (SELECT MIN(menu_id) FROM restaurant_menu GROUP BY restaurant_name, day, meal, item_name)
+        """,
+        # ON CONFLICT targets for data/bulk_import.py. An amenity's floor is optional and a
+        # UNIQUE index treats NULLs as distinct, so the key uses COALESCE(floor, -1)
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_amenities_key ON amenities(building_id, name, COALESCE(floor, -1))",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_pools_name ON pools(name)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_water_sports_name ON water_sports(name)",
+        # Same columns as idx_menu_restaurant_day, now unique; still covers the menu lookup
+        "DROP INDEX IF EXISTS idx_menu_restaurant_day",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_menu_key ON restaurant_menu(restaurant_name, day, meal, item_name)",
+    ]),
+    (4, "index for the token-expiry sweeper", [
+        # void_expired_tokens: WHERE token_voided = 0 AND checkout_time <= now (range scan)
+        "CREATE INDEX IF NOT EXISTS idx_residents_voided_checkout ON residents(token_voided, checkout_time)",
+    ]),
+    (5, "one text format for checkout times", [
+        # The sweeper compares checkout_time as text against isoformat(); rewrite
+        # "YYYY-MM-DD HH:MM[:SS]" values an earlier check-in stored as given
+        """
+        UPDATE residents SET checkout_time = substr(checkout_time, 1, 10) || 'T' || substr(checkout_time, 12)
+        WHERE checkout_time LIKE '____-__-__ %'
+        """,
+    ]),
+]
+
+
+# Side database for chat sessions (session_store.py), kept apart from hotel.db so chat
+# writes never queue behind hotel data writes
+SESSION_MIGRATIONS = [
+    (1, "append-only conversation turns", [
+        """
+        CREATE TABLE IF NOT EXISTS conversation_turns (
+            turn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_number TEXT NOT NULL,
+            resident_id INTEGER,
+            kind TEXT NOT NULL DEFAULT 'turn',
+            user_input TEXT,
+            reply TEXT,
+            created_at TEXT NOT NULL
+        )
+        """,
+        # Recent turns for a room, newest first
+        "CREATE INDEX IF NOT EXISTS idx_turns_room ON conversation_turns(room_number, turn_id)",
+        # Last reset marker for a room
+        "CREATE INDEX IF NOT EXISTS idx_turns_room_reset ON conversation_turns(room_number, turn_id) WHERE kind = 'reset'",
+    ]),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path, migrations=HOTEL_MIGRATIONS):
+    """Apply pending migrations in order, one transaction each. Returns the versions applied."""
+    pool = get_pool(db_path)
+    with pool.connection() as conn:
+        current = schema_version(conn)
+    applied = []
+    for version, description, statements in migrations:
+        # Up-to-date databases (every open after the first) never take the write lock
+        if version <= current:
+            continue
+        deleted = 0
+        with pool.transaction() as conn:
+            # Re-read inside the write lock so two processes can't apply the same step
+            if version <= schema_version(conn):
+                continue
+            for statement in statements:
+                cursor = conn.execute(statement)
+                if statement.lstrip().upper().startswith("DELETE"):
+                    deleted += cursor.rowcount
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+        print(f"Applied migration {version}: {description}" + (f" ({deleted} rows deleted)" if deleted else ""))
+
+    if applied:
+        with pool.connection() as conn:
+            conn.execute("PRAGMA optimize")
+    return applied
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import time
+import tracing
+from aiohttp import web, WSMsgType, WSCloseCode
+from assistant import db, achat_stream, conversation_history, scheduler
+from llm_scheduler import Overloaded
+from data.db_manager import DatabaseManager
+
+# ----------------------------------
+# Tavv chat service
+# ----------------------------------
+# One process serves every room: one Groq client, one DB pool and cache, and one
+# conversation_history keyed by room. Kiosks authenticate with their device token.
+#
+#   POST /chat   Authorization: Bearer <token>   {"message": "...", "stream": true, "request_id": "..."}
+#                -> {"reply": "..."}  or NDJSON lines {"chunk": "..."} ... {"done": true, "reply": "..."}
+#   GET  /ws     Authorization: Bearer <token>  (or ?token=...)
+#                send {"message": "...", "request_id": "..."}, receive {"type": "chunk"|"done"|"error", ...}
+# request_id is optional; a client retrying a message with the same id doesn't get the
+# exchange stored twice in the room's conversation history.
+#   GET  /health
+#   GET  /metrics  Prometheus text: per-stage latency histograms (tracing.py), LLM queue gauges
+#
+# Run from main/:  python server.py --port 8765
+
+MAX_CONCURRENT_CHATS = 64   # LLM calls in flight across all rooms
+MEMORY_SWEEP_SECONDS = 60   # how often memory of checked-out rooms is dropped
+TOKEN_SWEEP_SECONDS = 60    # how often tokens past their checkout_time are voided
+
+
+class ChatService:
+    def __init__(self, max_concurrent=MAX_CONCURRENT_CHATS):
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.room_locks = {}
+        self.active = 0
+
+    def room_lock(self, room_number):
+        # Turns from the same room run one at a time so history stays in order
+        lock = self.room_locks.get(room_number)
+        if lock is None:
+            lock = self.room_locks[room_number] = asyncio.Lock()
+        return lock
+
+    async def authenticate(self, request):
+        auth = request.headers.get("Authorization", "")
+        token = auth[7:].strip() if auth.startswith("Bearer ") else request.query.get("token", "")
+        if not token:
+            return None
+        return await asyncio.to_thread(db.get_resident_from_token, token)
+
+    async def stream_reply(self, message, room_number, request_id=None):
+        trace = tracing.current() or tracing.NOOP
+        waiting = time.perf_counter()
+        async with self.room_lock(room_number), self.slots:
+            trace.add("server_queue", time.perf_counter() - waiting)
+            self.active += 1
+            try:
+                async for chunk in achat_stream(message, room_number, request_id):
+                    yield chunk
+            finally:
+                self.active -= 1
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    async def handle_chat(self, request):
+        resident = await self.authenticate(request)
+        if not resident:
+            return web.json_response({"error": "Device token is not registered or has been voided."}, status=401)
+
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Body must be JSON."}, status=400)
+        if not isinstance(body, dict):
+            return web.json_response({"error": "Body must be a JSON object."}, status=400)
+        message = str(body.get("message", "")).strip()
+        if not message:
+            return web.json_response({"error": "Empty message."}, status=400)
+
+        room_number = resident["room_number"]
+        request_id = body.get("request_id")
+        with tracing.traced("server_http", room=room_number, stream=bool(body.get("stream"))) as trace:
+            if not body.get("stream"):
+                try:
+                    parts = [chunk async for chunk in self.stream_reply(message, room_number, request_id)]
+                except Overloaded as e:
+                    trace.fail(e)
+                    return web.json_response({"error": str(e)}, status=503, headers={"Retry-After": "5"})
+                return web.json_response({"reply": "".join(parts)})
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            parts = []
+            try:
+                async for chunk in self.stream_reply(message, room_number, request_id):
+                    parts.append(chunk)
+                    await response.write(json.dumps({"chunk": chunk}).encode() + b"\n")
+            except ConnectionResetError as e:
+                # The kiosk went away mid-reply; nobody is left to tell
+                trace.fail(e)
+                return response
+            except Exception as e:
+                # Headers are already sent (Overloaded, LLM or database errors); report it in
+                # the stream and end it cleanly so the client isn't left with a cut-off body
+                trace.fail(e)
+                await response.write(json.dumps({"error": str(e)}).encode() + b"\n")
+                await response.write_eof()
+                return response
+            await response.write(json.dumps({"done": True, "reply": "".join(parts)}).encode() + b"\n")
+            await response.write_eof()
+            return response
+
+    async def handle_ws(self, request):
+        resident = await self.authenticate(request)
+        if not resident:
+            return web.json_response({"error": "Device token is not registered or has been voided."}, status=401)
+
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        room_number = resident["room_number"]
+        token = resident["device_token"]
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            # The socket outlives checkout; a token voided since it opened ends it
+            if not await asyncio.to_thread(db.get_resident_from_token, token):
+                await ws.send_json({"type": "error", "error": "Device token has been voided."})
+                await ws.close(code=WSCloseCode.POLICY_VIOLATION, message=b"Device token voided")
+                break
+            try:
+                data = json.loads(msg.data)
+            except json.JSONDecodeError:
+                data = None
+            message = str(data.get("message", "")).strip() if isinstance(data, dict) else ""
+            if not message:
+                await ws.send_json({"type": "error", "error": "Empty message."})
+                continue
+
+            parts = []
+            with tracing.traced("server_ws", room=room_number) as trace:
+                try:
+                    async for chunk in self.stream_reply(message, room_number, data.get("request_id")):
+                        parts.append(chunk)
+                        await ws.send_json({"type": "chunk", "text": chunk})
+                except Exception as e:
+                    # Keep the socket open; the kiosk can retry the message
+                    trace.fail(e)
+                    await ws.send_json({"type": "error", "error": str(e)})
+                    continue
+                await ws.send_json({"type": "done", "reply": "".join(parts)})
+        return ws
+
+    async def handle_health(self, request):
+        return web.json_response({"status": "ok", "active_chats": self.active, "rooms": len(self.room_locks),
+                                  "llm": scheduler.stats()})
+
+    async def handle_metrics(self, request):
+        llm = scheduler.stats()
+        samples = (tracing.sample_lines("tavv_active_chats", "Chats being answered right now", self.active)
+                   + tracing.sample_lines("tavv_llm_queued", "LLM requests waiting in the scheduler",
+                                         llm["queued"], "priority")
+                   + tracing.sample_lines("tavv_llm_shed_total", "LLM requests shed by the scheduler",
+                                         llm["shed"], "priority", "counter"))
+        return web.Response(body=tracing.metrics_text(samples).encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def sweep_memory(app):
+    while True:
+        await asyncio.sleep(MEMORY_SWEEP_SECONDS)
+        try:
+            active = await asyncio.to_thread(db.get_active_rooms)
+            room_locks = app["service"].room_locks
+            for room in conversation_history.evict_inactive(active):
+                if room in room_locks and not room_locks[room].locked():
+                    del room_locks[room]
+        except Exception as e:
+            print(f"Memory sweep failed: {e}")
+
+
+async def sweep_tokens(app):
+    # Guests who leave without a front-desk checkout lose access at their checkout_time;
+    # the memory sweep then drops their conversation
+    manager = DatabaseManager(db.db_path)
+    while True:
+        try:
+            voided = await asyncio.to_thread(manager.void_expired_tokens)
+            if voided:
+                print(f"Voided {len(voided)} expired device token(s)")
+        except Exception as e:
+            print(f"Token sweep failed: {e}")
+        await asyncio.sleep(TOKEN_SWEEP_SECONDS)
+
+
+async def start_background(app):
+    app["memory_sweeper"] = asyncio.create_task(sweep_memory(app))
+    app["token_sweeper"] = asyncio.create_task(sweep_tokens(app))
+
+
+async def stop_background(app):
+    app["memory_sweeper"].cancel()
+    app["token_sweeper"].cancel()
+
+
+def create_app(max_concurrent=MAX_CONCURRENT_CHATS):
+    service = ChatService(max_concurrent)
+    app = web.Application()
+    app["service"] = service
+    app.on_startup.append(start_background)
+    app.on_cleanup.append(stop_background)
+    app.router.add_post("/chat", service.handle_chat)
+    app.router.add_get("/ws", service.handle_ws)
+    app.router.add_get("/health", service.handle_health)
+    app.router.add_get("/metrics", service.handle_metrics)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tavv chat service for all rooms")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT_CHATS)
+    args = parser.parse_args()
+    web.run_app(create_app(args.max_concurrent), host=args.host, port=args.port)
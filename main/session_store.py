@@ -0,0 +1,117 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from db_pool import get_pool
+from migrations import migrate, SESSION_MIGRATIONS
+
+# ----------------------------------
+# Durable conversation sessions
+# ----------------------------------
+# Append-only log of chat turns in data/sessions.db, so a kiosk restart doesn't wipe a
+# guest's conversation. The chat path only puts a row on a queue; a background writer
+# commits rows in batches (WAL + synchronous=NORMAL, so no fsync per message).
+# A checkout or resident change appends a 'reset' row; rehydration reads after it.
+
+SESSIONS_DB_PATH = os.path.join("data", "sessions.db")
+BATCH_SIZE = 64          # rows per transaction at most
+FLUSH_INTERVAL = 0.5     # seconds a row may wait before being written
+REHYDRATE_TURNS = 20     # turns loaded back into memory for a room
+
+_STOP = object()
+
+
+class SessionStore:
+    def __init__(self, db_path=SESSIONS_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        migrate(db_path, SESSION_MIGRATIONS)
+        self.pool = get_pool(db_path)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # -----------------------
+    # WRITES (non-blocking)
+    # -----------------------
+    def append_turn(self, room_number, resident_id, user_input, reply):
+        self._queue.put((room_number, resident_id, "turn", user_input, reply, datetime.now().isoformat()))
+
+    def reset(self, room_number):
+        """Mark the end of a room's session; earlier turns are no longer rehydrated."""
+        self._queue.put((room_number, None, "reset", None, None, datetime.now().isoformat()))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    # flush() marker: write what we have, then wake the caller
+                    self._write(batch)
+                    batch = []
+                    item.set()
+                else:
+                    batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            with self.pool.transaction() as conn:
+                conn.executemany("""
+                    INSERT INTO conversation_turns (room_number, resident_id, kind, user_input, reply, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, batch)
+        except Exception as e:
+            # Losing a batch of history must never take the chat down
+            print(f"Session store write failed ({len(batch)} rows): {e}")
+
+    def flush(self, timeout=5):
+        """Block until everything queued so far is on disk."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5)
+
+    # -----------------------
+    # REHYDRATION
+    # -----------------------
+    def load_recent(self, room_number, resident_id, limit=REHYDRATE_TURNS):
+        """This resident's latest turns in the room's current session, oldest first, as (user_input, reply)."""
+        with self.pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT user_input, reply
+                FROM conversation_turns
+                WHERE room_number = ?
+                  AND kind = 'turn'
+                  AND resident_id = ?
+                  AND turn_id > COALESCE(
+                      (SELECT MAX(turn_id) FROM conversation_turns WHERE room_number = ? AND kind = 'reset'), 0)
+                ORDER BY turn_id DESC
+                LIMIT ?
+            """, (room_number, resident_id, room_number, limit)).fetchall()
+        rows.reverse()
+        return [(u, r) for u, r in rows]
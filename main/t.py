@@ -1,114 +1,271 @@
-from setup_env import setup_venv
-setup_venv()
+import time
+STARTED = time.perf_counter()
+import argparse
 import os
+import queue
 import sys
-from groq import Groq
-from hotel_db import DatabaseLoader
+import threading
+import traceback
+from contextlib import contextmanager
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                             QScrollArea, QFrame, QGraphicsDropShadowEffect)
+                             QFrame, QGraphicsDropShadowEffect)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QPixmap, QImage, QColor
-import cv2
+from PyQt5.QtGui import QFont, QColor
+import tracing
+from hotel_db import DatabaseLoader
+from chat_view import TranscriptModel, TranscriptView, USER, BOT, TYPING
+from gui_assets import media_path, shadowed_pixmap, SHADOW_PAD
+IMPORTED = time.perf_counter()
+
+# Startup is staged so the welcome screen shows as soon as possible: only PyQt and the
+# SQLite layer are imported up front; the venv check, then cv2 (video), groq and the chat
+# pipeline (assistant.py) are loaded by a Preloader thread after the window is up.
+# Run with --profile-startup to print how long each phase took.
+
+TOKEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tokens", "device1_token.txt")
+
+# Grow the bot bubble as tokens arrive instead of waiting for the whole reply
+STREAM_REPLIES = True
+# Point at a running server.py (e.g. http://127.0.0.1:8765) to chat through the central service
+SERVER_URL = os.getenv("TAVV_SERVER_URL")
+ERROR_REPLY = "Sorry, I couldn't get an answer just now. Please try again."
+
+
+class StartupProfile:
+    """Per-phase startup timings, printed once everything has loaded (--profile-startup)."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = [("imports (PyQt5, hotel_db, GUI modules)", 0.0, IMPORTED - STARTED, "main")]
+        self.last = IMPORTED
+        self._lock = threading.Lock()
+
+    def _add(self, name, start, end, thread):
+        with self._lock:
+            self.phases.append((name, start - STARTED, end - start, thread))
+
+    def mark(self, name):
+        """End a main-thread phase that started where the previous mark left off."""
+        now = time.perf_counter()
+        self._add(name, self.last, now, "main")
+        self.last = now
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter(), threading.current_thread().name)
+
+    def report(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        print("\nStartup profile (ms since process start):")
+        print(f"  {'phase':<44} {'start':>8} {'took':>8}  thread")
+        for name, start, took, thread in phases:
+            print(f"  {name:<44} {start * 1000:8.1f} {took * 1000:8.1f}  {thread}")
+        print(f"  {'total':<44} {(time.perf_counter() - STARTED) * 1000:8.1f}")
 
-# Initialize database and API
-db = DatabaseLoader()
-api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key)
-conversation_history = {}
 
 # Read device token
 def read_device_token(file_path):
     with open(file_path, "r") as f:
         return f.read().strip()
 
-device_token = read_device_token(r"C:\Users\Ocnarf\Tavv-Hotel-Assistant\main\tokens\device1_token.txt")
-info = db.get_resident_from_token(device_token)
 
-if not info:
-    print("ERROR: Your device token is not registered in the hotel system.")
-    exit()
+def load_guest(token_file):
+    """(device_token, resident info) for this kiosk, or (token, None) if the token isn't registered."""
+    device_token = read_device_token(token_file)
+    return device_token, DatabaseLoader(use_cache=False).get_resident_from_token(device_token)
 
-name = info["name"]
-room = info["room_number"]
 
-# Extract first name only
-first_name = name.split()[0] if name else name
+class Preloader(QThread):
+    """Loads the heavy parts in the background once the welcome screen is showing."""
+    video_ready = pyqtSignal()
+    chat_ready = pyqtSignal()
+    failed = pyqtSignal(str, str)   # phase, error
 
-# Chat function
-def chat(user_input, room_number):
-    if room_number not in conversation_history:
-        conversation_history[room_number] = []
+    def __init__(self, profile, room_number):
+        super().__init__()
+        self.profile = profile
+        self.room_number = room_number
+        self.warmer = None
 
-    context_data = db.get_full_context(room_number)
-    
-    if not context_data:
-        return "Sorry, I couldn't find information for that room. Please check your room number."
-
-    current_day = context_data.get('current_day', 'today')
-    context_text = str(context_data)
-
-    conversation = {
-        "role": "system", 
-        "content": (
-         #Tavv Personality Injection
-                "You are Tavv, a friendly but efficient hotel assistant. You are a conversational AI focused on engaging in authentic dialogue." "Today is " + current_day + ""
-                #Retrival-Augmented Generation Prompt
-                "Answer questions using the information in the provided database"
-                #Limiting over-information and security breach
-                "Only provide a response regarding to the user's specific prompt. Do not disclose any other information unless asked to. You're not allowed to compromise  the information of other rooms, for safety and privacy of the other residents. However, you can disclose information about the hotel's services like restaurant, accomodities, and amenities"
-                #Room Identification
-                "The guest is staying at room number" + room_number + ". Provide only the information in regards with their corresponding rooms." 
-                #Response Limitation
-                "When the user asks, try NOT to add instructions or steps unless the user explicitly requests: explain, how do I, or steps. Try not to overexplain or add unnecessary information."
-                #Language accomodation
-                "Speak in user's language. Switch the language based on user's input language."
-                #IoT Feature
-                "This hotel is equipped with IoT devices. You have full control over said IoT devices. That includes TV, Air-conditioning, and other IoT devices. If the user requests to control any device, only control the devices when user requests only. Do not include any technical details or code. Specify the changes made to the devices in your response clearly."
-                #Miscellanaeous Instructions
-                "When user implicates a sense of boredom, offer hotel activities from the activity center, or pools."
-                "If, and ONLY IF, user asks for price of any accomidty or service offered by the hotel (food, housekeeping,etc.), it is included in the user's stay."
-                "Detect the city the hotel's situated in, and recommend local attractions accordingly."
-        )
-    }
-
-    messages = [conversation, {"role": "user", "content": f"Context:\n{context_text}\n\nUser question: {user_input}"}]
-    messages += conversation_history[room_number]
-    messages.append({"role": "user", "content": user_input})
-    
-    response = client.chat.completions.create(
-        model="openai/gpt-oss-20b",
-        messages=messages  
-    )
+    def stage(self, name, fn):
+        """Run one phase; a failure is logged and emitted to the window instead of ending the thread silently."""
+        try:
+            with self.profile.phase(name):
+                fn()
+            return True
+        except Exception as e:
+            print(f"Startup phase '{name}' failed:")
+            traceback.print_exc()
+            self.failed.emit(name, f"{type(e).__name__}: {e}")
+            return False
+
+    def run(self):
+        threading.current_thread().name = "preload"
 
-    reply = response.choices[0].message.content
+        def check_venv():
+            from setup_env import setup_venv
+            setup_venv()
 
-    conversation_history[room_number].append({"role": "user", "content": user_input})
-    conversation_history[room_number].append({"role": "assistant", "content": reply})
+        def import_video():
+            import video_player  # noqa: F401
 
-    return reply
+        def import_assistant():
+            if SERVER_URL:
+                # The server runs the chat pipeline; the kiosk only needs the client
+                import tavv_client  # noqa: F401
+            else:
+                import assistant  # noqa: F401
+
+        def warm():
+            # Context, tokenizer and LLM connection ready before the first question (warmup.py)
+            from warmup import Warmer
+            self.warmer = Warmer(self.room_number)
+            self.warmer.warm_now()
+
+        # First, so a missing dependency is reported by the check rather than as an ImportError below
+        self.stage("venv check", check_venv)
+        if self.stage("import cv2 + video player", import_video):
+            self.video_ready.emit()
+        if not self.stage("import client" if SERVER_URL else "import assistant (groq, chat pipeline)", import_assistant):
+            return
+        if not SERVER_URL:
+            self.stage("warm-up (context, connection)", warm)
+        self.chat_ready.emit()
 
 class ChatWorker(QThread):
-    finished = pyqtSignal(str)
+    """
+    One long-lived worker per session. Messages are answered strictly in the order they
+    were sent; every signal carries the request id it belongs to. A cancelled request is
+    skipped if it hasn't started, or its reply stream is closed at the next chunk.
+    """
+    started_request = pyqtSignal(int)
+    chunk_received = pyqtSignal(int, str)
+    finished = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
     
-    def __init__(self, user_input, room_number):
+    def __init__(self, room_number, device_token, stream=STREAM_REPLIES):
         super().__init__()
-        self.user_input = user_input
         self.room_number = room_number
+        self.device_token = device_token
+        self.stream = stream
+        self.requests = queue.Queue()
+        self.next_id = 1
+        self.current_id = None
+        self.pending = {}           # request id -> message, for queued and running requests
+        self.cancelled_ids = set()
+        self.traces = {}            # request id -> Trace, finished by the window once the reply is shown
+        self.lock = threading.Lock()
+    
+    def submit(self, user_input):
+        """Queue a message; returns its request id. Sending the same text again while it is
+        still waiting supersedes the earlier copy (a double enter)."""
+        with self.lock:
+            for request_id, message in self.pending.items():
+                if message == user_input and request_id != self.current_id:
+                    self.cancelled_ids.add(request_id)
+            request_id = self.next_id
+            self.next_id += 1
+            self.pending[request_id] = user_input
+        self.requests.put((request_id, user_input, time.perf_counter()))
+        return request_id
+    
+    def cancel(self, request_id=None):
+        """Cancel one request, or everything queued and running when no id is given."""
+        with self.lock:
+            ids = list(self.pending) if request_id is None else [request_id]
+            self.cancelled_ids.update(i for i in ids if i in self.pending)
+    
+    def stop(self):
+        self.cancel()
+        self.requests.put(None)
+        self.wait(5000)
+    
+    def is_cancelled(self, request_id):
+        with self.lock:
+            return request_id in self.cancelled_ids
     
     def run(self):
-        response = chat(self.user_input, self.room_number)
-        self.finished.emit(response)
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+            request_id, user_input, submitted = item
+            with self.lock:
+                self.current_id = request_id
+            trace = tracing.NOOP
+            try:
+                if not self.is_cancelled(request_id):
+                    trace = self.traces[request_id] = tracing.start("kiosk", room=self.room_number,
+                                                                    remote=bool(SERVER_URL))
+                    trace.add("worker_queue", time.perf_counter() - submitted)
+                    self.started_request.emit(request_id)
+                    with tracing.activate(trace):
+                        self.answer(request_id, user_input)
+            except Exception as e:
+                print(f"Chat request {request_id} failed: {type(e).__name__}: {e}")
+                trace.fail(e)
+                self.finished.emit(request_id, ERROR_REPLY)
+            finally:
+                with self.lock:
+                    self.current_id = None
+                    self.pending.pop(request_id, None)
+                    cancelled = request_id in self.cancelled_ids
+                    self.cancelled_ids.discard(request_id)
+                if cancelled:
+                    self.cancelled.emit(request_id)
+    
+    def answer(self, request_id, user_input):
+        if SERVER_URL:
+            from tavv_client import remote_chat_stream
+            # Pipeline stages are traced by the server; here it is one remote call
+            tracing.current().set(path="remote")
+            replies = remote_chat_stream(SERVER_URL, self.device_token, user_input)
+        elif self.stream:
+            # Local mode only. Usually already imported by the Preloader; a failed import
+            # raises here and the request is answered with ERROR_REPLY like any other failure
+            from assistant import chat_stream
+            replies = chat_stream(user_input, self.room_number)
+        else:
+            from assistant import chat
+            response = chat(user_input, self.room_number)
+            if not self.is_cancelled(request_id):
+                self.finished.emit(request_id, response)
+            return
+
+        parts = []
+        try:
+            for chunk in replies:
+                if self.is_cancelled(request_id):
+                    return
+                parts.append(chunk)
+                self.chunk_received.emit(request_id, chunk)
+        finally:
+            # Closes the HTTP stream if we stopped early; an unfinished turn isn't remembered
+            replies.close()
+        self.finished.emit(request_id, "".join(parts))
 
 # Main GUI
 class TavvGUI(QMainWindow):
-    def __init__(self, guest_name, room_number, video_path="background.mp4"):
+    def __init__(self, guest_name, room_number, device_token, video_path="background.mp4", profile=None):
         super().__init__()
         self.guest_name = guest_name
         self.room_number = room_number
+        self.device_token = device_token
         self.video_path = video_path
+        self.profile = profile or StartupProfile()
         self.first_message = None
         self.chat_state = False
+        self.worker = None
+        self.typing_rows = {}       # request id -> "Tavv is typing..." row
+        self.reply_rows = {}        # request id -> bot bubble being streamed
         
         self.setWindowTitle("Tavv - Canyon Cove Hotel")
         self.setFixedSize(640, 800)
@@ -117,45 +274,17 @@ class TavvGUI(QMainWindow):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         
-        # Video background label
-        self.video_label = QLabel(central_widget)
-        self.video_label.setGeometry(0, 0, 640, 800)
-        self.video_label.setScaledContents(False)  # Don't scale, let it crop naturally
-        self.video_label.setAlignment(Qt.AlignCenter)
+        # Dark background until the Preloader has cv2 ready for the video (start_video)
+        central_widget.setObjectName("central")
+        central_widget.setStyleSheet("#central { background-color: #0a1628; }")
+        self.central_widget = central_widget
+        self.video_background = None
         
         # Dark overlay on top of video
         self.overlay = QLabel(central_widget)
         self.overlay.setGeometry(0, 0, 640, 800)
         self.overlay.setStyleSheet("background-color: rgba(0, 0, 0, 120);")
         
-        # Load video with OpenCV
-        if not os.path.isabs(video_path):
-            video_path = os.path.abspath(video_path)
-        
-        if not os.path.exists(video_path):
-            print(f"WARNING: Video file not found at: {video_path}")
-            print("The app will run with a dark background.")
-            self.video_label.setStyleSheet("background-color: #0a1628;")
-            self.cap = None
-        else:
-            print(f"Loading video from: {video_path}")
-            self.cap = cv2.VideoCapture(video_path)
-            if not self.cap.isOpened():
-                print("ERROR: Could not open video file")
-                self.video_label.setStyleSheet("background-color: #0a1628;")
-                self.cap = None
-            else:
-                self.video_fps = self.cap.get(cv2.CAP_PROP_FPS)
-                if self.video_fps == 0:
-                    self.video_fps = 30
-                self.frame_delay = int(1000 / self.video_fps)
-                print(f"Video loaded successfully. FPS: {self.video_fps}")
-                
-                # Start video playback
-                self.video_timer = QTimer()
-                self.video_timer.timeout.connect(self.update_video_frame)
-                self.video_timer.start(self.frame_delay)
-        
         # Main container with margins
         self.main_widget = QWidget(central_widget)
         self.main_widget.setGeometry(30, 30, 580, 740)  # 30px margins on all sides
@@ -233,22 +362,19 @@ class TavvGUI(QMainWindow):
         self.main_layout.addWidget(self.welcome_container, alignment=Qt.AlignCenter)
         self.main_layout.addStretch()
         
-        # Logo in top left corner
+        # Logo in top left corner, shadow baked in (gui_assets.py)
         self.logo_label = QLabel(central_widget)  # Position relative to central_widget, not main_widget
-        logo_path = r"C:\Users\Ocnarf\Tavv-Hotel-Assistant\main\media\logo.png"  # Change this to your logo file path
-        if os.path.exists(logo_path):
-            logo_pixmap = QPixmap(logo_path)
-            # Scale logo to reasonable size (e.g., 100px wide, maintain aspect ratio)
-            logo_pixmap = logo_pixmap.scaledToWidth(150, Qt.SmoothTransformation)
+        logo_pixmap = shadowed_pixmap("logo.png", 150)
+        if logo_pixmap is not None:
             self.logo_label.setPixmap(logo_pixmap)
+            self.logo_label.move(10 - SHADOW_PAD, -10 - SHADOW_PAD)
         else:
             # Fallback text if logo not found
             self.logo_label.setText("TAVV")
             self.logo_label.setFont(QFont("Inter", 16, QFont.Bold))
             self.logo_label.setStyleSheet("color: #4a9eff; background: transparent;")
-        
-        self.logo_label.setGraphicsEffect(self.create_shadow())
-        self.logo_label.move(10, -10)  # Position accounting for the 30px window margin + 10px padding
+            self.logo_label.setGraphicsEffect(self.create_shadow())
+            self.logo_label.move(10, -10)  # Position accounting for the 30px window margin + 10px padding
         self.logo_label.raise_()  # Bring logo to front
         
         # Fade in effect
@@ -257,29 +383,47 @@ class TavvGUI(QMainWindow):
         self.fade_timer.timeout.connect(self.fade_in)
         self.fade_timer.start(50)
     
-    def update_video_frame(self):
-        if self.cap is None:
+    def start_preload(self):
+        self.preloader = Preloader(self.profile, self.room_number)
+        self.preloader.video_ready.connect(self.start_video)
+        self.preloader.failed.connect(self.preload_failed)
+        # Typing the first question re-warms (mostly the LLM connection), throttled by the Warmer
+        self.startup_input.textEdited.connect(self.warm)
+        self.preloader.finished.connect(self.profile.report)
+        self.preloader.start()
+    
+    def preload_failed(self, phase, error):
+        # Already printed with its traceback by the Preloader; tell whoever is at the kiosk
+        self.subtitle_label.setText(f"Something went wrong while starting ({phase}).\n{error}")
+        self.subtitle_label.setWordWrap(True)
+    
+    def warm(self, *_):
+        if self.preloader.warmer is not None:
+            self.preloader.warmer.warm()
+    
+    def start_video(self):
+        # Video background, decoded off the GUI thread (video_player.py)
+        from video_player import VideoBackground
+        video_path = self.video_path
+        if not os.path.isabs(video_path):
+            video_path = os.path.abspath(video_path)
+        if not os.path.exists(video_path):
+            print(f"WARNING: Video file not found at: {video_path}")
+            print("The app will run with a dark background.")
             return
-        
-        ret, frame = self.cap.read()
-        
-        if not ret:
-            # Loop video - go back to start
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-        
-        if ret:
-            # Convert frame from BGR to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Convert to QImage at original size
-            height, width, channel = frame.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-            
-            # Set to label - it will crop naturally if video is larger than window
-            self.video_label.setPixmap(QPixmap.fromImage(q_image))
-        
+        print(f"Loading video from: {video_path}")
+        with self.profile.phase("open video"):
+            self.video_background = VideoBackground(video_path, self.central_widget)
+            self.video_background.stackUnder(self.overlay)
+            self.video_background.show()
+    
+    def closeEvent(self, event):
+        # Abandon whatever is still queued or streaming
+        if self.worker is not None:
+            self.worker.stop()
+        if self.video_background is not None:
+            self.video_background.stop()
+        super().closeEvent(event)
     
     def fade_in(self):
         if self.opacity < 1.0:
@@ -335,34 +479,10 @@ class TavvGUI(QMainWindow):
         
         self.main_layout.addWidget(header)
         
-        # Chat area
-        self.chat_scroll = QScrollArea()
-        self.chat_scroll.setWidgetResizable(True)
-        self.chat_scroll.setStyleSheet("""
-            QScrollArea {
-                background: transparent;
-                border: none;
-            }
-            QScrollBar:vertical {
-                background: rgba(26, 43, 71, 100);
-                width: 10px;
-                border-radius: 5px;
-            }
-            QScrollBar::handle:vertical {
-                background: rgba(74, 158, 255, 150);
-                border-radius: 5px;
-            }
-        """)
-        
-        self.chat_widget = QWidget()
-        self.chat_widget.setStyleSheet("background: transparent;")
-        self.chat_layout = QVBoxLayout(self.chat_widget)
-        self.chat_layout.setAlignment(Qt.AlignTop)
-        self.chat_layout.setSpacing(10)
-        self.chat_layout.setContentsMargins(10, 10, 10, 10)
-        
-        self.chat_scroll.setWidget(self.chat_widget)
-        self.main_layout.addWidget(self.chat_scroll, 1)  # Give it stretch factor
+        # Chat area: messages are rows painted by a delegate (chat_view.py)
+        self.transcript = TranscriptModel()
+        self.chat_view = TranscriptView(self.transcript)
+        self.main_layout.addWidget(self.chat_view, 1)  # Give it stretch factor
         
         # Input area
         input_area = QWidget()
@@ -409,10 +529,7 @@ class TavvGUI(QMainWindow):
         # Send first message
         if self.first_message:
             self.add_user_message(self.first_message)
-            self.add_typing_indicator()
-            self.worker = ChatWorker(self.first_message, self.room_number)
-            self.worker.finished.connect(self.display_bot_response)
-            self.worker.start()
+            self.start_worker(self.first_message)
         
         self.chat_input.setFocus()
     
@@ -425,111 +542,26 @@ class TavvGUI(QMainWindow):
         return shadow
     
     def add_user_message(self, message):
-        msg_container = QWidget()
-        msg_container.setStyleSheet("background: transparent;")
-        msg_layout = QHBoxLayout(msg_container)
-        msg_layout.setContentsMargins(0, 0, 0, 0)
-        msg_layout.addStretch()
-        
-        bubble = QLabel(message)
-        bubble.setFont(QFont("Inter", 11))
-        bubble.setStyleSheet("""
-            QLabel {
-                background-color: rgba(255, 255, 255, 180);
-                color: #1a1a1a;
-                border-radius: 10px;
-                padding: 10px 15px;
-            }
-        """)
-        bubble.setWordWrap(True)
-        bubble.setMaximumWidth(400)
-        bubble.setGraphicsEffect(self.create_shadow())
-        msg_layout.addWidget(bubble)
-        
-        self.chat_layout.addWidget(msg_container)
+        uid = self.transcript.append(USER, message)
         self.scroll_to_bottom()
+        return uid
     
     def add_bot_message(self, message):
-        msg_container = QWidget()
-        msg_container.setStyleSheet("background: transparent;")
-        msg_layout = QHBoxLayout(msg_container)
-        msg_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Tavv icon
-        icon_label = QLabel()
-        icon_path = r"C:\Users\Ocnarf\Tavv-Hotel-Assistant\main\media\icon.png"
-        if os.path.exists(icon_path):
-            icon_pixmap = QPixmap(icon_path)
-            icon_pixmap = icon_pixmap.scaled(42, 42, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon_label.setPixmap(icon_pixmap)
-        else:
-            # Fallback - show "T" text if icon not found
-            icon_label.setText("T")
-            icon_label.setFont(QFont("Inter", 14, QFont.Bold))
-            icon_label.setStyleSheet("""
-                background-color: #4a9eff;
-                color: white;
-                border-radius: 16px;
-                padding: 6px;
-            """)
-            icon_label.setFixedSize(52, 52)
-            icon_label.setAlignment(Qt.AlignCenter)
-        
-        icon_label.setGraphicsEffect(self.create_shadow())
-        msg_layout.addWidget(icon_label, alignment=Qt.AlignTop)
-        msg_layout.addSpacing(8)
-        
-        bubble = QLabel(message)
-        bubble.setFont(QFont("Inter", 11))
-        bubble.setStyleSheet("""
-            QLabel {
-                background-color: rgba(26, 43, 71, 180);
-                color: white;
-                border-radius: 10px;
-                padding: 10px 15px;
-            }
-        """)
-        bubble.setWordWrap(True)
-        bubble.setMaximumWidth(400)
-        bubble.setGraphicsEffect(self.create_shadow())
-        msg_layout.addWidget(bubble)
-        msg_layout.addStretch()
-        
-        self.chat_layout.addWidget(msg_container)
+        uid = self.transcript.append(BOT, message)
         self.scroll_to_bottom()
+        return uid
     
-    def add_typing_indicator(self):
-        self.typing_container = QWidget()
-        self.typing_container.setStyleSheet("background: transparent;")
-        typing_layout = QHBoxLayout(self.typing_container)
-        typing_layout.setContentsMargins(0, 0, 0, 0)
-        
-        typing_label = QLabel("Tavv is typing...")
-        typing_label.setFont(QFont("Inter", 10))
-        typing_label.setStyleSheet("""
-            QLabel {
-                background-color: rgba(26, 43, 71, 150);
-                color: #888888;
-                border-radius: 10px;
-                padding: 8px 15px;
-            }
-        """)
-        typing_label.setGraphicsEffect(self.create_shadow())
-        typing_layout.addWidget(typing_label)
-        typing_layout.addStretch()
-        
-        self.chat_layout.addWidget(self.typing_container)
+    def add_typing_indicator(self, request_id):
+        self.typing_rows[request_id] = self.transcript.append(TYPING, "Tavv is typing...")
         self.scroll_to_bottom()
     
-    def remove_typing_indicator(self):
-        if hasattr(self, 'typing_container'):
-            self.chat_layout.removeWidget(self.typing_container)
-            self.typing_container.deleteLater()
+    def remove_typing_indicator(self, request_id):
+        row = self.typing_rows.pop(request_id, None)
+        if row is not None:
+            self.transcript.remove(row)
     
     def scroll_to_bottom(self):
-        QTimer.singleShot(100, lambda: self.chat_scroll.verticalScrollBar().setValue(
-            self.chat_scroll.verticalScrollBar().maximum()
-        ))
+        self.chat_view.scroll_to_bottom()
     
     def send_message(self):
         user_input = self.chat_input.text().strip()
@@ -538,20 +570,86 @@ class TavvGUI(QMainWindow):
         
         self.add_user_message(user_input)
         self.chat_input.clear()
-        self.add_typing_indicator()
         
-        self.worker = ChatWorker(user_input, self.room_number)
-        self.worker.finished.connect(self.display_bot_response)
-        self.worker.start()
+        self.start_worker(user_input)
+    
+    def start_worker(self, user_input):
+        if self.worker is None:
+            self.worker = ChatWorker(self.room_number, self.device_token)
+            self.worker.started_request.connect(self.add_typing_indicator)
+            self.worker.chunk_received.connect(self.display_bot_chunk)
+            self.worker.finished.connect(self.display_bot_response)
+            self.worker.cancelled.connect(self.request_cancelled)
+            self.worker.start()
+        return self.worker.submit(user_input)
     
-    def display_bot_response(self, response):
-        self.remove_typing_indicator()
-        self.add_bot_message(response)
+    def request_trace(self, request_id):
+        return self.worker.traces.get(request_id, tracing.NOOP) if self.worker else tracing.NOOP
+
+    def display_bot_chunk(self, request_id, chunk):
+        # First chunk replaces the typing indicator with a bubble that grows in place
+        row = self.reply_rows.get(request_id)
+        if row is None:
+            self.remove_typing_indicator(request_id)
+            self.reply_rows[request_id] = self.add_bot_message(chunk)
+            self.request_trace(request_id).mark("first_chunk_shown")
+        else:
+            self.transcript.append_text(row, chunk)
+            self.scroll_to_bottom()
+    
+    def request_cancelled(self, request_id):
+        # Any partial reply stays as it is
+        self.remove_typing_indicator(request_id)
+        self.reply_rows.pop(request_id, None)
+        self.finish_trace(request_id, cancelled=True)
+    
+    def display_bot_response(self, request_id, response):
+        rendering = time.perf_counter()
+        row = self.reply_rows.pop(request_id, None)
+        if row is not None:
+            self.transcript.set_text(row, response)
+        else:
+            self.remove_typing_indicator(request_id)
+            self.add_bot_message(response)
+        # The relayout and repaint run after this slot returns; stop the clock once they have
+        QTimer.singleShot(0, lambda: self.finish_trace(request_id, render=time.perf_counter() - rendering))
+    
+    def finish_trace(self, request_id, render=None, **attrs):
+        trace = self.worker.traces.pop(request_id, None) if self.worker else None
+        if trace is not None:
+            if render is not None:
+                trace.add("render", render)
+            trace.set(**attrs)
+            trace.finish()
 
 # Main execution
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    # Change "background.mp4" to your video file path
-    window = TavvGUI(first_name, room, video_path=r"C:\Users\Ocnarf\Tavv-Hotel-Assistant\main\media\bg.mp4")
+def main():
+    parser = argparse.ArgumentParser(description="Tavv kiosk")
+    parser.add_argument("--token-file", default=TOKEN_FILE, help="device token of this kiosk")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each startup phase took")
+    args, qt_args = parser.parse_known_args()
+    profile = StartupProfile(args.profile_startup)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    profile.mark("QApplication")
+
+    device_token, info = load_guest(args.token_file)
+    if not info:
+        print("ERROR: Your device token is not registered in the hotel system.")
+        sys.exit(1)
+    name = info["name"]
+    room = info["room_number"]
+    # Extract first name only
+    first_name = name.split()[0] if name else name
+    profile.mark("device token + resident lookup")
+
+    window = TavvGUI(first_name, room, device_token, video_path=media_path("bg.mp4"), profile=profile)
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    profile.mark("welcome screen built")
+    QTimer.singleShot(0, lambda: profile.mark("first event loop pass (window visible)"))
+    QTimer.singleShot(0, window.start_preload)
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
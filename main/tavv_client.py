@@ -0,0 +1,28 @@
+import json
+import urllib.request
+
+# Talks to server.py so a kiosk can use the central chat service instead of
+# running its own Groq client and DB access. Standard library only.
+
+
+def remote_chat_stream(server_url, device_token, message, timeout=60):
+    """Yield reply chunks from POST /chat as the server streams them."""
+    request = urllib.request.Request(
+        server_url.rstrip("/") + "/chat",
+        data=json.dumps({"message": message, "stream": True}).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {device_token}",
+        },
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        for line in response:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if "chunk" in event:
+                yield event["chunk"]
+            elif "error" in event:
+                # e.g. the server's LLM scheduler shed the request
+                raise RuntimeError(event["error"])
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules import each other by bare name and resolve data/ relative to main/, like the app
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+os.chdir(MAIN_DIR)
@@ -0,0 +1,31 @@
+from db_pool import get_pool
+from data.bulk_import import import_files
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_importing_the_same_files_twice_changes_nothing(tmp_path):
+    db_path = str(tmp_path / "hotel.db")
+    files = {
+        "buildings": write(tmp_path / "buildings.csv", "name,wifi_ssid\nBuilding 1,Cove-1\n"),
+        "rooms": write(tmp_path / "rooms.csv", "room_number,building,floor\n101,Building 1,1\n102,Building 1,\n"),
+        # The second amenity has no floor
+        "amenities": write(tmp_path / "amenities.csv",
+                           "building,name,description,floor\nBuilding 1,Gym,Open 24h,2\nBuilding 1,Lobby Bar,Drinks,\n"),
+        "menus": write(tmp_path / "menu.jsonl",
+                       '{"restaurant_name": "Cove Grill", "day": "Monday", "meal": "Lunch", "item_name": "Adobo"}\n'),
+    }
+
+    def snapshot():
+        with get_pool(db_path).connection() as conn:
+            return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+                    for table in ("buildings", "rooms", "amenities", "restaurant_menu")}
+
+    import_files(files, db_path)
+    first = snapshot()
+    import_files(files, db_path)
+    assert snapshot() == first
+    assert len(first["amenities"]) == 2
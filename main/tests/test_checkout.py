@@ -0,0 +1,34 @@
+import datetime
+import pytest
+from migrations import migrate
+from data.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "hotel.db")
+    migrate(path)
+    manager = DatabaseManager(path)
+    with manager.pool.transaction() as conn:
+        conn.execute("INSERT INTO buildings (name) VALUES ('Building 1')")
+        conn.execute("INSERT INTO rooms (room_number, building_id, floor) VALUES ('101', 1, 1)")
+    return manager
+
+
+def test_space_separated_checkout_expires_at_that_time(db, tmp_path):
+    tokens_dir = str(tmp_path / "tokens")
+    token = db.check_in_residents([("Ana Reyes", "101", "2026-10-19 12:00:00")], tokens_dir)["101"]
+
+    assert db.void_expired_tokens(datetime.datetime(2026, 10, 19, 0, 5), tokens_dir) == []
+    assert db.void_expired_tokens(datetime.datetime(2026, 10, 19, 11, 59), tokens_dir) == []
+    assert db.void_expired_tokens(datetime.datetime(2026, 10, 19, 12, 0), tokens_dir) == [token]
+    assert not (tmp_path / "tokens" / "room_101_token.txt").exists()
+
+
+def test_unreadable_checkout_is_rejected(db, tmp_path):
+    tokens_dir = str(tmp_path / "tokens")
+    with pytest.raises(ValueError):
+        db.check_in_residents([("Ana Reyes", "101", "tomorrow noon")], tokens_dir)
+    with db.pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM residents").fetchone()[0] == 0
+    assert not (tmp_path / "tokens").exists()
@@ -0,0 +1,58 @@
+from conversation_memory import ConversationMemory
+from session_store import SessionStore
+
+
+def test_new_resident_never_sees_previous_turns():
+    memory = ConversationMemory()
+    memory.bind_resident("101", 1)
+    memory.append("101", 1, "What's the wifi password?", "It's cove1234.")
+    assert len(memory.messages("101", 1)) == 2
+
+    memory.bind_resident("101", 2)
+    assert memory.messages("101", 2) == []
+    # A turn of the first guest that was still running when the room was rebound
+    assert memory.messages("101", 1) == []
+    memory.append("101", 1, "Thanks, and the menu?", "Adobo for lunch.")
+    assert memory.messages("101", 2) == []
+
+
+def test_only_a_retried_request_is_deduplicated():
+    memory = ConversationMemory()
+    memory.bind_resident("101", 1)
+    # The guest really asked twice, and got the same answer twice
+    memory.append("101", 1, "Thanks!", "You're welcome!")
+    memory.append("101", 1, "Thanks!", "You're welcome!")
+    assert len(memory.messages("101", 1)) == 4
+
+    memory.append("101", 1, "Menu?", "Adobo.", request_id="r1")
+    memory.append("101", 1, "Menu?", "Adobo.", request_id="r1")
+    assert len(memory.messages("101", 1)) == 6
+
+
+def test_checkout_drops_memory():
+    memory = ConversationMemory()
+    memory.bind_resident("101", 1)
+    memory.append("101", 1, "Hi", "Hello!")
+    memory.bind_resident("101", None)
+    assert "101" not in memory
+    assert memory.messages("101", None) == []
+
+
+def test_rehydration_is_per_resident(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    try:
+        memory = ConversationMemory(store=store)
+        memory.bind_resident("101", 1)
+        memory.append("101", 1, "Hi", "Hello!")
+        store.flush()
+
+        # After a restart the room is bound to whoever holds it now
+        restarted = ConversationMemory(store=store)
+        restarted.bind_resident("101", 2)
+        assert restarted.messages("101", 2) == []
+
+        restarted = ConversationMemory(store=store)
+        restarted.bind_resident("101", 1)
+        assert [m["content"] for m in restarted.messages("101", 1)] == ["Hi", "Hello!"]
+    finally:
+        store.close()
@@ -0,0 +1,65 @@
+import pytest
+from fast_path import fast_answer
+
+CONTEXT = {
+    "building": {"name": "Building 1", "wifi_ssid": "CoveWifi-1", "wifi_password": "pass1234",
+                 "restaurant_name": "Cove Grill"},
+    "housekeeping": [{"cleaned_time": "2026-10-17T09:30:00", "cleaner_name": "Maria S."}],
+    "restaurant_menu": [
+        {"meal": "Breakfast", "item_name": "Tapsilog"},
+        {"meal": "Lunch", "item_name": "Adobo"},
+        {"meal": "Dinner", "item_name": "Sinigang"},
+    ],
+}
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("What's the wifi password?", "wifi"),
+    ("Thanks. What's the wifi password?", "wifi"),
+    ("wifi password please", "wifi"),
+    ("How do I connect to the wifi?", "wifi"),
+    ("Ano ang wifi password?", "wifi"),
+    ("When was my room last cleaned?", "cleaned"),
+    ("Has my room been cleaned today?", "cleaned"),
+    ("Kailan huling nilinis ang kwarto ko?", "cleaned"),
+    ("What's on the menu for lunch today?", "menu"),
+    ("What's for breakfast?", "menu"),
+    ("dinner menu", "menu"),
+    ("Anong ulam ngayon?", "menu"),
+])
+def test_lookup_questions(question, intent):
+    assert fast_answer(question, CONTEXT)[0] == intent
+
+
+@pytest.mark.parametrize("question", [
+    "the wifi isn't working, can you send someone",
+    "The wifi keeps dropping",
+    "Can you reset the wifi password for me?",
+    "I'm on the wifi but it's really slow",
+    "I missed breakfast, can you bring something up?",
+    "What time is breakfast?",
+    "Where is dinner served?",
+    "Is breakfast included?",
+    "Anything vegetarian for lunch?",
+    "Can I order lunch to my room?",
+    "When can you clean my room?",
+    "Please send housekeeping to clean the room",
+    "My room was not cleaned",
+    "Pakiayos ang wifi",
+    "I love the breakfast here",
+    "When was the pool last cleaned?",
+    "Was the gym cleaned today?",
+    "What is the password for the TV?",
+    "ano ang password ng netflix?",
+    "What is the network of restaurants nearby?",
+    "Which restaurant serves dinner nearby?",
+    "what is the dinner dress code?",
+    "I need a lunch recommendation outside the hotel",
+])
+def test_near_misses_go_to_the_llm(question):
+    assert fast_answer(question, CONTEXT) is None
+
+
+def test_cleaner_initial_is_not_doubled():
+    _, reply = fast_answer("When was my room last cleaned?", CONTEXT)
+    assert reply.endswith("by Maria S.")
@@ -0,0 +1,303 @@
+import bisect
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# ----------------------------------
+# Request tracing
+# ----------------------------------
+# A Trace follows one guest message and records how long each stage took (context fetch,
+# prompt assembly, LLM queue, LLM request and stream, memory, GUI render...), points in
+# time like the first token, token counts and the error if any. Finished traces are
+# written as one JSON line each (TRACE_LOG) and feed Prometheus histograms, served by
+# server.py at GET /metrics.
+#
+# Whoever receives the message starts the trace (ChatWorker, server.py) and activates it;
+# assistant.py records into the active trace, or starts its own (CLI). Traces are
+# sampled: an unsampled message gets NOOP, whose methods do nothing, so instrumented code
+# costs a method call per stage when tracing is off.
+
+SAMPLE_RATE = float(os.getenv("TAVV_TRACE_SAMPLE", "1.0"))        # share of messages traced
+TRACE_LOG = os.getenv("TAVV_TRACE_LOG", os.path.join("data", "traces.jsonl"))   # "" = no JSON log
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+_current = contextvars.ContextVar("tavv_trace", default=None)
+
+
+# -----------------------
+# TRACES
+# -----------------------
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTrace:
+    """Stand-in for an unsampled message; every method is a no-op."""
+    sampled = False
+    trace_id = None
+
+    def span(self, stage):
+        return _NULL_SPAN
+
+    def add(self, stage, seconds):
+        pass
+
+    def mark(self, name):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+    def fail(self, error):
+        pass
+
+    def finish(self):
+        pass
+
+
+NOOP = NullTrace()
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "started")
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class Trace:
+    sampled = True
+
+    def __init__(self, name, **attrs):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.started = time.perf_counter()
+        self.stages = {}    # stage -> seconds (a stage entered twice, e.g. on retry, adds up)
+        self.marks = {}     # point -> seconds since the trace started
+        self.attrs = attrs
+        self.error = None
+        self._finished = False
+
+    def span(self, stage):
+        """Context manager timing one stage."""
+        return _Span(self, stage)
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def mark(self, name):
+        """Record when something happened (first kept), e.g. the first token."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def fail(self, error):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def finish(self):
+        """Log the trace and record its metrics; later calls do nothing."""
+        if self._finished:
+            return
+        self._finished = True
+        total = time.perf_counter() - self.started
+        record = {
+            "ts": self.started_at,
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "total_ms": round(total * 1000, 2),
+            "stages_ms": {stage: round(s * 1000, 2) for stage, s in self.stages.items()},
+            "marks_ms": {name: round(s * 1000, 2) for name, s in self.marks.items()},
+            "attrs": self.attrs,
+            "error": self.error,
+        }
+        _observe(self, total)
+        _log(record)
+
+
+def start(name, sample_rate=None, **attrs):
+    """A new Trace, or NOOP if this message isn't sampled."""
+    rate = SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return NOOP
+    return Trace(name, **attrs)
+
+
+def current():
+    """The trace activated by the caller (NOOP if unsampled), or None if there is none."""
+    return _current.get()
+
+
+@contextmanager
+def activate(trace):
+    """Make `trace` the current one for code called inside the block (same thread or task)."""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def traced(name, **attrs):
+    """Start, activate and finish a trace around a block; an escaping exception is recorded."""
+    trace = start(name, **attrs)
+    with activate(trace):
+        try:
+            yield trace
+        except Exception as e:
+            trace.fail(e)
+            raise
+        finally:
+            trace.finish()
+
+
+# -----------------------
+# JSON LOG
+# -----------------------
+_log_lock = threading.Lock()
+_log_file = None
+
+
+def _log(record):
+    global _log_file
+    if not TRACE_LOG:
+        return
+    line = json.dumps(record, default=str)
+    with _log_lock:
+        try:
+            if _log_file is None:
+                _log_file = open(TRACE_LOG, "a", encoding="utf-8", buffering=1)
+            _log_file.write(line + "\n")
+        except OSError as e:
+            print(f"Could not write trace log: {e}")
+
+
+# -----------------------
+# PROMETHEUS METRICS
+# -----------------------
+_metrics_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}    # label values -> [count per bucket (+Inf last), sum]
+
+    def observe(self, value, *label_values):
+        with _metrics_lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _metrics_lock:
+            for label_values, (counts, total) in sorted(self.series.items()):
+                labels = _labels(self.labels, label_values)
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+                lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        with _metrics_lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _metrics_lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _labels(names, values):
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values))
+
+
+TRACE_SECONDS = Histogram("tavv_trace_seconds", "Time from receiving a message to its end (reply shown, sent or failed)",
+                          STAGE_BUCKETS, ("trace", "path"))
+STAGE_SECONDS = Histogram("tavv_stage_seconds", "Time spent in one pipeline stage", STAGE_BUCKETS, ("trace", "stage"))
+MARK_SECONDS = Histogram("tavv_mark_seconds", "Time from receiving a message to a point in its handling",
+                         STAGE_BUCKETS, ("trace", "mark"))
+TOKENS = Histogram("tavv_llm_tokens", "Prompt and completion tokens per LLM call", TOKEN_BUCKETS, ("kind",))
+TRACES = Counter("tavv_traces_total", "Traced messages by outcome", ("trace", "outcome"))
+METRICS = [TRACE_SECONDS, STAGE_SECONDS, MARK_SECONDS, TOKENS, TRACES]
+
+
+def _observe(trace, total):
+    path = trace.attrs.get("path", "unknown")
+    TRACE_SECONDS.observe(total, trace.name, path)
+    for stage, seconds in trace.stages.items():
+        STAGE_SECONDS.observe(seconds, trace.name, stage)
+    for name, seconds in trace.marks.items():
+        MARK_SECONDS.observe(seconds, trace.name, name)
+    for kind in ("prompt", "completion"):
+        tokens = trace.attrs.get(f"{kind}_tokens")
+        if tokens is not None:
+            TOKENS.observe(tokens, kind)
+    outcome = "error" if trace.error else "cancelled" if trace.attrs.get("cancelled") else "ok"
+    TRACES.inc(trace.name, outcome)
+
+
+def sample_lines(name, help_text, samples, label=None, kind="gauge"):
+    """Prometheus lines for values kept elsewhere (e.g. scheduler stats): {label value: number}, or one number."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    if label is None:
+        lines.append(f"{name} {samples}")
+    else:
+        lines += [f"{name}{{{_labels((label,), (key,))}}} {value}" for key, value in samples.items()]
+    return lines
+
+
+def metrics_text(extra_lines=()):
+    """Everything in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += extra_lines
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,348 @@
+import collections
+import json
+import os
+import threading
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QColor
+
+# ----------------------------------
+# Background video playback
+# ----------------------------------
+# Decoding used to happen on the GUI thread (cap.read + cvtColor + QPixmap per frame at
+# the clip's native size), which made typing and scrolling stutter. Now a decoder thread
+# scales/crops each frame to the window size and writes it straight into one of a few
+# preallocated RGB slots (FrameRing). The GUI thread only takes the next ready slot on a
+# timer and paints it through a QImage that points at the slot's memory, no copies.
+# Rewinding at the end of the clip happens on the decoder thread while the ring still
+# holds frames, so the loop point doesn't show.
+#
+# With FRAME_CACHE on, the first pass through the clip is also written to disk as raw
+# display-ready RGB frames (<clip>.<w>x<h>.frames plus a .json header). After that,
+# including on later launches, playback just indexes into a read-only memory map of that
+# file and nothing is decoded at all. The header records the source's size and modification
+# time, so a replaced clip is decoded (and cached) again; checking them is a stat() on the
+# GUI thread rather than a read of the whole clip.
+
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 800
+RING_SLOTS = 8          # decoded frames kept ready ahead of playback
+FALLBACK_COLOR = "#0a1628"
+FRAME_CACHE = True
+MAX_CACHE_BYTES = 2 * 1024 ** 3     # don't cache clips that would be bigger than this raw
+CACHE_FORMAT = 2
+
+
+def fit_frame(frame, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """Scale a frame to cover width x height, then crop the centre (what the label used to show)."""
+    h, w = frame.shape[:2]
+    scale = max(width / w, height / h)
+    new_w, new_h = max(width, round(w * scale)), max(height, round(h * scale))
+    if (new_w, new_h) != (w, h):
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=interpolation)
+    top, left = (new_h - height) // 2, (new_w - width) // 2
+    return frame[top:top + height, left:left + width]
+
+
+class FrameRing:
+    """
+    Fixed set of frame buffers shared by one producer (decoder) and one consumer (GUI).
+    The slot being displayed is never handed back to the producer until the next one is taken.
+    """
+
+    def __init__(self, slots=RING_SLOTS, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+        self.frames = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(slots)]
+        self._free = collections.deque(range(slots))
+        self._ready = collections.deque()
+        self._showing = None
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def acquire(self):
+        """Index of a free slot to decode into (blocks while the ring is full), None once stopped."""
+        with self._cond:
+            while not self._free and not self._stopped:
+                self._cond.wait()
+            return None if self._stopped else self._free.popleft()
+
+    def publish(self, index):
+        with self._cond:
+            self._ready.append(index)
+
+    def take(self):
+        """Next decoded frame for display, or None if the decoder hasn't kept up (keep the last one)."""
+        with self._cond:
+            if not self._ready:
+                return None
+            index = self._ready.popleft()
+            if self._showing is not None:
+                self._free.append(self._showing)
+                self._cond.notify()
+            self._showing = index
+            return self.frames[index]
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+# ----------------------------------
+# Decoded frame cache
+# ----------------------------------
+def cache_path(video_path, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    return f"{video_path}.{width}x{height}.frames"
+
+
+def source_stamp(video_path):
+    """(size, mtime in ns) identifying this version of the clip."""
+    stat = os.stat(video_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FrameCache:
+    """Read-only memory map of a clip's decoded frames, shape (frames, height, width, 3)."""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.fps = header["fps"]
+        shape = (header["frames"], header["height"], header["width"], 3)
+        # Copy-on-write mapping: never written, but gives QImage the writable buffer it expects
+        self.frames = np.memmap(path, dtype=np.uint8, mode="c", shape=shape)
+
+    def __len__(self):
+        return self.frames.shape[0]
+
+    @staticmethod
+    def load(video_path, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+        """The cache for this clip if it exists and still matches the source, else None."""
+        path = cache_path(video_path, width, height)
+        try:
+            with open(path + ".json") as f:
+                header = json.load(f)
+            if (header.get("format") != CACHE_FORMAT or header["width"] != width or header["height"] != height
+                    or (header["source_size"], header["source_mtime_ns"]) != source_stamp(video_path)
+                    or os.path.getsize(path) != header["frames"] * width * height * 3):
+                return None
+            return FrameCache(path, header)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+class FrameCacheWriter:
+    """Appends frames during the first decode pass; the cache only becomes visible in finish()."""
+
+    def __init__(self, video_path, width, height, fps):
+        self.video_path = video_path
+        self.path = cache_path(video_path, width, height)
+        # Stamped before decoding, so a clip replaced mid-pass doesn't match the cache later
+        size, mtime_ns = source_stamp(video_path)
+        self.header = {"format": CACHE_FORMAT, "width": width, "height": height, "fps": fps, "frames": 0,
+                       "source_size": size, "source_mtime_ns": mtime_ns}
+        self._file = open(self.path + ".tmp", "wb")
+
+    def write(self, frame):
+        self._file.write(frame.data)
+        self.header["frames"] += 1
+
+    def finish(self):
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+        with open(self.path + ".json.tmp", "w") as f:
+            json.dump(self.header, f)
+        os.replace(self.path + ".json.tmp", self.path + ".json")
+        return self.path
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.path + ".tmp")
+        except OSError:
+            pass
+
+
+class VideoDecoder(QThread):
+    """
+    Reads the clip in a loop and fills the ring with display-ready RGB frames.
+    With build_cache, the first pass is also written to a FrameCache and the thread
+    ends after it (cache_ready), since playback switches to the cache.
+    """
+    cache_ready = pyqtSignal(str)
+
+    def __init__(self, video_path, ring, build_cache=False):
+        super().__init__()
+        self.video_path = video_path
+        self.ring = ring
+        self.build_cache = build_cache
+        self.fps = 30.0
+        self.cap = None
+        self._running = True
+
+    def open(self):
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            return None
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.cap = cap
+        return cap
+
+    def run(self):
+        # Opened by the caller to check the file; the capture moves to this thread from here on
+        cap = self.cap or self.open()
+        if cap is None:
+            return
+        writer = self.cache_writer(cap)
+        while self._running:
+            ret, frame = cap.read()
+            if not ret and writer is not None:
+                # First pass complete: playback continues from the cache. Only a failed
+                # finish() is aborted; the abort after the loop is for stopping mid-pass.
+                finished, writer = writer, None
+                try:
+                    self.cache_ready.emit(finished.finish())
+                    break
+                except OSError as e:
+                    print(f"Could not save video frame cache: {e}")
+                    finished.abort()
+            if not ret:
+                # End of clip: rewind (or reopen if the container can't seek) and keep going
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = cap.read()
+                if not ret:
+                    cap.release()
+                    cap = self.open()
+                    if cap is None:
+                        break
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+
+            index = self.ring.acquire()
+            if index is None:
+                break
+            slot = self.ring.frames[index]
+            cv2.cvtColor(fit_frame(frame, slot.shape[1], slot.shape[0]), cv2.COLOR_BGR2RGB, dst=slot)
+            if writer is not None:
+                try:
+                    writer.write(slot)
+                except OSError as e:
+                    print(f"Could not save video frame cache: {e}")
+                    writer.abort()
+                    writer = None
+            self.ring.publish(index)
+        if writer is not None:
+            writer.abort()
+        if cap is not None:
+            cap.release()
+
+    def cache_writer(self, cap):
+        if not self.build_cache:
+            return None
+        height, width = self.ring.frames[0].shape[:2]
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        if frames <= 0 or frames * width * height * 3 > MAX_CACHE_BYTES:
+            return None
+        try:
+            return FrameCacheWriter(self.video_path, width, height, self.fps)
+        except OSError as e:
+            print(f"Could not save video frame cache: {e}")
+            return None
+
+    def stop(self):
+        self._running = False
+        self.ring.stop()
+        self.wait()
+
+
+class VideoBackground(QWidget):
+    """Paints the looping background video; falls back to a flat colour without a clip."""
+
+    def __init__(self, video_path, parent=None, width=FRAME_WIDTH, height=FRAME_HEIGHT, use_cache=FRAME_CACHE):
+        super().__init__(parent)
+        self.setGeometry(0, 0, width, height)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.image = None
+        self.fallback = QColor(FALLBACK_COLOR)
+        self.frame_size = (width, height)
+        self.use_cache = use_cache
+        self.ring = None
+        self.decoder = None
+        self.cache = None
+        self.cache_index = 0
+        self.pending_cache = None   # cache written by the decoder, used once the ring drains
+        self.timer = None
+        if video_path:
+            self.start(video_path)
+
+    def start(self, video_path):
+        width, height = self.frame_size
+        if self.use_cache:
+            self.cache = FrameCache.load(video_path, width, height)
+        if self.cache is not None:
+            fps = self.cache.fps
+            print(f"Video loaded from frame cache ({len(self.cache)} frames). FPS: {fps}")
+        else:
+            self.ring = FrameRing(width=width, height=height)
+            self.decoder = VideoDecoder(video_path, self.ring, build_cache=self.use_cache)
+            if self.decoder.open() is None:
+                print(f"ERROR: Could not open video file: {video_path}")
+                print("The app will run with a dark background.")
+                self.decoder = None
+                return False
+            self.decoder.cache_ready.connect(self.on_cache_ready)
+            self.decoder.start()
+            fps = self.decoder.fps
+            print(f"Video loaded successfully. FPS: {fps}")
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.next_frame)
+        self.timer.start(int(1000 / fps))
+        return True
+
+    def on_cache_ready(self, path):
+        # Just written by the decoder, no need to check it against the source again
+        try:
+            with open(path + ".json") as f:
+                self.pending_cache = FrameCache(path, json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not open video frame cache: {e}")
+            self.decoder.wait()
+            self.decoder = VideoDecoder(self.decoder.video_path, self.ring)
+            self.decoder.start()
+
+    def next_frame(self):
+        if self.cache is not None:
+            frame = self.cache.frames[self.cache_index]
+            self.cache_index = (self.cache_index + 1) % len(self.cache)
+        else:
+            frame = self.ring.take()
+            if frame is None:
+                # Decoder finished its caching pass and the ring is empty: continue from the cache
+                if self.pending_cache is not None:
+                    self.cache, self.pending_cache = self.pending_cache, None
+                    self.decoder.wait()
+                    self.decoder = None
+                    self.next_frame()
+                return
+        height, width = frame.shape[:2]
+        # Wraps the slot's (or the mapping's) memory; a ring slot stays ours until the next take()
+        self.image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_RGB888)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.image is None:
+            painter.fillRect(self.rect(), self.fallback)
+        else:
+            painter.drawImage(0, 0, self.image)
+        painter.end()
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.stop()
+        if self.decoder is not None:
+            self.decoder.stop()
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+import assistant
+from context_encoder import count_tokens, encode_context
+from context_retriever import score_sections
+from llm_scheduler import BACKGROUND
+
+# ----------------------------------
+# Warm-up before the first question
+# ----------------------------------
+# The first message used to pay for everything at once: the tokenizer load, the room's
+# context query, encoding every section, building the retriever's section index and the
+# TLS handshake to the LLM. The kiosk calls warm() when the welcome screen is up and again
+# when the guest starts typing, so all of that is done (and the connection is open and
+# kept alive) by the time they press enter. Only these lower layers are touched, never
+# the turn pipeline: no answer cache, conversation memory, trace or metrics entries for
+# a question nobody asked. Runs on a background thread; never raises.
+
+REWARM_AFTER = 20   # seconds; typing re-warms (mainly the connection) at most this often
+PRIME_LLM = os.getenv("TAVV_PRIME_LLM") == "1"   # also send a 1-token request with the system prompt (background priority)
+
+
+def warm_room(room_number, prime=PRIME_LLM):
+    """Prefetch and encode the room's context and open the LLM connection. Returns timings (ms)."""
+    timings = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        try:
+            return fn()
+        except Exception as e:
+            print(f"Warm-up step '{name}' failed: {e}")
+            return None
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def pool():
+        with assistant.db.pool.connection() as conn:
+            conn.execute("SELECT 1")
+
+    step("tokenizer", lambda: count_tokens("warm up"))
+    step("db_pool", pool)
+    # Fills the ContextCache for the room and the hotel-wide sections
+    context = step("context", lambda: assistant.db.get_full_context(room_number))
+    if context and "error" not in context:
+        step("encoder", lambda: encode_context(context))
+        step("retriever", lambda: score_sections("warm up", context))
+    step("connection", lambda: assistant.client.models.list())
+    if prime and context and "error" not in context:
+        messages = [assistant.build_system_prompt(context, room_number), {"role": "user", "content": "Hi"}]
+        step("prime", lambda: assistant.scheduler.call(lambda: assistant.client.chat.completions.create(
+            model=assistant.MODEL,
+            messages=messages,
+            max_completion_tokens=1,
+        ), count_tokens(messages[0]["content"]) + 1, BACKGROUND))
+    return timings
+
+
+class Warmer:
+    """Runs warm_room in the background, at most one at a time and not more often than REWARM_AFTER."""
+
+    def __init__(self, room_number, rewarm_after=REWARM_AFTER):
+        self.room_number = room_number
+        self.rewarm_after = rewarm_after
+        self.last_timings = None
+        self._last = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def warm(self, force=False):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if not force and self._last is not None and time.monotonic() - self._last < self.rewarm_after:
+                return False
+            self._last = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def warm_now(self):
+        """Warm on the calling thread (e.g. the kiosk's preloader); skipped if a warm-up is running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return None
+            self._last = time.monotonic()
+            self._thread = threading.current_thread()
+        try:
+            self._run()
+        finally:
+            with self._lock:
+                self._thread = None
+        return self.last_timings
+
+    def _run(self):
+        self.last_timings = warm_room(self.room_number)